@@ -1,165 +1,229 @@
+import time
+startTime = time.perf_counter()  # 开始导入的时刻，用于测量启动到首次绘制的耗时
 from PyQt5 import QtGui
 from PyQt5.QtWidgets import *
-from PyQt5.uic import loadUi
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
-from PyQt5.QtSvg import *
+from huffman_core import (HuffmanTree, MAGIC, checkDecodedText, getFrequency, normalizeNewlines, unpack, readTree,
+                          dumpTree)
+from huffman_metrics import STAGES, metrics
+from huffman_cache import treeCache, svgCache, dataFingerprint, codebookId, CodebookStore
+from huffman_net import (FRAME_TREE, FRAME_TEXT, FRAME_CHUNK, FRAME_END, FRAME_OFFER, FRAME_HAVE, FRAME_WANT,
+                         sendFrame, recvFrames, packTreeFrame, parseTreeFrame, packTextFrame, parseTextFrame,
+                         iterChunks, sendTextStream)
+from array import array
 from typing import Dict, List
-from graphviz import Digraph
 import sys
 import os
+import json
+import importlib
+import math
 import socket
 import re
 import threading
 import multiprocessing
+from collections import OrderedDict
 
 
-class TreeNode:
-    parent: 'TreeNode' = None  # 父节点
-    lchild: 'TreeNode' = None  # 左节点
-    rchild: 'TreeNode' = None  # 右节点
-    weight: float = None  # 权重，即字频
-    name: str = None  # 名称，即字符
-
-    def __init__(self, name=None, weight=None) -> None:
-        self.name = name
-        self.weight = weight
+rawTextEdit: QPlainTextEdit = None  # 原文所在的文本框
+encodedTextEdit: QPlainTextEdit = None  # 密文所在文本框
+rawTextLoader: "TextLoader" = None  # 向原文框分段写入大段文本
+encodedTextLoader: "TextLoader" = None  # 向密文框分段写入大段文本
+HFTree: HuffmanTree = None  # 哈夫曼树
+CharacterSet = {}  # 字符集
+showSVGWidget: "ShowSVGWidget" = None  # 显示svg的控件
+paintTreeWindow:"PaintTreeWindow"=None
+charsetWindow:"CharsetWindow"=None
+nettansportWindow: "NetTransportWindow" = None
+statsWindow: "StatsWindow" = None
+UI_DIR = 'ui'  # 界面文件所在目录
+startupTimes = {}  # 启动各阶段距开始导入的毫秒数
+WORK_CHUNK = 1 << 16  # 后台编码、译码与整理格式时每段处理的字符数，每段之后报告进度并检查是否已取消
+COMPACT_WIDTH = 50  # 紧凑格式每行的位数
+MAX_OFFERED = 16  # 最多保留的尚未收到对方答复的编号，超出时丢弃最早提供的
+
+
+def setupUi(widget: QWidget, name: str):
+    # 加载窗体中的各个控件：优先使用pyuic5预编译的ui/ui_<name>.py(由--compile-ui生成)，免去运行时解析XML
+    # 没有预编译模块或其比.ui文件旧时退回loadUi
+    path = os.path.join(UI_DIR, name+'.ui')
+    compiled = os.path.join(UI_DIR, 'ui_'+name+'.py')
+    if os.path.exists(compiled) and (not os.path.exists(path) or os.path.getmtime(compiled) >= os.path.getmtime(path)):
+        module = importlib.import_module(UI_DIR+'.ui_'+name)
+        ui = next(j for i, j in vars(module).items() if i.startswith('Ui_'))()
+        ui.setupUi(widget)
+        for i, j in vars(ui).items():  # 与loadUi一样，各控件作为窗体的属性
+            setattr(widget, i, j)
+        return
+    from PyQt5.uic import loadUi  # 仅在无预编译模块时需要
+    loadUi(path, widget)
+
+
+def compileUi():
+    # 将ui目录下的各.ui文件预编译为ui_<name>.py，修改.ui文件后需重新生成
+    from PyQt5.uic import compileUi as compile
+    for i in sorted(os.listdir(UI_DIR)):
+        if i.endswith('.ui'):
+            with open(os.path.join(UI_DIR, i), encoding='utf-8') as src:
+                with open(os.path.join(UI_DIR, 'ui_'+i[:-3]+'.py'), 'w', encoding='utf-8') as dst:
+                    compile(src, dst)
+
+
+def recordStartup(stage: str):
+    startupTimes[stage] = round((time.perf_counter()-startTime)*1000, 1)
+
+
+def getCharsetWindow() -> "CharsetWindow":
+    # 各副窗体在第一次打开时才创建，启动时只创建主窗体
+    global charsetWindow
+    if charsetWindow is None:
+        charsetWindow = CharsetWindow()
+    return charsetWindow
+
+
+def getNetTransportWindow() -> "NetTransportWindow":
+    global nettansportWindow
+    if nettansportWindow is None:
+        nettansportWindow = NetTransportWindow()
+    return nettansportWindow
+
+
+def getPaintTreeWindow() -> "PaintTreeWindow":
+    global paintTreeWindow
+    if paintTreeWindow is None:
+        paintTreeWindow = PaintTreeWindow()
+    return paintTreeWindow
+
+
+def getStatsWindow() -> "StatsWindow":
+    global statsWindow
+    if statsWindow is None:
+        statsWindow = StatsWindow()
+    return statsWindow
+
+
+def encodeJob(worker: "CodingWorker", tree: HuffmanTree, text: str) -> str:
+    # 分段编码，有字符集外的字符或已取消时返回None
+    parts = []
+    for i in range(0, len(text), WORK_CHUNK):
+        bits = tree.encode(text[i:i+WORK_CHUNK])
+        if bits is None or not worker.report(i+WORK_CHUNK, len(text)):
+            return None
+        parts.append(bits)
+    return ''.join(parts)
+
+
+def decodeJob(worker: "CodingWorker", tree: HuffmanTree, bits: str) -> str:
+    # 分段译码，段末不完整的码字接到下一段之前；密文无法译码或已取消时返回None
+    bits = bits.replace('\n', '')
+    if not tree.decodeTable:
+        tree.buildDecodeTable()
+        if not tree.decodeTable:  # 旧版只有一个字符时码长为0
+            return tree.decode(bits)
+    parts = []
+    rest = ''
+    step = WORK_CHUNK*8
+    for i in range(0, len(bits), step):
+        decoded = tree.decodePartial(rest+bits[i:i+step])
+        if decoded is None or not worker.report(i+step, len(bits)):
+            return None
+        parts.append(decoded[0])
+        rest = decoded[1]
+    return None if rest else ''.join(parts)
+
+
+def compactJob(worker: "CodingWorker", bits: str) -> str:
+    # 每COMPACT_WIDTH位换行，满一行时行末都有换行符；已取消时返回None
+    with metrics.timer('compact', symbols=len(bits)):
+        bits = bits.replace('\n', '')
+        lines = []
+        step = WORK_CHUNK//COMPACT_WIDTH*COMPACT_WIDTH
+        for i in range(0, len(bits), step):
+            chunk = bits[i:i+step]
+            lines += [chunk[j:j+COMPACT_WIDTH] for j in range(0, len(chunk), COMPACT_WIDTH)]
+            if not worker.report(i+step, len(bits)):
+                return None
+        return '\n'.join(lines)+('\n' if bits and len(bits) % COMPACT_WIDTH == 0 else '')
 
 
-class HuffmanTree:
-    rootnode: TreeNode = None  # 根节点
-    nodes: List[TreeNode] = None  # 各节点组成的列表
-    characterset: Dict[str, float] = None  # 字符集构成的字典
+class CodingWorker(QThread):
+    # 在后台线程中执行job(worker)，job分段处理并在每段之后调用report报告进度、检查是否已取消
+    progressSign = pyqtSignal(int)  # 进度，0~100
+    resultSign = pyqtSignal(object)  # job的结果，已取消时不发出
 
-    def __init__(self, characterset: Dict[str, float]):
-        if characterset == {} or characterset == None:  # 若字符集为空或者无字符集 则直接返回不对树进行构造
+    def __init__(self, job, parent=None):
+        super().__init__(parent)
+        self.job = job
+
+    def run(self):
+        result = self.job(self)
+        if not self.isInterruptionRequested():
+            self.resultSign.emit(result)
+
+    def report(self, done: int, total: int) -> bool:
+        # 返回是否应继续
+        self.progressSign.emit(min(done, total)*100//total if total else 100)
+        return not self.isInterruptionRequested()
+
+
+class TextLoader(QObject):
+    # 分段把大段文本写入QPlainTextEdit，每段之间回到事件循环，写入过程中界面仍可操作
+    edit: QPlainTextEdit = None
+    text: str = ''  # 正在写入的文本
+    pos: int = 0  # 已写入的字符数
+    CHUNK = 1 << 16  # 每次写入的字符数
+
+    def __init__(self, edit: QPlainTextEdit):
+        super().__init__(edit)
+        self.edit = edit
+        self.timer = QTimer(self)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.step)
+
+    def load(self, text: str):
+        # 替换文本框的内容，短文本直接写入
+        self.timer.stop()
+        self.text, self.pos = '', 0
+        if len(text) <= self.CHUNK:
+            self.edit.setPlainText(text)
             return
-        # 建树，先将其写于一个列表list中
-        nodes: List[TreeNode] = [TreeNode(key, value) for key, value in characterset.items()] +\
-                                [TreeNode()
-                                 for _ in range(len(characterset)-1)]
-        for i in range(len(characterset), len(nodes)):
-            x = self.select(i, nodes)
-            nodes[x].parent = nodes[i]
-            y = self.select(i, nodes)
-            nodes[y].parent = nodes[i]
-            nodes[i].lchild = nodes[x]
-            nodes[i].rchild = nodes[y]
-            nodes[i].weight = nodes[x].weight+nodes[y].weight
-        self.rootnode = nodes[-1]
-        self.nodes = nodes
-        self.characterset = characterset
-
-    def select(self, k: int, nodes: List[TreeNode]) -> int:
-        # 在nodes中寻找前k个数中，无父节点且权值最小的节点，并返回最小值
-        x: int = None
-        for i in range(k):
-            if not nodes[i].parent:  # 若找到第一个无父节点的节点，并用x标记
-                x = i
-                break
-        for j in range(x, k):  # 在第x结点以后
-            if nodes[j].weight < nodes[x].weight and not nodes[j].parent:
-                x = j
-                break
-        return x
-
-    def encode(self, text: str) -> str:
-        # 对text中的文本进行编码
-        p, q = '', ''  # p是每个字符的编码，q是整篇文章的编码
-        for i in text:
-            for j in self.nodes:
-                if i == j.name:
-                    while j.parent:
-                        if j.parent.lchild == j:
-                            p += '0'
-                        elif j.parent.rchild == j:
-                            p += '1'
-                        j = j.parent
-                    q += p[::-1]
-                    p = ''
-                    break
-            else:
-                # 若当前字符并不在字符集中，则返回空的密文
-                return None
-        return q
-
-    def decode(self, text: str) -> str:
-        # 在树中对text中的01串进行解码
-        root: TreeNode = self.rootnode
-        result = ""
-        for i in text:
-            if i == '0':
-                root = root.lchild
-            elif i == '1':
-                root = root.rchild
-            elif i == '\n':  # 紧凑格式中的'\n'需忽略
-                continue
-            else:
-                return None
-            if root.name:
-                result += root.name
-                root = self.rootnode
-        if root != self.rootnode:
-            return None
-        else:
-            return result
-
-    def printTree(self, filename=None):
-        # 生成树的图片
-        dot = Digraph(comment="生成的树")
-        dot.attr('node', fontname="STXinwei", shape='circle', fontsize="20")
-        for i, j in enumerate(self.nodes):
-            if j.name == '' or not j.name:
-                dot.node(str(i), '')
-            elif j.name == ' ':
-                dot.node(str(i), '[ ]')  # 空格显示为'[ ]'
-            elif j.name == '\n':
-                dot.node(str(i), '\\\\n')  # 换行符显示为'\n' 转义 此处的还会被调用，因此需要四个斜杠
-            elif j.name == '\t':
-                dot.node(str(i), '\\\\t')  # 制表符显示为'\t'
-            else:
-                dot.node(str(i), j.name)
-        dot.attr('graph', rankdir='LR')
-        for i in self.nodes[::-1]:
-            if not (i.rchild or i.lchild):
-                break
-            if i.lchild:
-                dot.edge(str(self.nodes.index(i)), str(
-                    self.nodes.index(i.lchild)), '0', constraint='true')
-            if i.rchild:
-                dot.edge(str(self.nodes.index(i)), str(
-                    self.nodes.index(i.rchild)), '1', constraint='true')
-        
-        dot.render(filename, view=False, format='svg', cleanup=True)
-
-
-def checkDecodedText(text: str) -> bool:
-    # 检查密文内容的合法性
-    for i in text:
-        if i not in ['0', '1', '\n']:
-            return False
-    return True
+        self.edit.clear()
+        self.text = text
+        self.timer.start()
 
+    def step(self):
+        cursor = QTextCursor(self.edit.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(self.text[self.pos:self.pos+self.CHUNK])
+        self.pos += self.CHUNK
+        if self.pos >= len(self.text):
+            self.timer.stop()
+            self.text, self.pos = '', 0
+
+    def plainText(self) -> str:
+        # 文本框的完整内容，写入尚未完成时返回正在写入的全文
+        return self.text if self.timer.isActive() else self.edit.toPlainText()
 
-rawTextEdit: QTextEdit = None  # 原文所在的文本框
-encodedTextEdit: QTextEdit = None  # 密文所在文本框
-HFTree: HuffmanTree = None  # 哈夫曼树
-CharacterSet = {}  # 字符集
-showSVGWidget: "ShowSVGWidget" = None  # 显示svg的控件
-paintTreeWindow:"PaintTreeWindow"=None
-charsetWindow:"CharsetWindow"=None
 
 class MainWindow(QWidget):
-    encodedTextEdit: QTextEdit
+    encodedTextEdit: QPlainTextEdit
+    painted: bool = False  # 是否已完成首次绘制
+    worker: CodingWorker = None  # 正在执行的后台任务
 
     def __init__(self):
         super().__init__()
-        loadUi("ui/main.ui", self)  # 加载了窗体中的各个控件
+        setupUi(self, 'main')  # 加载了窗体中的各个控件
         self.setWindowIcon(QIcon("ui/icon.ico"))
         global rawTextEdit
         rawTextEdit = self.rawTextEdit
         global encodedTextEdit
         encodedTextEdit = self.encodedTextEdit
+        global rawTextLoader, encodedTextLoader
+        rawTextLoader = TextLoader(self.rawTextEdit)
+        encodedTextLoader = TextLoader(self.encodedTextEdit)
+        self.progressBar.hide()
+        self.cancelButton.hide()
+        self.cancelButton.clicked.connect(self.cancelWork)
         self.rawSaveFileButton.clicked.connect(self.saveRawTextContent)
         self.encodedSaveFileButton.clicked.connect(self.saveEncodedTextContent)
         self.rawOpenFileButton.clicked.connect(self.encodeFileReadin)
@@ -174,85 +238,140 @@ class MainWindow(QWidget):
         filePath, ok = QFileDialog.getSaveFileName(self, '选择文件')
         if ok:
             with open(filePath, 'w', encoding='utf-8') as file:
-                file.write(self.rawTextEdit.toPlainText())
+                file.write(rawTextLoader.plainText())
 
     def saveEncodedTextContent(self):
-        if not checkDecodedText(self.encodedTextEdit.toPlainText()):
+        if not checkDecodedText(encodedTextLoader.plainText()):
             QMessageBox.critical(self, "错误", "存在无效字符", QMessageBox.Ok)
             return
-        filePath, ok = QFileDialog.getSaveFileName(self, '选择文件')
-        if ok:
-            with open(filePath, 'w', encoding='utf-8') as file:
-                file.write(self.encodedTextEdit.toPlainText())
+        filePath, fileType = QFileDialog.getSaveFileName(
+            self, '选择文件', '', '文本格式 (*.txt);;二进制格式 (*.hfm)')
+        if filePath:
+            if fileType.startswith('二进制') or filePath.endswith('.hfm'):
+                # 二进制格式需带上当前的树，以便读入时直接还原
+                if not HFTree:
+                    QMessageBox.critical(self, "错误", "当前无建好的树", QMessageBox.Ok)
+                    return
+                with open(filePath, 'wb') as file:
+                    file.write(HFTree.pack(encodedTextLoader.plainText()))
+            else:
+                with open(filePath, 'w', encoding='utf-8') as file:
+                    file.write(encodedTextLoader.plainText())
 
     def encodeFileReadin(self):
         filePath, ok = QFileDialog.getOpenFileName(self, '选择文件')
         if ok:
-            with open(filePath, 'r', encoding='utf-8') as file:
+            with open(filePath, 'r', encoding='utf-8') as file, metrics.timer('read', bytes=os.path.getsize(filePath)):
                 try:
                     text = file.read()
                 except UnicodeDecodeError:
                     QMessageBox.critical(
                         self, "错误", "请确保打开的是UTF-8编码的文本文件", QMessageBox.Ok)
                     return
-            self.rawTextEdit.setText(text)
+            rawTextLoader.load(text)
 
     def decodeFileReadin(self):
         filePath, ok = QFileDialog.getOpenFileName(self, '选择文件')
         if ok:
-            with open(filePath, 'r', encoding='utf-8') as file:
-                try:
-                    encodedTextEdit = file.read()
-                except UnicodeDecodeError:
-                    QMessageBox.critical(
-                        self, "错误", "请确保打开的是UTF-8编码的文本文件", QMessageBox.Ok)
+            with open(filePath, 'rb') as file, metrics.timer('read', bytes=os.path.getsize(filePath)):
+                data = file.read()
+            if data.startswith(MAGIC):
+                # 二进制格式，文件头中带有树，读入后替换当前的树
+                unpacked = unpack(data)
+                if not unpacked or not unpacked[0].codebook:
+                    QMessageBox.critical(self, "错误", "文件已损坏", QMessageBox.Ok)
                     return
+                global HFTree, CharacterSet
+                HFTree, encodedTextEdit = unpacked
+                CharacterSet = HFTree.characterset
+                if showSVGWidget:
+                    paintTreeWindow.renderTree()
+                encodedTextLoader.load(encodedTextEdit)
+                return
+            try:
+                encodedTextEdit = normalizeNewlines(data.decode('utf-8'))
+            except UnicodeDecodeError:
+                QMessageBox.critical(
+                    self, "错误", "请确保打开的是UTF-8编码的文本文件", QMessageBox.Ok)
+                return
             if not checkDecodedText(encodedTextEdit):
                 QMessageBox.critical(self, "错误", "存在无效字符", QMessageBox.Ok)
                 return
-            self.encodedTextEdit.setText(encodedTextEdit)
+            encodedTextLoader.load(encodedTextEdit)
+
+    def startWorker(self, done, job, *args):
+        # 在后台线程中执行job，期间显示进度条与取消按钮；完成且未取消时在界面线程中调用done(结果)
+        self.worker = CodingWorker(lambda worker: job(worker, *args), self)
+        self.worker.progressSign.connect(self.progressBar.setValue)
+        self.worker.resultSign.connect(done)
+        self.worker.finished.connect(self.workerFinished)
+        self.setBusy(True)
+        self.worker.start()
+
+    def workerFinished(self):
+        self.worker.deleteLater()
+        self.worker = None
+        self.setBusy(False)
+
+    def cancelWork(self):
+        if self.worker:
+            self.worker.requestInterruption()
+
+    def setBusy(self, busy: bool):
+        # 后台任务执行期间禁用编码、译码与紧凑格式按钮
+        for i in (self.encodedButton, self.decodeButton, self.compactFormatButton):
+            i.setEnabled(not busy)
+        self.progressBar.setValue(0)
+        self.progressBar.setVisible(busy)
+        self.cancelButton.setVisible(busy)
 
     def compactFormPrint(self):
-        Text = self.encodedTextEdit.toPlainText()
-        text = ''
-        m = 50
-        for i in Text.replace('\n', ''):
-            text += i
-            m -= 1
-            if m == 0:
-                text += '\n'
-                m = 50
-        self.encodedTextEdit.setPlainText(text)
+        self.startWorker(encodedTextLoader.load, compactJob, encodedTextLoader.plainText())
 
     def encoding(self):
+        text = rawTextLoader.plainText()
         if not HFTree:
             QMessageBox.critical(self, "错误", "当前无建好的树", QMessageBox.Ok)
-        elif rawTextEdit.toPlainText() == '':
+        elif text == '':
             QMessageBox.critical(self, "错误", "请输入原文", QMessageBox.Ok)
         else:
-            t = HFTree.encode(rawTextEdit.toPlainText())
-            if not t:
-                QMessageBox.critical(self, "错误", "存在无效字符", QMessageBox.Ok)
-                return
-            self.encodedTextEdit.setText(t)
+            self.startWorker(self.encoded, encodeJob, HFTree, text)
+
+    def encoded(self, t: str):
+        if not t:
+            QMessageBox.critical(self, "错误", "存在无效字符", QMessageBox.Ok)
+            return
+        encodedTextLoader.load(t)
 
     def decoding(self):
+        bits = encodedTextLoader.plainText()
         if not HFTree:
             QMessageBox.critical(self, "错误", "当前无建好的树", QMessageBox.Ok)
-        elif self.encodedTextEdit.toPlainText() == '':
+        elif bits == '':
             QMessageBox.critical(self, "错误", "请输入密文", QMessageBox.Ok)
         else:
-            t = HFTree.decode(self.encodedTextEdit.toPlainText())
-            if not t:
-                QMessageBox.critical(self, "错误", "存在无效字符", QMessageBox.Ok)
-                return
-            self.rawTextEdit.setText(t)
+            self.startWorker(self.decoded, decodeJob, HFTree, bits)
+
+    def decoded(self, t: str):
+        if not t:
+            QMessageBox.critical(self, "错误", "存在无效字符", QMessageBox.Ok)
+            return
+        rawTextLoader.load(t)
+
+    def paintEvent(self, a0: QtGui.QPaintEvent) -> None:
+        super().paintEvent(a0)
+        if not self.painted:
+            self.painted = True
+            recordStartup('firstPaint')
+            if '--startup-time' in sys.argv:
+                # 输出启动各阶段的耗时(JSON)后退出，供benchmarks/bench_startup.py测量
+                print(json.dumps(startupTimes), flush=True)
+                QTimer.singleShot(0, QApplication.quit)
 
     def closeEvent(self, a0: QtGui.QCloseEvent) -> None:
-        try:
-            os.remove("tmp.svg")
-        except FileNotFoundError:
-            pass
+        if self.worker:  # 等后台任务在当前段结束后退出
+            self.worker.requestInterruption()
+            self.worker.wait()
         sys.exit()
 
 
@@ -278,19 +397,120 @@ class OneCharDelegate(QItemDelegate):
         return edit
 
 
+class CharsetModel(QAbstractTableModel):
+    # 字符集表格的数据模型：字符与字频分别存放在列表与double数组中，整表载入时只通知视图一次
+    # 按字符与按字频查找使用哈希索引，数据改动后索引作废，下次查找时重建
+    chars: List[str] = None  # 各行的字符，空行为''
+    weights: array = None  # 各行的字频，空行为nan
+    charIndex: Dict[str, List[int]] = None  # 字符->所在行，为None时需重建
+    weightIndex: Dict[float, List[int]] = None  # 字频->所在行
+    HEADERS = ('字符', '频数')
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.chars = []
+        self.weights = array('d')
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.chars)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else 2
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        if index.column() == 0:
+            return self.chars[index.row()]
+        weight = self.weights[index.row()]
+        return '' if math.isnan(weight) else str(weight)
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index: QModelIndex):
+        return super().flags(index) | Qt.ItemIsEditable
+
+    def setData(self, index: QModelIndex, value, role=Qt.EditRole) -> bool:
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        if index.column() == 0:
+            self.chars[index.row()] = value
+        else:
+            try:
+                self.weights[index.row()] = float(value)
+            except ValueError:
+                return False
+        self.charIndex = self.weightIndex = None
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def load(self, characterset: Dict[str, float]):
+        # 整表替换为characterset
+        self.beginResetModel()
+        self.chars = list(characterset)
+        self.weights = array('d', characterset.values())
+        self.charIndex = self.weightIndex = None
+        self.endResetModel()
+
+    def appendRow(self):
+        # 在末尾加入一空行
+        self.beginInsertRows(QModelIndex(), len(self.chars), len(self.chars))
+        self.chars.append('')
+        self.weights.append(math.nan)
+        self.charIndex = self.weightIndex = None
+        self.endInsertRows()
+
+    def removeRows(self, row: int, count: int, parent=QModelIndex()) -> bool:
+        if row < 0 or count <= 0 or row+count > len(self.chars):
+            return False
+        self.beginRemoveRows(parent, row, row+count-1)
+        del self.chars[row:row+count]
+        del self.weights[row:row+count]
+        self.charIndex = self.weightIndex = None
+        self.endRemoveRows()
+        return True
+
+    def characterset(self) -> Dict[str, float]:
+        # 表中字符与字频都已填写的行组成的字符集，字符重复时以后一行为准
+        return {i: j for i, j in zip(self.chars, self.weights) if i and not math.isnan(j)}
+
+    def find(self, char: str = None, weight: float = None) -> int:
+        # 返回字符为char且(或)字频为weight的第一行，未找到时返回-1
+        if self.charIndex is None:
+            self.charIndex, self.weightIndex = {}, {}
+            for i, (c, w) in enumerate(zip(self.chars, self.weights)):
+                self.charIndex.setdefault(c, []).append(i)
+                self.weightIndex.setdefault(w, []).append(i)
+        if char and weight is not None:
+            rows = [i for i in self.charIndex.get(char, []) if self.weights[i] == weight]
+        elif char:
+            rows = self.charIndex.get(char, [])
+        elif weight is not None:
+            rows = self.weightIndex.get(weight, [])
+        else:
+            rows = []
+        return rows[0] if rows else -1
+
+
 class CharsetWindow(QWidget):
-    tableWidget: QTableWidget
+    tableView: QTableView
+    model: CharsetModel = None
 
     def __init__(self):
         super().__init__()
-        loadUi("ui/charset.ui", self)
-        self.tableWidget.setItemDelegateForColumn(0, OneCharDelegate(self))
-        self.tableWidget.setItemDelegateForColumn(1, DoubleDelegate(self))
+        setupUi(self, 'charset')
+        self.model = CharsetModel(self)
+        self.tableView.setModel(self.model)
+        self.tableView.setItemDelegateForColumn(0, OneCharDelegate(self))
+        self.tableView.setItemDelegateForColumn(1, DoubleDelegate(self))
         self.setWindowIcon(QIcon("ui/icon.ico"))
         self.addButton.clicked.connect(self.add)
         self.findButton.clicked.connect(self.find)
         self.deleteButton.clicked.connect(
-            lambda: self.tableWidget.removeRow(self.tableWidget.currentRow()))
+            lambda: self.model.removeRows(self.tableView.currentIndex().row(), 1))
         self.inputWordFrequencyButton.clicked.connect(self.importWordFrequency)
         self.saveButton.clicked.connect(self.saveWordFrequency)
         self.generateButton.clicked.connect(
@@ -304,55 +524,36 @@ class CharsetWindow(QWidget):
 
     def showEvent(self, e):
         if HFTree:  # 如果存在树，就根据现有的树生成字符集
-            self.tableWidget.clearContents()
-            self.tableWidget.setRowCount(0)
             global CharacterSet
-            for i, j in CharacterSet.items():
-                self.add()
-                item1 = QTableWidgetItem(i)
-                item2 = QTableWidgetItem(str(j))
-                self.tableWidget.setItem(
-                    self.tableWidget.rowCount()-1, 0, item1)
-                self.tableWidget.setItem(
-                    self.tableWidget.rowCount()-1, 1, item2)
+            self.model.load(CharacterSet)
 
     def add(self):
         # 加入一空行
-        self.tableWidget.insertRow(self.tableWidget.rowCount())
+        self.model.appendRow()
 
     def find(self):
         # 对于字符或字频或字符与字频进行查找
         a: str = self.wordFrequencyEdit.text()
         b: str = self.frequencyEdit.text()
-        i: int = 0
-        if a and b:
-            while i < self.tableWidget.rowCount():
-                if self.tableWidget.item(i, 0).text() == a and self.tableWidget.item(i, 1).text() == b:
-                    self.resultLabel.setText(str(i+1))
-                    break
-                i += 1
-        elif not a and b:
-            while i < self.tableWidget.rowCount():
-                if self.tableWidget.item(i, 1).text() == b:
-                    self.resultLabel.setText(str(i+1))
-                    break
-                i += 1
-        elif a and not b:
-            while i < self.tableWidget.rowCount():
-                if self.tableWidget.item(i, 0) and self.tableWidget.item(i, 0).text() == a:
-                    self.resultLabel.setText(str(i+1))
-                    break
-                i += 1
-        if i == self.tableWidget.rowCount():
+        try:
+            weight = float(b) if b else None
+        except ValueError:
+            weight = None
+        if not a and weight is None:
+            return
+        i = self.model.find(a, weight)
+        if i < 0:
             self.resultLabel.setText("未找到")
+            return
+        self.resultLabel.setText(str(i+1))
+        self.tableView.selectRow(i)
+        self.tableView.scrollTo(self.model.index(i, 0))
 
     def importWordFrequency(self):
         # 导入字频
         filePath, ok = QFileDialog.getOpenFileName(self, '选择文件')
         if ok:
-            self.tableWidget.clearContents()
-            self.tableWidget.setRowCount(0)
-            with open(filePath, 'r', encoding='utf-8') as file:
+            with open(filePath, 'r', encoding='utf-8') as file, metrics.timer('read', bytes=os.path.getsize(filePath)):
                 try:
                     frequency = file.read()
                 except UnicodeDecodeError:
@@ -361,94 +562,65 @@ class CharsetWindow(QWidget):
                     return
             global CharacterSet
             CharacterSet = {}
+            self.model.load({})
             textlines = re.findall(r'([\s\S])\t(\S+)(\n|$)', frequency)
             if len(textlines) == 0:
                 QMessageBox.critical(self, "错误", "字符集生成失败", QMessageBox.Ok)
                 return
-            for i, j, _ in textlines:
-                try:
-                    CharacterSet[i] = float(j)
-                except ValueError:
-                    QMessageBox.critical(
-                        self, "错误", "字符集生成失败", QMessageBox.Ok)
-                    self.tableWidget.clearContents()
-                    self.tableWidget.setRowCount(0)
-                    CharacterSet = {}
-                    return
-                self.add()
-                item1 = QTableWidgetItem(i)
-                item2 = QTableWidgetItem(j)
-                self.tableWidget.setItem(
-                    self.tableWidget.rowCount()-1, 0, item1)
-                self.tableWidget.setItem(
-                    self.tableWidget.rowCount()-1, 1, item2)
+            try:
+                CharacterSet = {i: float(j) for i, j, _ in textlines}
+            except ValueError:
+                QMessageBox.critical(
+                    self, "错误", "字符集生成失败", QMessageBox.Ok)
+                return
+            self.model.load(CharacterSet)
 
     def saveWordFrequency(self):
         # 保存文件
         filePath, ok = QFileDialog.getSaveFileName(self, '选择文件')
         if ok:
             with open(filePath, 'w', encoding='utf-8') as file:
-                for i in range(self.tableWidget.rowCount()):
-                    m = '\t'.join([self.tableWidget.item(
-                        i, 0).text(), self.tableWidget.item(i, 1).text()])
-                    file.write(m+'\n')
+                file.write(''.join(i+'\t'+str(j)+'\n' for i, j in self.model.characterset().items()))
 
     def generateCharacterSetFromRawtext(self):
         # 根据原文生成字符集
-        self.tableWidget.clearContents()
-        self.tableWidget.setRowCount(0)
-        def getFrequency(text: str) -> dict:
-            # 字频(统计)
-            cnt = {}
-            for i in text:
-                if i not in cnt:
-                    cnt[i] = 1
-                else:
-                    cnt[i] += 1
-            return cnt
-        CharacterSet = getFrequency(rawTextEdit.toPlainText())
-        for i, j in CharacterSet.items():
-            self.add()
-            item1 = QTableWidgetItem(i)
-            item2 = QTableWidgetItem(str(j))
-            self.tableWidget.setItem(self.tableWidget.rowCount()-1, 0, item1)
-            self.tableWidget.setItem(self.tableWidget.rowCount()-1, 1, item2)
+        self.model.load(getFrequency(rawTextLoader.plainText()))
 
     def closeEvent(self, event):
         # 关闭窗体
-        if self.tableWidget.rowCount() == 0:
+        if self.model.rowCount() == 0:
             return
         global CharacterSet
-        CharacterSet = {}
         # 将表格中的字符集存入变量CharacterSet中
-        for i in range(self.tableWidget.rowCount()):
-            if self.tableWidget.item(i, 0) and self.tableWidget.item(i, 1):
-                try:
-                    CharacterSet[self.tableWidget.item(i, 0).text()] = float(
-                        self.tableWidget.item(i, 1).text())
-                except:
-                    pass
+        CharacterSet = self.model.characterset()
         global HFTree
         # 将树依据现有的字符集进行更新
         if CharacterSet != {}:
-            HFTree = HuffmanTree(CharacterSet)
+            # 字符集与之前建过的相同时直接取缓存中的树
+            HFTree = treeCache.build(CharacterSet, canonical=True)
             global showSVGWidget
             if showSVGWidget:
-                HFTree.printTree('tmp')
-                showSVGWidget.update()
-                paintTreeWindow.printInform()
+                paintTreeWindow.renderTree()
 
 
 class NetTransportWindow(QWidget):
     s: socket.socket = None
+    store: CodebookStore = None  # 码表库，无法创建时为None，此时总是发送完整的树
+    offered: OrderedDict = None  # 已向对方提供编号、尚未收到答复的树，编号->树帧内容，收到HAVE或WANT后删除
     lineEdit: QLineEdit  # 服务端端口输入框
     connectIpEditText: QLineEdit  # 客户端IP输入框
     connectPortEditText: QLineEdit  # 客户端端口输入框
     setEncodedTextSign = pyqtSignal(str)  # 修改的密文框信号
+    appendRawTextSign = pyqtSignal(str, bool)  # 流式接收时追加原文的信号，第二个参数表示是否为第一段
 
     def __init__(self):
         super().__init__()
-        loadUi("ui/network.ui", self)
+        setupUi(self, 'network')
+        try:
+            self.store = CodebookStore()
+        except OSError:
+            self.store = None
+        self.offered = OrderedDict()
         self.setWindowIcon(QIcon("ui/icon.ico"))
         # 查看本机IP
         self.showIpButton.clicked.connect(lambda: QMessageBox.information(self, '查看本机IP', socket.gethostbyname(
@@ -457,7 +629,9 @@ class NetTransportWindow(QWidget):
         self.connectButton.clicked.connect(self.buildClientConnection)
         self.sendTreeButton.clicked.connect(self.sendTree)
         self.sendTextButton.clicked.connect(self.sendText)
+        self.sendStreamButton.clicked.connect(self.sendStream)
         self.setEncodedTextSign.connect(self.setEncodedText)
+        self.appendRawTextSign.connect(self.appendRawText)
         self.breakButton.clicked.connect(self.breakConnection)
         # 服务器端端口号输入限制
         self.lineEdit.setValidator(QRegExpValidator(QRegExp(
@@ -536,11 +710,20 @@ class NetTransportWindow(QWidget):
         if not CharacterSet or not HFTree:
             QMessageBox.critical(self, "错误", "当前树为空", QMessageBox.Ok)
             return
-        content = 't'  # 发送树的标志
-        for i, j in CharacterSet.items():
-            content += i+"\t"+str(j)+'\n'
-        # 将其转化为Byte进行发送
-        self.s.sendall(content.encode())
+        # 以分帧的二进制格式发送，范式编码只需发送码长
+        payload = packTreeFrame(HFTree)
+        if self.store:
+            # 先只发送编号，对方没有这棵树时会回复WANT，届时再发送完整的树
+            key = self.store.put(payload)
+            self.offered[key] = payload
+            while len(self.offered) > MAX_OFFERED:  # 对方一直不答复时不让编号无限累积
+                try:
+                    self.offered.popitem(last=False)
+                except KeyError:  # 接收线程恰好删去了最后一项
+                    break
+            sendFrame(self.s, FRAME_OFFER, key.encode())
+        else:
+            sendFrame(self.s, FRAME_TREE, payload)
         QMessageBox.information(self, "提示", "发送成功", QMessageBox.Ok)
 
     def sendText(self):
@@ -548,58 +731,133 @@ class NetTransportWindow(QWidget):
         if not self.s:
             QMessageBox.critical(self, "错误", "请先建立连接", QMessageBox.Ok)
             return
-        global encodedTextEdit
-        content = encodedTextEdit.toPlainText()
+        content = encodedTextLoader.plainText()
         if not checkDecodedText(content):
             QMessageBox.critical(self, "错误", "存在无效字符", QMessageBox.Ok)
             return
-        self.s.sendall(('c'+content).encode())
+        # 按位压缩后以分帧的二进制格式发送
+        sendFrame(self.s, FRAME_TEXT, packTextFrame(content))
         QMessageBox.information(self, "提示", "发送成功", QMessageBox.Ok)
 
+    def sendStream(self):
+        # 边编码边发送原文，接收端边收边译，无需等待整篇编码或传输完成
+        if not self.s:
+            QMessageBox.critical(self, "错误", "请先建立连接", QMessageBox.Ok)
+            return
+        if not HFTree or not HFTree.codebook:
+            QMessageBox.critical(self, "错误", "当前树为空", QMessageBox.Ok)
+            return
+        content = rawTextLoader.plainText()
+        if not set(content) <= HFTree.codebook.keys():
+            QMessageBox.critical(self, "错误", "存在字符集以外的字符", QMessageBox.Ok)
+            return
+        self.stateLabel.setText("正在发送")
+        # 在新线程中编码与发送，防止界面阻塞
+        threading.Thread(target=self.streamText, args=[self.s, HFTree, content], daemon=True).start()
+
+    def streamText(self, s: socket.socket, tree: HuffmanTree, content: str):
+        try:
+            sendTextStream(s, tree, iterChunks(content))
+        except OSError:
+            return
+        self.stateLabel.setText("发送完成")
+
+    def appendRawText(self, text, first):
+        # 将流式接收并译出的一段原文追加到原文框末尾
+        global rawTextEdit
+        if first:
+            rawTextLoader.load('')
+        cursor = rawTextEdit.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+
     def setEncodedText(self, text):
         # 将接收到的密文输入到文本框中
-        global encodedTextEdit
-        encodedTextEdit.setText(text)
+        encodedTextLoader.load(text)
 
     def waitRecv(self, s: socket.socket):
-        # 等待接受线程
+        # 等待接受线程，按帧重组收到的数据后再处理
+        streaming = False  # 是否处于一次流式传输之中
+        waiting = None  # 已请求但尚未收到的树的编号
+        pending = []  # 等待树到达期间收到的流式密文帧，树到达后再译
         try:
-            while True:
-                data = s.recv(10000000)
-                # 将内容转变为str类型
-                data = data.decode()
-                if data[0] == 't':
-                    data = data[1:]
-                    textlines = re.findall(r'([\s\S])\t(\S+)(\n|$)', data)
-                    global CharacterSet
-                    CharacterSet = {}
-                    for i, j, _ in textlines:
-                        try:
-                            CharacterSet[i] = float(j)
-                        except ValueError:
-                            self.stateLabel.setText("接收到无用数据")
-                            self.tableWidget.clearContents()
-                            self.tableWidget.setRowCount(0)
-                            CharacterSet = {}
-                            return
-                    global HFTree
-                    if CharacterSet != {}:
-                        HFTree = HuffmanTree(CharacterSet)
+            for frameType, payload in recvFrames(s):
+                global CharacterSet, HFTree
+                if frameType == FRAME_OFFER:
+                    # 对方提供树的编号，码表库中有则直接使用，否则请求完整的树
+                    key = payload.decode('ascii', 'replace')
+                    tree = self.store.load(key) if self.store else None
+                    if tree and tree.codebook:
+                        HFTree = tree
+                        CharacterSet = HFTree.characterset
+                        sendFrame(s, FRAME_HAVE, payload)
+                        self.stateLabel.setText("已有此树")
+                    else:
+                        waiting = key
+                        sendFrame(s, FRAME_WANT, payload)
+                        self.stateLabel.setText("正在接收树")
+                elif frameType == FRAME_HAVE:
+                    self.offered.pop(payload.decode('ascii', 'replace'), None)
+                    self.stateLabel.setText("对方已有此树")
+                elif frameType == FRAME_WANT:
+                    treePayload = self.offered.pop(payload.decode('ascii', 'replace'), None)
+                    if treePayload:
+                        sendFrame(s, FRAME_TREE, treePayload)
+                        self.stateLabel.setText("已发送完整的树")
+                elif frameType == FRAME_TREE:
+                    tree = treeCache.get(dataFingerprint(payload), lambda: parseTreeFrame(payload))
+                    if tree and tree.codebook:
+                        HFTree = tree
+                        CharacterSet = HFTree.characterset
+                        if self.store:
+                            self.store.put(payload)
                         self.stateLabel.setText("已收到树")
                     else:
                         self.stateLabel.setText("收到空树")
-                elif data[0] == 'c':
+                    if waiting:
+                        # 补译等待期间收到的密文
+                        waiting = None
+                        for i in pending:
+                            streaming = self.recvStream(*i, streaming)
+                        pending = []
+                elif frameType == FRAME_TEXT:
+                    bits = parseTextFrame(payload)
+                    if bits is None:
+                        self.stateLabel.setText("接收到无用数据")
+                        continue
                     self.stateLabel.setText("已收到密文")
-                    data = data[1:]
-                    self.setEncodedTextSign.emit(data)
+                    self.setEncodedTextSign.emit(bits)
+                elif frameType in (FRAME_CHUNK, FRAME_END):
+                    if waiting:
+                        pending.append((frameType, payload))
+                    else:
+                        streaming = self.recvStream(frameType, payload, streaming)
                 else:
                     self.stateLabel.setText("接收到无用数据")
+            if self.s is s:  # 对方关闭连接
+                self.stateLabel.setText("连接断开")
+                self.s = None
         except ConnectionResetError:  # 对方断开
             self.stateLabel.setText("连接断开")
             self.s = None
         except ConnectionAbortedError:  # 自己断开
             pass
 
+    def recvStream(self, frameType: int, payload: bytes, streaming: bool) -> bool:
+        # 处理流式传输的密文帧与结束帧，译出的原文追加到原文框；返回此后是否仍处于流式传输之中
+        if frameType == FRAME_END:
+            self.stateLabel.setText("接收完成" if payload == b'\x00' else "对方中止发送")
+            return False
+        # 每段密文由完整的码字组成，收到即可译码
+        bits = parseTextFrame(payload)
+        text = HFTree.decode(bits) if bits is not None and HFTree else None
+        if text is None:
+            self.stateLabel.setText("密文无法译码")
+            return streaming
+        self.stateLabel.setText("正在接收")
+        self.appendRawTextSign.emit(text, not streaming)
+        return True
+
     def breakConnection(self):
         # 断开连接按钮事件
         try:
@@ -615,33 +873,85 @@ class PaintTreeWindow(QWidget):
     height: int = 0
     CharacterSet = {}
     paintingLayout: QVBoxLayout
+    svgReadySign = pyqtSignal(str, bytes)  # 后台画好树的信号，(图片的编号, svg)
+    svgFailedSign = pyqtSignal(str, str)  # 后台画树出错的信号，(图片的编号, 错误信息)
+    renderingKey: str = None  # 最近一次要求显示的图片的编号，较早的画图结果到达时丢弃
+    resetView: bool = False  # 换了树后尚未显示过新图，显示时需复位位置与缩放
+    treeKey: str = None  # 当前所画的树的编号
+    expanded: set = None  # 细节层次中由用户展开的摘要节点(前缀)
+    collapsed: list = None  # 最近一次要求显示的图片中折叠的节点(前缀)
 
     def __init__(self):
         super().__init__()
-        loadUi("ui/tree.ui", self)
+        setupUi(self, 'tree')
         self.setWindowIcon(QIcon("ui/icon.ico"))
-        self.findCodeButton.clicked.connect(charsetWindow.show)
+        self.findCodeButton.clicked.connect(lambda: getCharsetWindow().show())
         self.saveButton.clicked.connect(self.savetree)
         self.loadButton.clicked.connect(self.importtree)
         global showSVGWidget
         showSVGWidget = ShowSVGWidget(self)
         self.paintingLayout.addWidget(showSVGWidget)
+        self.svgReadySign.connect(self.showSvg)
+        self.svgFailedSign.connect(self.showRenderError)
+        showSVGWidget.expandSign.connect(self.expand)
+        self.expanded = set()
 
     def showEvent(self, e):
         # 打开时刷新树的图片
         if not HFTree:
             QMessageBox.critical(self, "错误", "当前无建好的树", QMessageBox.Ok)
+        elif self.treeKey != codebookId(HFTree):  # 树在别处被替换(如从网络收到)
+            self.renderTree()
+
+    def renderTree(self):
+        # 画当前的树：画过的直接取缓存，否则在后台线程中画好后经信号交给界面线程显示，界面不会卡住
+        # 字符较多时启用细节层次，较深或较轻的子树折叠为摘要节点，双击摘要节点再展开
+        tree = HFTree
+        treeKey = codebookId(tree)
+        if treeKey != self.treeKey:  # 同一棵树展开节点时保持当前的位置与缩放
+            self.treeKey = treeKey
+            self.expanded = set()
+            self.resetView = True
+        collapsed = []
+        if len(tree.codebook) > tree.LOD_LEAVES:
+            collapsed = tree.collapsedPrefixes(tree.LOD_DEPTH, sum(tree.characterset.values())*tree.LOD_WEIGHT,
+                                               self.expanded)
+        key = dataFingerprint('\n'.join([treeKey]+collapsed).encode())
+        self.renderingKey = key
+        self.collapsed = collapsed
+        self.printInform()  # 将树的信息写在面板上
+        if key in svgCache:
+            self.showSvg(key, svgCache.get(key, lambda: tree.renderSvg(collapsed)))
+            return
+        threading.Thread(target=self.renderInBackground, args=[key, tree, collapsed], daemon=True).start()
+
+    def renderInBackground(self, key: str, tree: HuffmanTree, collapsed: list):
+        # 后台线程中画树，结果或错误都经信号交给界面线程
+        try:
+            svg = svgCache.get(key, lambda: tree.renderSvg(collapsed))
+        except Exception as e:  # 未安装graphviz、找不到dot程序或dot运行出错等，都需告知用户
+            self.svgFailedSign.emit(key, '%s: %s' % (type(e).__name__, e))
+            return
+        self.svgReadySign.emit(key, svg)
+
+    def showRenderError(self, key: str, message: str):
+        if key == self.renderingKey:
+            QMessageBox.critical(self, "错误", "画树失败，请确认已安装graphviz\n" + message, QMessageBox.Ok)
+
+    def showSvg(self, key: str, svg: bytes):
+        # 是否复位视图记在resetView中，后台画好的图经信号到达时同样适用
+        if key == self.renderingKey:
+            showSVGWidget.setSvg(svg, ['n'+i for i in self.collapsed], not self.resetView)
+            self.resetView = False
+
+    def expand(self, prefix: str):
+        # 展开一个摘要节点
+        self.expanded.add(prefix)
+        self.renderTree()
 
     def TreeDepth(self, pRoot: HuffmanTree):
-        # 计算树的深度
-        def currentTreeDepth(pRoot: TreeNode):
-            if pRoot is None:
-                return 0
-            if pRoot.lchild or pRoot.rchild:
-                return max(currentTreeDepth(pRoot.lchild), currentTreeDepth(pRoot.rchild))+1
-            else:
-                return 1
-        return currentTreeDepth(pRoot.rootnode)
+        # 计算树的深度(层数)，即最长码长加一
+        return pRoot.depth()+1
 
     def printInform(self):
         # 更新树的信息
@@ -653,48 +963,98 @@ class PaintTreeWindow(QWidget):
         # 将树的信息导入到图片中
         filePath, ok = QFileDialog.getOpenFileName(self, '选择文件')
         if ok:
-            with open(filePath, 'r', encoding='utf-8') as file:
+            with open(filePath, 'r', encoding='utf-8') as file, metrics.timer('read', bytes=os.path.getsize(filePath)):
                 try:
                     text = file.read()
                 except UnicodeDecodeError:
                     QMessageBox.critical(
                         self, "错误", "请确保打开的是UTF-8编码的文本文件", QMessageBox.Ok)
                     return
-            global CharacterSet
-            CharacterSet = self.CharacterSet
-            textlines = re.findall(r'([\s\S])\t(\S+)\t\S+(\n|$)', text)
-            # 导入后重置字符集信息，并更新内存中的树
-            for i, j, _ in textlines:
-                CharacterSet[i] = float(j)
-            global HFTree
-            if CharacterSet != {}:
-                HFTree = HuffmanTree(CharacterSet)
-                global showSVGWidget
-                HFTree.printTree('tmp')
-                showSVGWidget.update()
-                self.printInform()  # 将树的信息写在面板上
+            # 导入后重置字符集信息，并直接用文件中的编码更新内存中的树，无需重新建树
+            tree = treeCache.get(dataFingerprint(text.encode()), lambda: readTree(text))
+            global CharacterSet, HFTree
+            if tree:
+                HFTree = tree
+                CharacterSet = HFTree.characterset
+                self.renderTree()
 
     def savetree(self):
         # 保存树的信息
         filePath, ok = QFileDialog.getSaveFileName(self, '选择文件')
         if ok:
             with open(filePath, 'w', encoding='utf-8') as file:
-                for i, j in HFTree.characterset.items():
-                    m = '\t'.join([i, str(j), HFTree.encode(i)])
-                    file.write(m+'\n')
+                file.write(dumpTree(HFTree))
+
+
+class StatsWindow(QWidget):
+    # 运行统计面板：各阶段的次数、耗时、字节数、字符数与吞吐量，打开期间定时刷新
+    statsTable: QTableWidget
+    profileBox: QComboBox  # 要分析的阶段
+    REFRESH_INTERVAL = 1000  # 刷新间隔(毫秒)
+
+    def __init__(self):
+        super().__init__()
+        setupUi(self, 'stats')
+        self.setWindowIcon(QIcon("ui/icon.ico"))
+        self.statsTable.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        for stage, name in STAGES.items():
+            self.profileBox.addItem(name, stage)
+        self.profileBox.currentIndexChanged.connect(self.refresh)
+        self.profileButton.clicked.connect(lambda: metrics.profileNext(self.profileBox.currentData()))
+        self.resetButton.clicked.connect(self.reset)
+        self.saveButton.clicked.connect(self.saveJson)
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.REFRESH_INTERVAL)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, e):
+        self.refresh()
+        self.timer.start()
+
+    def hideEvent(self, e):
+        self.timer.stop()
+
+    def refresh(self):
+        stats = metrics.snapshot()
+        self.statsTable.setRowCount(len(stats))
+        for row, (stage, record) in enumerate(stats.items()):
+            values = [STAGES.get(stage, stage), str(record['count']), '%.4f' % record['seconds'],
+                      str(record['bytes']), str(record['symbols']), '%.2f' % (record['bytesPerSecond']/2**20),
+                      '%.0f' % record['symbolsPerSecond']]
+            for column, value in enumerate(values):
+                self.statsTable.setItem(row, column, QTableWidgetItem(value))
+        # 显示所选阶段最近一次的分析报告
+        report = metrics.profiles.get(self.profileBox.currentData(), '')
+        if report != self.profileEdit.toPlainText():
+            self.profileEdit.setPlainText(report)
+
+    def reset(self):
+        metrics.reset()
+        self.refresh()
+
+    def saveJson(self):
+        filePath, _ = QFileDialog.getSaveFileName(self, '选择文件', '', 'JSON (*.json)')
+        if filePath:
+            with open(filePath, 'w', encoding='utf-8') as file:
+                file.write(metrics.toJson())
 
 
 class ShowSVGWidget(QWidget):
     # 自定义控件，显示svg图片
-    leftClick: bool
-    svgrender: QSvgRenderer
+    leftClick: bool = False
+    svgrender: "QSvgRenderer"
     defaultSize: QSizeF
     point: QPoint
     scale = 1
+    pixmap: QPixmap = None  # 按当前缩放比例画好的整张图
+    summaries: list = ()  # 图中摘要节点的id
+    expandSign = pyqtSignal(str)  # 双击摘要节点时发出，参数为该节点的前缀
+    MAX_PIXELS = 1 << 24  # pixmap的最大像素数
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
+        from PyQt5.QtSvg import QSvgRenderer  # 仅画树时需要，不拖慢启动
         # 构造一张空白的svg图像
         self.svgrender = QSvgRenderer(
             b'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 0 0"  width="512pt" height="512pt"></svg>')
@@ -702,23 +1062,60 @@ class ShowSVGWidget(QWidget):
         self.defaultSize = QSizeF(self.svgrender.defaultSize())
         self.point = QPoint(0, 0)
         self.scale = 1
-
-    def update(self):
-        # 更新图片
-        self.svgrender = QSvgRenderer("tmp.svg")
+        # 缩放停止一段时间后再按新比例重画pixmap
+        self.renderTimer = QTimer(self)
+        self.renderTimer.setSingleShot(True)
+        self.renderTimer.setInterval(150)
+        self.renderTimer.timeout.connect(self.renderPixmap)
+
+    def setSvg(self, svg: bytes, summaries: list = (), keepView: bool = False):
+        # 更新图片，summaries为图中摘要节点的id
+        from PyQt5.QtSvg import QSvgRenderer
+        self.svgrender = QSvgRenderer(QByteArray(svg))
         self.defaultSize = QSizeF(self.svgrender.defaultSize())
-        self.point = QPoint(0, 0)
-        self.scale = 1
+        self.summaries = summaries
+        if not keepView:
+            self.point = QPoint(0, 0)
+            self.scale = 1
+        self.renderPixmap()
+
+    def renderPixmap(self):
+        # 按当前缩放比例把整张图画到pixmap上，之后拖动时只需贴图；图过大时不缓存，直接画svg
+        size = (self.defaultSize*self.scale).toSize()
+        if size.isEmpty() or size.width()*size.height() > self.MAX_PIXELS:
+            self.pixmap = None
+        else:
+            self.pixmap = QPixmap(size)
+            self.pixmap.fill(Qt.transparent)
+            painter = QPainter(self.pixmap)
+            self.svgrender.render(painter, QRectF(QPointF(0, 0), QSizeF(size)))
+            painter.end()
         self.repaint()
 
     def paintEvent(self, a0: QtGui.QPaintEvent) -> None:
         # 绘画事件(回调函数)
         painter = QPainter()  # 画笔
         painter.begin(self)
-        self.svgrender.render(painter, QRectF(
-            self.point, self.defaultSize*self.scale))  # svg渲染器来进行绘画，(画笔，QRectF(位置，大小))(F表示float)
+        target = QRectF(QPointF(self.point), self.defaultSize*self.scale)
+        if self.pixmap:
+            # 缩放过程中先拉伸已有的pixmap，停止缩放后再按新比例重画
+            painter.drawPixmap(target, self.pixmap, QRectF(self.pixmap.rect()))
+        else:
+            self.svgrender.render(painter, target)  # svg渲染器来进行绘画，(画笔，QRectF(位置，大小))(F表示float)
         painter.end()
 
+    def mouseDoubleClickEvent(self, a0: QtGui.QMouseEvent) -> None:
+        # 双击摘要节点时将其展开
+        if a0.button() != Qt.LeftButton or not self.summaries:
+            return
+        viewBox = self.svgrender.viewBoxF()
+        ratio = viewBox.width()/self.defaultSize.width() if self.defaultSize.width() else 1
+        pos = viewBox.topLeft()+(QPointF(a0.pos())-QPointF(self.point))/self.scale*ratio
+        for i in self.summaries:
+            if self.svgrender.matrixForElement(i).mapRect(self.svgrender.boundsOnElement(i)).contains(pos):
+                self.expandSign.emit(i[1:])
+                return
+
     def mouseMoveEvent(self, a0: QtGui.QMouseEvent) -> None:
         # 鼠标移动事件(回调函数)
         if self.leftClick:
@@ -751,20 +1148,24 @@ class ShowSVGWidget(QWidget):
                 self.scale *= 0.9
         self.point = a0.pos()-(self.scale/oldScale*(a0.pos()-self.point))
         self.repaint()
+        self.renderTimer.start()
 
 
-# if __name__ == '__main__':
-multiprocessing.freeze_support()
-app = QApplication(sys.argv)
-mainWindow = MainWindow()
-charsetWindow = CharsetWindow()
-nettansportWindow = NetTransportWindow()
-paintTreeWindow = PaintTreeWindow()
-mainWindow.show()
-mainWindow.editFrequencyButton.clicked.connect(charsetWindow.show)
-mainWindow.networkTransportButton.clicked.connect(nettansportWindow.show)
-mainWindow.paintTreeButton.clicked.connect(paintTreeWindow.show)
-sys.exit(app.exec_())
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    if '--compile-ui' in sys.argv:
+        compileUi()
+        sys.exit()
+    recordStartup('import')
+    app = QApplication(sys.argv)
+    mainWindow = MainWindow()
+    recordStartup('mainWindow')
+    mainWindow.show()
+    mainWindow.editFrequencyButton.clicked.connect(lambda: getCharsetWindow().show())
+    mainWindow.networkTransportButton.clicked.connect(lambda: getNetTransportWindow().show())
+    mainWindow.paintTreeButton.clicked.connect(lambda: getPaintTreeWindow().show())
+    mainWindow.statsButton.clicked.connect(lambda: getStatsWindow().show())
+    sys.exit(app.exec_())
 
 # 打包命令:①有点问题 pyinstaller -F 哈夫曼编译码器.py --workpath C:\Users\admin\Desktop\哈夫曼编译码器\源文件  --distpath C:\Users\admin\Desktop\哈夫曼编译码器 --icon="ui\mainicon.ico" --noconsole
         # ② cxfreeze .\Huffman_decoding_device.py --base-name=win32gui --icon='ui/mainicon.ico'
\ No newline at end of file
@@ -0,0 +1,40 @@
+# 建树耗时测试：对比双队列建树与旧版线性查找建树
+# 用法: python benchmarks/bench_build.py
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from huffman_core import HuffmanTree  # noqa: E402
+
+SIZES = [100, 1000, 10000, 100000]
+SELECT_LIMIT = 10000  # 旧版建树为O(n²)，超过此规模不再测试
+
+
+def makeCharacterSet(n: int, seed: int = 0) -> dict:
+    # 生成n个字符的字符集，字频服从近似齐夫分布(取自CJK扩展区，避开代理区)
+    rng = random.Random(seed)
+    return {chr(0x20000+i): float(max(1, int(100000/(i+1)*rng.uniform(0.5, 1.5))))
+            for i in range(n)}
+
+
+def timeit(func, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter()-start)
+    return best
+
+
+if __name__ == '__main__':
+    print('%10s %14s %14s' % ('字符数', 'queue(s)', 'select(s)'))
+    for n in SIZES:
+        characterset = makeCharacterSet(n)
+        q = timeit(lambda: HuffmanTree(characterset))
+        if n <= SELECT_LIMIT:
+            s = '%14.4f' % timeit(lambda: HuffmanTree(characterset, 'select'), 1)
+        else:
+            s = '%14s' % '-'
+        print('%10d %14.4f %s' % (n, q, s))
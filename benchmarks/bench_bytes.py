@@ -0,0 +1,42 @@
+# 字节模式吞吐量测试：对比NumPy向量化与逐字符编译码，单位MB/s
+# 用法: python benchmarks/bench_bytes.py [数据MB数]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import huffman_bytes  # noqa: E402
+from huffman_bytes import buildByteTree, byteFrequency, encodeBytes, decodeBytes  # noqa: E402
+
+
+def makeData(size: int, seed: int = 0) -> bytes:
+    # 生成字节值服从几何分布的数据(类似可执行文件中0字节居多)，先生成256KB的块再重复
+    rng = random.Random(seed)
+    block = bytes(min(255, int(rng.expovariate(0.03))) for _ in range(1 << 18))
+    return (block*(size//len(block)+1))[:size]
+
+
+def timeit(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter()-start, result
+
+
+if __name__ == '__main__':
+    size = int(float(sys.argv[1] if len(sys.argv) > 1 else 16)*(1 << 20))
+    data = makeData(size)
+    tree = buildByteTree(byteFrequency(data))
+    vectorized = huffman_bytes.numpy
+    print('数据 %.1f MB，码长上限 %d，树深 %d' % (size/2**20, huffman_bytes.BYTE_MAX_LENGTH, tree.depth()))
+    for name, backend in (('NumPy向量化', vectorized), ('逐字符', None)):
+        if name == 'NumPy向量化' and vectorized is None:
+            print('%-12s 未安装NumPy，跳过' % name)
+            continue
+        huffman_bytes.numpy = backend
+        encodeTime, (payload, bitLength) = timeit(lambda: encodeBytes(tree, data))
+        decodeTime, result = timeit(lambda: decodeBytes(tree, payload, bitLength))
+        assert result == data
+        print('%-12s 编码 %8.1f MB/s  译码 %8.1f MB/s  压缩率 %.3f' % (
+            name, size/encodeTime/2**20, size/decodeTime/2**20, len(payload)/size))
+    huffman_bytes.numpy = vectorized
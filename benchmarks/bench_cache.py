@@ -0,0 +1,34 @@
+# 树缓存测试：在几个反复出现的字符集之间来回切换，对比每次重新建树与使用缓存的耗时
+# 用法: python benchmarks/bench_cache.py
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from huffman_core import HuffmanTree  # noqa: E402
+from huffman_cache import TreeCache  # noqa: E402
+
+ROUNDS = 30
+
+
+def makeCharsets(count: int, alphabet: int):
+    return [{chr(0x4e00+i): float(max(1, int(1000000/(i+k+1)))) for i in range(alphabet)} for k in range(count)]
+
+
+def switch(build, charsets, sample: str) -> float:
+    # 每次切换后建树并译一小段密文，译码表在首次译码时建立，计入耗时
+    start = time.perf_counter()
+    for i in range(ROUNDS):
+        characterset = charsets[i % len(charsets)]
+        tree = build(characterset)
+        tree.decode(tree.encode(sample))
+    return time.perf_counter()-start
+
+
+if __name__ == '__main__':
+    charsets = makeCharsets(3, 5000)
+    sample = ''.join(list(charsets[0])[:100])
+    cold = switch(lambda c: HuffmanTree(c, canonical=True), charsets, sample)
+    cache = TreeCache(4)
+    warm = switch(lambda c: cache.build(c, canonical=True), charsets, sample)
+    print('切换 %d 次  重新建树 %8.1f ms  使用缓存 %8.1f ms  %s' % (ROUNDS, cold*1000, warm*1000, cache.stats()))
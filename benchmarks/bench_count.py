@@ -0,0 +1,58 @@
+# 字频统计吞吐量测试：对比读入全文后getFrequency、分片统计(单进程/多进程)与按字节统计，单位GB/s
+# 用法: python benchmarks/bench_count.py [文件MB数]
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from huffman_core import getFrequency  # noqa: E402
+import huffman_count  # noqa: E402
+from huffman_count import countFile  # noqa: E402
+
+
+def makeFile(path: str, size: int, alphabet: int = 3000, seed: int = 0):
+    # 生成服从齐夫分布的CJK文本，先生成1MB左右的块再重复写入，避免生成数据本身耗时过长
+    rng = random.Random(seed)
+    population = [chr(0x4e00+i) for i in range(alphabet)]+['\n', ' ']
+    weights = [1/(i+1) for i in range(alphabet)]+[0.05, 0.1]
+    block = ''.join(rng.choices(population, weights, k=1 << 18)).encode()
+    with open(path, 'wb') as file:
+        for _ in range(size//len(block)+1):
+            file.write(block)
+
+
+def timeit(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter()-start, result
+
+
+def readAll(path: str) -> dict:
+    with open(path, 'r', encoding='utf-8') as file:
+        return getFrequency(file.read().replace('\r\n', '\n'))
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    size = int(sys.argv[1] if len(sys.argv) > 1 else 256) << 20
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'corpus.txt')
+        makeFile(path, size)
+        size = os.path.getsize(path)
+        print('文件 %.1f MB，NumPy %s，CPU核数 %d' % (size/2**20, '可用' if huffman_count.numpy else '不可用',
+                                                os.cpu_count()))
+        reference = None
+        for name, func in (('读入全文 getFrequency', lambda: readAll(path)),
+                           ('分片统计 1个进程', lambda: countFile(path, 1)),
+                           ('分片统计 %d个进程' % os.cpu_count(), lambda: countFile(path, None)),
+                           ('按字节统计 1个进程', lambda: countFile(path, 1, byteMode=True)),
+                           ('按字节统计 %d个进程' % os.cpu_count(), lambda: countFile(path, None, byteMode=True))):
+            elapsed, result = timeit(func)
+            if reference is None:
+                reference = result
+            elif '字节' not in name:
+                assert result == reference
+            print('%-24s %8.3f s  %8.3f GB/s' % (name, elapsed, size/elapsed/1e9))
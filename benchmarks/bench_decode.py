@@ -0,0 +1,42 @@
+# 译码吞吐量测试：对比多位查表译码与逐位走树译码
+# 用法: python benchmarks/bench_decode.py
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from huffman_core import HuffmanTree  # noqa: E402
+
+ALPHABETS = [64, 1000, 10000]
+TEXT_LENGTH = 200000
+
+
+def makeCharacterSet(n: int) -> dict:
+    # 生成n个字符的字符集，字频服从齐夫分布
+    return {chr(0x4e00+i): float(max(1, int(1000000/(i+1)))) for i in range(n)}
+
+
+def timeit(func, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter()-start)
+    return best
+
+
+if __name__ == '__main__':
+    rng = random.Random(0)
+    print('%8s %6s %14s %14s %8s' % ('字符数', '树深', 'table(Mbit/s)', 'walk(Mbit/s)', '加速比'))
+    for n in ALPHABETS:
+        characterset = makeCharacterSet(n)
+        tree = HuffmanTree(characterset)
+        text = ''.join(rng.choices(list(characterset), list(characterset.values()), k=TEXT_LENGTH))
+        encoded = tree.encode(text)
+        assert tree.decode(encoded) == tree.decodeBitwise(encoded) == text
+        tree.buildDecodeTable()
+        t1 = timeit(lambda: tree.decode(encoded))
+        t2 = timeit(lambda: tree.decodeBitwise(encoded))
+        print('%8d %6d %14.2f %14.2f %8.2f' % (n, tree.depth(), len(encoded)/t1/1e6,
+                                               len(encoded)/t2/1e6, t2/t1))
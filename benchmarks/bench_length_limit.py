@@ -0,0 +1,53 @@
+# 码长上限的代价：对比不同码长上限下的平均码长(压缩率)与译码表大小
+# 用法: python benchmarks/bench_length_limit.py
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from huffman_core import HuffmanTree  # noqa: E402
+
+LIMITS = [None, 32, 24, 20, 18, 17, 16, 14, 12]
+
+
+def zipf(n: int) -> dict:
+    return {chr(0x20000+i): float(max(1, int(1e9/(i+1)**1.1))) for i in range(n)}
+
+
+def skewed(n: int) -> dict:
+    # 字频接近斐波那契数列，无限制时树深接近字符数
+    return {chr(0x20000+i): float(int(1.3**min(i, 80))+1) for i in range(n)}
+
+
+def tableEntries(table: tuple) -> int:
+    # 译码表(含所有子表)的表项总数
+    count = 0
+    stack = [table]
+    while stack:
+        width, entries, _ = stack.pop()
+        count += len(entries)
+        stack.extend(sub for _, _, sub in entries.values() if sub)
+    return count
+
+
+def averageLength(tree: HuffmanTree, characterset: dict) -> float:
+    total = sum(characterset.values())
+    return sum(len(tree.codebook[i])*j for i, j in characterset.items())/total
+
+
+if __name__ == '__main__':
+    for name, characterset in [('zipf-50000', zipf(50000)), ('skewed-2000', skewed(2000))]:
+        print(name)
+        print('%8s %6s %12s %10s %12s %10s' % ('上限', '树深', '平均码长', '代价', '译码表项数', '建树(s)'))
+        base = None
+        for limit in LIMITS:
+            if limit and (1 << limit) < len(characterset):
+                continue
+            start = time.perf_counter()
+            tree = HuffmanTree(characterset, canonical=True, maxLength=limit)
+            elapsed = time.perf_counter()-start
+            tree.buildDecodeTable()
+            avg = averageLength(tree, characterset)
+            base = base or avg
+            print('%8s %6d %12.4f %9.3f%% %12d %10.3f' % (limit or '不限', tree.depth(), avg,
+                                                         (avg/base-1)*100, tableEntries(tree.decodeTable), elapsed))
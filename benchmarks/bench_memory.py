@@ -0,0 +1,60 @@
+# 树的内存占用测试：对比旧版带__dict__的节点对象、__slots__节点对象与数组形式，单位为每个节点的字节数
+# 用法: python benchmarks/bench_memory.py [字符数]
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_build import makeCharacterSet  # noqa: E402
+from huffman_core import HuffmanTree  # noqa: E402
+
+
+class LegacyNode:
+    # 旧版的节点：普通对象，每个实例带一个__dict__
+    parent: 'LegacyNode' = None
+    lchild: 'LegacyNode' = None
+    rchild: 'LegacyNode' = None
+    weight: float = None
+    name: str = None
+
+    def __init__(self, name=None, weight=None) -> None:
+        self.name = name
+        self.weight = weight
+
+
+def traced(func):
+    # 返回(结果, func执行期间新分配且仍存活的字节数)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = func()
+        return result, tracemalloc.get_traced_memory()[0]-before
+    finally:
+        tracemalloc.stop()
+
+
+def legacyNodes(tree: HuffmanTree) -> list:
+    # 按数组中的结构生成旧版节点，与旧版建树后的self.nodes相同
+    nodes = [LegacyNode(tree.symbols[i] if i < len(tree.symbols) else None, tree.weights[i])
+             for i in range(len(tree.lefts))]
+    for node, left, right, parent in zip(nodes, tree.lefts, tree.rights, tree.parents):
+        if left >= 0:
+            node.lchild = nodes[left]
+        if right >= 0:
+            node.rchild = nodes[right]
+        if parent >= 0:
+            node.parent = nodes[parent]
+    return nodes
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    tree = HuffmanTree(makeCharacterSet(n), canonical=True)
+    size = len(tree.lefts)
+    arrays = sum(sys.getsizeof(i) for i in (tree.lefts, tree.rights, tree.parents, tree.weights, tree.symbols))
+    _, legacy = traced(lambda: legacyNodes(tree))
+    _, slots = traced(lambda: tree.nodes)
+    print('字符数 %d，节点数 %d' % (n, size))
+    print('%-22s %10.1f 字节/节点' % ('旧版节点对象(__dict__)', legacy/size))
+    print('%-22s %10.1f 字节/节点' % ('__slots__节点对象', slots/size))
+    print('%-22s %10.1f 字节/节点' % ('数组', arrays/size))
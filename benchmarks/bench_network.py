@@ -0,0 +1,68 @@
+# 本机回环网络吞吐量测试：分帧协议下发送树(sendTree)与发送密文(sendText)的速度
+# 用法: python benchmarks/bench_network.py
+import os
+import random
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from huffman_core import HuffmanTree  # noqa: E402
+from huffman_net import (FRAME_TREE, FRAME_TEXT, sendFrame, recvFrames, packTreeFrame,  # noqa: E402
+                         parseTreeFrame, packTextFrame, parseTextFrame)
+
+ROUNDS = 5
+
+
+def makeText(n: int, alphabet: int, seed: int = 0):
+    rng = random.Random(seed)
+    characterset = {chr(0x4e00+i): float(max(1, int(1000000/(i+1)))) for i in range(alphabet)}
+    return characterset, ''.join(rng.choices(list(characterset), list(characterset.values()), k=n))
+
+
+def loopback():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen()
+    client = socket.create_connection(server.getsockname())
+    peer = server.accept()[0]
+    server.close()
+    return client, peer
+
+
+def measure(name: str, frameType: int, pack, parse, count: int, rawBytes: int):
+    # 发送端打包并发送count帧，接收端重组并解析，计时从打包开始到最后一帧解析完成
+    client, peer = loopback()
+    done = threading.Event()
+    wire = [0]
+
+    def receiver():
+        received = 0
+        for frameType, payload in recvFrames(peer):
+            wire[0] += len(payload)
+            assert parse(payload) is not None
+            received += 1
+            if received == count:
+                break
+        done.set()
+
+    threading.Thread(target=receiver, daemon=True).start()
+    start = time.perf_counter()
+    for _ in range(count):
+        sendFrame(client, frameType, pack())
+    done.wait()
+    elapsed = time.perf_counter()-start
+    client.close()
+    peer.close()
+    print('%-10s 帧大小 %8.2f MB  原始 %8.1f MB/s  线上 %8.1f MB/s' % (
+        name, wire[0]/count/1e6, rawBytes*count/elapsed/1e6, wire[0]/elapsed/1e6))
+
+
+if __name__ == '__main__':
+    characterset, text = makeText(2000000, 5000)
+    tree = HuffmanTree(characterset, canonical=True)
+    bits = tree.encode(text)
+    rawTree = len(''.join(i+'\t'+str(j)+'\n' for i, j in characterset.items()).encode())
+    measure('sendTree', FRAME_TREE, lambda: packTreeFrame(tree), parseTreeFrame, ROUNDS*20, rawTree)
+    measure('sendText', FRAME_TEXT, lambda: packTextFrame(bits), parseTextFrame, ROUNDS, len(bits))
@@ -0,0 +1,46 @@
+# 并行编译码加速比测试：对比单进程与不同进程数下的分段并行编译码
+# 用法: python benchmarks/bench_parallel.py [字符数]
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from huffman_core import HuffmanTree, decodeFromBytes  # noqa: E402
+from huffman_parallel import encodeParallel, decodeParallel  # noqa: E402
+
+
+def makeText(n: int, alphabet: int = 3000, seed: int = 0):
+    # 生成服从齐夫分布的CJK文本及其字符集
+    rng = random.Random(seed)
+    characterset = {chr(0x4e00+i): float(max(1, int(1000000/(i+1)))) for i in range(alphabet)}
+    text = ''.join(rng.choices(list(characterset), list(characterset.values()), k=n))
+    return characterset, text
+
+
+def timeit(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter()-start
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 8000000
+    characterset, text = makeText(n)
+    tree = HuffmanTree(characterset, canonical=True)
+    mb = len(text.encode())/1e6
+    data = tree.encodeToBytes(text)
+    encodeSerial = timeit(lambda: tree.encodeToBytes(text))
+    decodeSerial = timeit(lambda: decodeFromBytes(data))
+    print('原文 %.1f MB，CPU核数 %d' % (mb, os.cpu_count()))
+    print('%6s %12s %8s %12s %8s' % ('进程数', '编码(MB/s)', '加速比', '译码(MB/s)', '加速比'))
+    print('%6s %12.1f %8.2f %12.1f %8.2f' % ('单进程', mb/encodeSerial, 1, mb/decodeSerial, 1))
+    processes = 1
+    while processes <= os.cpu_count():
+        encoded = encodeParallel(tree, text, processes=processes)
+        e = timeit(lambda: encodeParallel(tree, text, processes=processes))
+        d = timeit(lambda: decodeParallel(encoded, processes))
+        print('%6d %12.1f %8.2f %12.1f %8.2f' % (processes, mb/e, encodeSerial/e, mb/d, decodeSerial/d))
+        processes *= 2
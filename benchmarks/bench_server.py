@@ -0,0 +1,88 @@
+# 编译码服务的压力测试：多个并发连接各自发送树后连续发送编码/译码请求，统计每秒请求数与延迟分位数
+# 用法: python benchmarks/bench_server.py [--clients 128] [--requests 50] [--size 200] [--connect host:port]
+# 不指定--connect时在子进程中启动huffman_server.py
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from huffman_core import HuffmanTree  # noqa: E402
+from huffman_net import (FRAME_TREE, FRAME_TEXT, FRAME_ENCODE, FRAME_DECODE, FRAME_PLAIN,  # noqa: E402
+                         packTreeFrame, packTextFrame)
+from huffman_server import readFrame, writeFrame  # noqa: E402
+
+
+def makeCorpus(size: int, count: int, alphabet: int = 3000, seed: int = 0):
+    # 生成服从齐夫分布的字符集及count条长为size的请求原文
+    rng = random.Random(seed)
+    characterset = {chr(0x4e00+i): float(max(1, int(1000000/(i+1)))) for i in range(alphabet)}
+    population, weights = list(characterset), list(characterset.values())
+    return characterset, [''.join(rng.choices(population, weights, k=size)) for _ in range(count)]
+
+
+async def client(host: str, port: int, tree: HuffmanTree, texts, encoded, latencies: list, firsts: list):
+    # 每个连接按 编码、译码 交替发送请求，收到应答后再发下一个；首个请求需等服务端建好树，单独统计
+    reader, writer = await asyncio.open_connection(host, port)
+    await writeFrame(writer, FRAME_TREE, packTreeFrame(tree))
+    for i, text in enumerate(texts):
+        if i % 2 == 0:
+            request, expect = (FRAME_ENCODE, text.encode()), FRAME_TEXT
+        else:
+            request, expect = (FRAME_DECODE, encoded[i]), FRAME_PLAIN
+        start = time.perf_counter()
+        await writeFrame(writer, *request)
+        frame = await readFrame(reader)
+        (latencies if i else firsts).append(time.perf_counter()-start)
+        assert frame and frame[0] == expect, frame
+    writer.close()
+
+
+async def run(host: str, port: int, clients: int, requests: int, size: int):
+    characterset, texts = makeCorpus(size, requests)
+    tree = HuffmanTree(characterset, canonical=True)
+    encoded = [packTextFrame(tree.encode(i)) for i in texts]
+    latencies, firsts = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, tree, texts, encoded, latencies, firsts) for _ in range(clients)))
+    elapsed = time.perf_counter()-start
+    print('%d 个连接 x %d 个请求 (每个 %d 字)' % (clients, requests, size))
+    print('吞吐量 %10.1f 请求/秒' % ((len(latencies)+len(firsts))/elapsed))
+    for title, values in (('后续请求', latencies), ('首个请求(含建树)', firsts)):
+        values.sort()
+        print(title, '  '.join('%s %.2f ms' % (name, values[min(len(values)-1, int(len(values)*q))]*1000)
+                               for name, q in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='编译码服务压力测试')
+    parser.add_argument('--clients', type=int, default=128)
+    parser.add_argument('--requests', type=int, default=50, help='每个连接的请求数')
+    parser.add_argument('--size', type=int, default=200, help='每个请求的字符数')
+    parser.add_argument('--connect', help='已启动的服务地址 host:port')
+    args = parser.parse_args()
+    server = None
+    if args.connect:
+        host, port = args.connect.rsplit(':', 1)
+    else:
+        # 码表库放在临时目录中，测试结束后删除，不影响用户的码表库
+        storeDir = tempfile.TemporaryDirectory()
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'huffman_server.py'), '--host', '127.0.0.1',
+                                   '--port', '0', '--store', storeDir.name], stdout=subprocess.PIPE, text=True)
+        host, port = server.stdout.readline().split()[-1].rsplit(':', 1)
+    try:
+        asyncio.run(run(host, int(port), args.clients, args.requests, args.size))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+            storeDir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+# 图形界面启动耗时测试：多次冷启动Huffman_decoding_device.py，统计从开始导入到主窗体首次绘制的毫秒数
+# 用法: python benchmarks/bench_startup.py [--runs 10] [--limit 毫秒]
+# 超过--limit时以状态码1退出，可用于检查启动是否变慢；默认使用offscreen平台，无需显示器
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def startOnce(env: dict) -> dict:
+    # 启动一次，返回各阶段距开始导入的毫秒数，另加上含解释器启动在内的总耗时total
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, 'Huffman_decoding_device.py', '--startup-time'], cwd=ROOT, env=env,
+                            stdout=subprocess.PIPE, check=True, timeout=60).stdout
+    times = json.loads(output.decode().strip().splitlines()[-1])
+    times['total'] = round((time.perf_counter()-start)*1000, 1)
+    return times
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--limit', type=float, help='首次绘制耗时中位数的上限(毫秒)')
+    args = parser.parse_args()
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    compiled = glob.glob(os.path.join(ROOT, 'ui', 'ui_*.py'))
+    print('预编译界面 %s，平台 %s' % ('%d个' % len(compiled) if compiled else '无', env['QT_QPA_PLATFORM']))
+    runs = [startOnce(env) for _ in range(args.runs)]
+    for stage in ('import', 'mainWindow', 'firstPaint', 'total'):
+        values = [i[stage] for i in runs]
+        print('%-12s 中位数 %8.1f ms  最小 %8.1f ms  最大 %8.1f ms' % (
+            stage, statistics.median(values), min(values), max(values)))
+    median = statistics.median(i['firstPaint'] for i in runs)
+    if args.limit is not None and median > args.limit:
+        print('首次绘制耗时 %.1f ms 超过上限 %.1f ms' % (median, args.limit))
+        sys.exit(1)
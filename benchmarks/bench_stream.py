@@ -0,0 +1,69 @@
+# 整篇发送与边编码边发送的对比：接收端译出第一个字符的时间(首字时间)与全部译完的时间
+# 整篇发送时先编码全文再发送一帧，接收端收齐后整篇译码；流式发送时首字时间应与文档大小无关
+# 用法: python benchmarks/bench_stream.py
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from huffman_core import HuffmanTree  # noqa: E402
+from huffman_net import (FRAME_TEXT, sendFrame, recvFrames, packTextFrame, parseTextFrame,  # noqa: E402
+                         iterChunks, sendTextStream, recvTextStream)
+from bench_network import makeText, loopback  # noqa: E402
+
+SIZES = [100000, 1000000, 4000000]
+
+
+def whole(tree: HuffmanTree, text: str):
+    client, peer = loopback()
+    result = {}
+
+    def receiver():
+        for _, payload in recvFrames(peer):
+            decoded = tree.decode(parseTextFrame(payload))
+            result['first'] = result['last'] = time.perf_counter()
+            assert decoded == text
+            break
+
+    thread = threading.Thread(target=receiver, daemon=True)
+    thread.start()
+    start = time.perf_counter()
+    sendFrame(client, FRAME_TEXT, packTextFrame(tree.encode(text)))
+    thread.join()
+    client.close()
+    peer.close()
+    return result['first']-start, result['last']-start
+
+
+def stream(tree: HuffmanTree, text: str):
+    client, peer = loopback()
+    result = {}
+    parts = []
+
+    def write(decoded):
+        result.setdefault('first', time.perf_counter())
+        parts.append(decoded)
+
+    def receiver():
+        assert recvTextStream(peer, tree, write)
+        result['last'] = time.perf_counter()
+
+    thread = threading.Thread(target=receiver, daemon=True)
+    thread.start()
+    start = time.perf_counter()
+    assert sendTextStream(client, tree, iterChunks(text))
+    thread.join()
+    client.close()
+    peer.close()
+    assert ''.join(parts) == text
+    return result['first']-start, result['last']-start
+
+
+if __name__ == '__main__':
+    characterset, text = makeText(max(SIZES), 5000)
+    tree = HuffmanTree(characterset, canonical=True)
+    for n in SIZES:
+        for name, run in (('整篇发送', whole), ('流式发送', stream)):
+            first, last = run(tree, text[:n])
+            print('%8d 字  %s  首字 %8.1f ms  完成 %8.1f ms' % (n, name, first*1000, last*1000))
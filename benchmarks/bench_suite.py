@@ -0,0 +1,176 @@
+# 综合基准测试：对均匀分布、齐夫分布、CJK为主与二进制四类合成语料，在多种规模下测量HuffmanTree的
+# 建树、编码、译码、序列化(打包/解包)与本机回环网络传输的吞吐量(MB/s，按原文字节数计)及压缩率，
+# 并与保存的基线比较，吞吐量低于基线超过容差或压缩率变差时以状态码1退出；没有基线文件时同样以状态码1退出
+# 只有不少于GATE_MIN_SIZE个字符的规模与GATED_STAGES中的阶段参与吞吐量的比较，规模太小的项及回环网络传输
+# 受调度与系统负载影响，波动常超过容差，只列出而不判为退步；压缩率与机器无关，各项都参与比较
+# 用法: python benchmarks/bench_suite.py [--sizes 4096 65536 1048576] [--repeat 3] [--tolerance 0.3]
+#       python benchmarks/bench_suite.py --update   (以本次结果更新基线)
+# 语料由固定的随机种子生成，每次运行完全相同；吞吐量与机器有关，换机器后需先--update
+import argparse
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from huffman_core import HuffmanTree, getFrequency, unpack  # noqa: E402
+from huffman_net import iterChunks, sendTextStream, recvTextStream  # noqa: E402
+
+BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+SIZES = [1 << 12, 1 << 16, 1 << 20]  # 各语料的字符数
+BLOCK = 1 << 18  # 语料先生成这么多字符再重复，避免生成本身耗时过长
+STAGES = ['build', 'encode', 'decode', 'pack', 'unpack', 'network']
+GATED_STAGES = ['build', 'encode', 'decode', 'pack', 'unpack']  # 参与吞吐量比较的阶段
+GATE_MIN_SIZE = 1 << 16  # 参与吞吐量比较的最小规模(字符数)
+MIN_SECONDS = 0.2  # 每项累计运行的最短时间
+
+
+def uniformCorpus():
+    # 64个可打印ASCII字符均匀分布
+    population = [chr(0x30+i) for i in range(64)]
+    return population, None
+
+
+def zipfCorpus():
+    # 可打印ASCII字符与换行，字频服从齐夫分布
+    population = [chr(0x20+i) for i in range(95)]+['\n']
+    return population, [1/(i+1) for i in range(len(population))]
+
+
+def cjkCorpus():
+    # 3000个常用汉字(齐夫分布)加少量标点与换行
+    population = [chr(0x4e00+i) for i in range(3000)]+['，', '。', '\n']
+    return population, [1/(i+1) for i in range(3000)]+[0.08, 0.04, 0.02]
+
+
+def binaryCorpus():
+    # 字节值服从几何分布(类似可执行文件中0字节居多)，字节b记为字符chr(b)
+    population = [chr(i) for i in range(256)]
+    return population, [0.97**i for i in range(256)]
+
+
+CORPORA = {'uniform': uniformCorpus, 'zipf': zipfCorpus, 'cjk': cjkCorpus, 'binary': binaryCorpus}
+
+
+def makeCorpus(name: str, size: int, seed: int = 0):
+    # 返回(原文, 原文字节数)，二进制语料按每字符1字节计，其余按UTF-8计
+    rng = random.Random(seed)
+    population, weights = CORPORA[name]()
+    block = ''.join(rng.choices(population, weights, k=min(size, BLOCK)))
+    text = (block*(size//len(block)+1))[:size]
+    return text, len(text) if name == 'binary' else len(text.encode())
+
+
+def best(func, repeat: int):
+    # 至少运行repeat次且累计不少于MIN_SECONDS，取最短的耗时，返回(耗时, 最后一次的结果)
+    # 规模小的项因此会多跑几次，结果更稳定
+    elapsed = float('inf')
+    total = 0
+    count = 0
+    while count < repeat or total < MIN_SECONDS:
+        start = time.perf_counter()
+        result = func()
+        once = time.perf_counter()-start
+        elapsed = min(elapsed, once)
+        total += once
+        count += 1
+    return elapsed, result
+
+
+def transfer(tree: HuffmanTree, text: str) -> str:
+    # 经本机回环连接边编码边发送，接收端边收边译，返回译文
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen()
+    client = socket.create_connection(server.getsockname())
+    peer = server.accept()[0]
+    server.close()
+    received = []
+    thread = threading.Thread(target=lambda: recvTextStream(peer, tree, received.append), daemon=True)
+    thread.start()
+    try:
+        sendTextStream(client, tree, iterChunks(text))
+        thread.join()
+    finally:
+        client.close()
+        peer.close()
+    return ''.join(received)
+
+
+def measure(text: str, rawBytes: int, repeat: int) -> dict:
+    # 各阶段的吞吐量(MB/s)及压缩率(打包后字节数/原文字节数)
+    times = {}
+    times['build'], tree = best(lambda: HuffmanTree(getFrequency(text), canonical=True), repeat)
+    times['encode'], bits = best(lambda: tree.encode(text), repeat)
+    times['decode'], decoded = best(lambda: tree.decode(bits), repeat)
+    times['pack'], packed = best(lambda: tree.pack(bits), repeat)
+    times['unpack'], unpacked = best(lambda: unpack(packed), repeat)
+    times['network'], received = best(lambda: transfer(tree, text), repeat)
+    assert decoded == text and unpacked[1] == bits and received == text
+    result = {i: rawBytes/times[i]/2**20 for i in STAGES}
+    result['ratio'] = len(packed)/rawBytes
+    return result
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    # 返回退步的项，吞吐量低于基线的(1-tolerance)倍或压缩率高于基线时算作退步；吞吐量只比较规模与阶段均参与比较的项
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if not reference:
+            continue
+        gated = GATED_STAGES if int(key.rsplit('/', 1)[1]) >= GATE_MIN_SIZE else []
+        for stage in gated:
+            if stage in reference and result[stage] < reference[stage]*(1-tolerance):
+                regressions.append('%s %s: %.2f MB/s，基线 %.2f MB/s' % (key, stage, result[stage], reference[stage]))
+        if 'ratio' in reference and result['ratio'] > reference['ratio']+1e-9:
+            regressions.append('%s 压缩率: %.4f，基线 %.4f' % (key, result['ratio'], reference['ratio']))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='各语料的字符数')
+    parser.add_argument('--corpora', nargs='+', choices=list(CORPORA), default=list(CORPORA))
+    parser.add_argument('--repeat', type=int, default=3, help='每项重复次数，取最快的一次')
+    parser.add_argument('--tolerance', type=float, default=0.3, help='吞吐量允许低于基线的比例')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--update', action='store_true', help='以本次结果更新基线，不做比较')
+    parser.add_argument('--output', help='将本次结果以JSON写入该文件')
+    args = parser.parse_args()
+    results = {}
+    print('%-16s %8s' % ('语料/字符数', '压缩率')+''.join('%10s' % i for i in STAGES)+'   (MB/s)')
+    for name in args.corpora:
+        for size in args.sizes:
+            key = '%s/%d' % (name, size)
+            results[key] = measure(*makeCorpus(name, size), args.repeat)
+            print('%-16s %8.4f' % (key, results[key]['ratio'])+''.join('%10.2f' % results[key][i] for i in STAGES))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+    if args.update:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as file:
+                baseline = json.load(file)
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+            file.write('\n')
+        print('基线已更新: %s' % args.baseline)
+        sys.exit()
+    if not os.path.exists(args.baseline):
+        print('没有基线文件%s，请先用--update生成' % args.baseline)
+        sys.exit(1)
+    with open(args.baseline, encoding='utf-8') as file:
+        regressions = compare(results, json.load(file), args.tolerance)
+    if regressions:
+        print('相对基线退步:')
+        for i in regressions:
+            print('  '+i)
+        sys.exit(1)
+    print('未发现退步(容差 %d%%)' % (args.tolerance*100))
@@ -0,0 +1,219 @@
+# 字节模式：以0~255这256个字节为字符集，可压缩任意二进制文件；字节b在树中记为字符chr(b)
+# 有NumPy时编码按码表数组向量化地算出每个码字的位置并直接拼成字节，译码时多路同时查表；
+# 没有NumPy时退回HuffmanTree按字符串编译码，结果相同
+import io
+from typing import Dict
+
+from huffman_core import HuffmanTree, packBits, unpackBits, readHeader
+from huffman_count import countBytes
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BYTE_MAX_LENGTH = 16  # 码长上限，译码查找表为2^16项
+ENCODE_CHUNK = 1 << 20  # 向量化编码时每次处理的字节数
+LANES = 4096  # 向量化译码时同时译码的路数
+LANE_BITS = 2048  # 每路负责的密文位数
+SYNC_STEPS = 64  # 每路记录前多少个码字的起始位，用于判断是否与前一路的真实结束位置同步
+
+
+def byteFrequency(data: bytes) -> Dict[str, int]:
+    counts = [0]*256
+    countBytes(data, counts)
+    return {chr(i): j for i, j in enumerate(counts) if j}
+
+
+def buildByteTree(frequency: Dict[str, int]) -> HuffmanTree:
+    # 由字节频率建字节模式的范式哈夫曼树，码长不超过BYTE_MAX_LENGTH
+    # 不足两个字节时补入频率为0的字节，保证每个字节至少占1位，全是同一字节的文件也能还原长度
+    frequency = dict(frequency)
+    for i in range(256):
+        if len(frequency) >= 2:
+            break
+        frequency.setdefault(chr(i), 0)
+    tree = HuffmanTree(frequency, canonical=True, maxLength=BYTE_MAX_LENGTH)
+    tree.byteMode = True
+    return tree
+
+
+def codeArrays(tree: HuffmanTree):
+    # 码表数组：各字节的编码(整数)与码长，不在字符集中的字节码长为0
+    codes = numpy.zeros(256, numpy.uint64)
+    lengths = numpy.zeros(256, numpy.int64)
+    for i, j in tree.codebook.items():
+        codes[ord(i)] = int(j, 2) if j else 0
+        lengths[ord(i)] = len(j)
+    return codes, lengths
+
+
+def encodeBytes(tree: HuffmanTree, data: bytes):
+    # 编码为按位压缩的字节串，返回(密文, 位数)；有字符集外的字节时返回None
+    if numpy is None or tree.depth() > BYTE_MAX_LENGTH or tree.depth() == 0:
+        bits = tree.encode(data.decode('latin-1'))
+        return None if bits is None else (packBits(bits), len(bits))
+    codes, lengths = codeArrays(tree)
+    out = []
+    partial = 0  # 上一块末尾不满一字节的部分(已左对齐)
+    bitLength = 0
+    for i in range(0, len(data), ENCODE_CHUNK):
+        symbols = numpy.frombuffer(data, numpy.uint8, min(ENCODE_CHUNK, len(data)-i), i)
+        length = lengths[symbols]
+        if not length.all():
+            return None
+        # 各码字相对本块首字节的结束位与起始位，码字最长16位，加上字节内偏移最多跨3个字节
+        ends = numpy.cumsum(length)+(bitLength & 7)
+        starts = ends-length
+        size = int(ends[-1]+7) >> 3
+        value = codes[symbols] << (24-length-(starts & 7)).astype(numpy.uint64)
+        first = starts >> 3
+        # 各码字占的位互不重叠，同一字节内的各部分相加即为按位或
+        buffer = numpy.zeros(size+2)
+        for k, shift in enumerate((16, 8, 0)):
+            part = ((value >> numpy.uint64(shift)) & numpy.uint64(0xFF)).astype(numpy.float64)
+            buffer += numpy.bincount(first+k, part, size+2)
+        buffer = buffer[:size].astype(numpy.uint8)
+        buffer[0] |= partial
+        bitLength += int(length.sum())
+        if bitLength & 7:
+            partial = int(buffer[-1])
+            buffer = buffer[:-1]
+        else:
+            partial = 0
+        out.append(buffer.tobytes())
+    if bitLength & 7:
+        out.append(bytes([partial]))
+    return b''.join(out), bitLength
+
+
+def decodeTable(tree: HuffmanTree):
+    # 以树深为位宽的查找表：任意位宽的位串->(开头的码字对应的字节, 该码字的码长)，非法位串的码长为0
+    width = tree.depth()
+    symbols = numpy.zeros(1 << width, numpy.uint8)
+    lengths = numpy.zeros(1 << width, numpy.int64)
+    for i, j in tree.codebook.items():
+        low = int(j, 2) << (width-len(j))
+        symbols[low:low+(1 << (width-len(j)))] = ord(i)
+        lengths[low:low+(1 << (width-len(j)))] = len(j)
+    return width, symbols, lengths
+
+
+def runLanes(data, table, starts, ends):
+    # 各路从starts起逐个码字同时查表译码，直到越过各自的ends
+    # 返回(每步译出的字节, 每步是否有效, 前SYNC_STEPS步各码字的起始位, 各路的结束位置, 各路是否遇到非法码字)
+    width, symbols, lengths = table
+    mask = (1 << width)-1
+    pos = starts.copy()
+    bad = numpy.zeros(len(pos), bool)
+    active = pos < ends
+    steps, valid, history = [], [], []
+    while active.any():
+        byte = pos >> 3
+        word = (data[byte] << 24) | (data[byte+1] << 16) | (data[byte+2] << 8) | data[byte+3]
+        window = (word >> (32-width-(pos & 7))) & mask
+        length = lengths[window]
+        bad |= active & (length == 0)
+        active &= length > 0
+        steps.append(symbols[window])
+        valid.append(active.copy())
+        if len(history) < SYNC_STEPS:
+            history.append(numpy.where(active, pos, -1))
+        pos = numpy.where(active, pos+length, pos)
+        active &= pos < ends
+    if not steps:
+        empty = numpy.zeros((0, len(pos)))
+        return empty.astype(numpy.uint8), empty.astype(bool), empty.astype(numpy.int64), pos, bad
+    return numpy.array(steps), numpy.array(valid), numpy.array(history), pos, bad
+
+
+def decodeRegion(data, table, start: int, stop: int):
+    # 译出从start(一定是码字的起始位)起、起始位在stop之前的所有码字，返回(字节串, 结束位置)，遇到非法码字时返回None
+    # 区间均分为若干路同时译码，除第一路外各路的起点是猜的；哈夫曼码会很快自同步，
+    # 若某路在前SYNC_STEPS个码字内经过了前一路的真实结束位置，其后的结果就是正确的，否则从该位置重译这一路
+    count = -(-(stop-start)//LANE_BITS)
+    starts = start+numpy.arange(count, dtype=numpy.int64)*LANE_BITS
+    ends = numpy.minimum(starts+LANE_BITS, stop)
+    runs = [runLanes(data, table, starts, ends)]
+    owner = numpy.zeros(count, numpy.int64)  # 各路当前采用第几次译码的结果
+    column = numpy.arange(count)  # 及其在该次结果中的列
+    history = numpy.full((SYNC_STEPS, count), -1, numpy.int64)  # 各路当前结果中前SYNC_STEPS个码字的起始位
+    history[:len(runs[0][2])] = runs[0][2]
+    laneFinal, laneBad = runs[0][3].copy(), runs[0][4].copy()
+    final = laneFinal.copy()
+    while True:
+        entry = numpy.concatenate(([start], final[:-1]))  # 假设前一路正确时本路的真实起点
+        matches = history == entry[None, :]
+        found = matches.any(axis=0)
+        past = ~found & (entry >= ends)  # 前一路的最后一个码字已越过本路，本路没有码字
+        redo = numpy.nonzero(~found & ~past)[0]
+        if not len(redo):
+            newFinal = numpy.where(past, entry, laneFinal)
+            if numpy.array_equal(newFinal, final):
+                break
+            final = newFinal
+            continue
+        run = runLanes(data, table, entry[redo], ends[redo])
+        runs.append(run)
+        owner[redo] = len(runs)-1
+        column[redo] = numpy.arange(len(redo))
+        history[:, redo] = -1
+        history[:len(run[2]), redo] = run[2]
+        laneFinal[redo], laneBad[redo] = run[3], run[4]
+        final = numpy.where(past, entry, laneFinal)
+    if (laneBad & ~past).any():
+        return None
+    offset = numpy.where(past, SYNC_STEPS, matches.argmax(axis=0))  # 各路从第几个码字起是正确的
+    pieces = [None]*count
+    for k, (steps, valid, _, _, _) in enumerate(runs):
+        lanes = numpy.nonzero(owner == k)[0]
+        if not len(lanes):
+            continue
+        cols = column[lanes]
+        keep = valid[:, cols] & (numpy.arange(len(steps))[:, None] >= offset[lanes][None, :])
+        chosen = steps[:, cols].T[keep.T]
+        for j, piece in zip(lanes, numpy.split(chosen, numpy.cumsum(keep.sum(axis=0))[:-1])):
+            pieces[j] = piece
+    return numpy.concatenate(pieces).tobytes(), int(final[-1])
+
+
+def decodeBytes(tree: HuffmanTree, payload: bytes, bitLength: int) -> bytes:
+    # 译出按位压缩的密文的前bitLength位，密文无法译码时返回None
+    if numpy is None or tree.depth() > BYTE_MAX_LENGTH or tree.depth() == 0:
+        text = tree.decode(unpackBits(payload, bitLength))
+        return None if text is None else text.encode('latin-1')
+    if len(payload) != (bitLength+7)//8:
+        return None
+    table = decodeTable(tree)
+    data = numpy.concatenate((numpy.frombuffer(payload, numpy.uint8), numpy.zeros(8, numpy.uint8))).astype(numpy.int64)
+    out = []
+    pos = 0
+    while pos < bitLength:
+        decoded = decodeRegion(data, table, pos, min(pos+LANES*LANE_BITS, bitLength))
+        if decoded is None:
+            return None
+        text, pos = decoded
+        out.append(text)
+    if pos != bitLength:  # 最后一个码字越过了结尾
+        return None
+    return b''.join(out)
+
+
+def packBytes(data: bytes, tree: HuffmanTree = None) -> bytes:
+    # 字节模式压缩为二进制格式，未给出树时按data的字节频率建树；有树中没有的字节时返回None
+    if tree is None:
+        tree = buildByteTree(byteFrequency(data))
+    encoded = encodeBytes(tree, data)
+    if encoded is None:
+        return None
+    return tree.packHeader(encoded[1])+encoded[0]
+
+
+def unpackBytes(data: bytes) -> bytes:
+    # packBytes的逆过程，格式有误或密文无法译码时返回None
+    stream = io.BytesIO(data)
+    header = readHeader(stream)
+    if not header:
+        return None
+    tree, bitLength, _ = header
+    return decodeBytes(tree, stream.read(), bitLength)
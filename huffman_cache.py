@@ -0,0 +1,206 @@
+# 已建好的树的缓存：以字符集(或树的信息、树帧)内容的稳定哈希为键，命中时直接复用树及其码表、译码表，无需重新建树；
+# 画好的树的图片也按树的编号缓存
+# 缓存按最近使用顺序淘汰，可在多个线程中共用；码表库将树持久保存在磁盘上，按内容的哈希查找
+import hashlib
+import os
+import re
+import struct
+import threading
+from collections import OrderedDict
+from typing import Dict
+
+from huffman_core import HuffmanTree
+from huffman_net import packTreeFrame, parseTreeFrame
+
+TREE_CACHE_SIZE = 16  # 默认最多缓存的树的数目
+SVG_CACHE_SIZE = 8  # 最多缓存的树的图片数，大树的svg可达数MB
+STORE_DIR = os.environ.get('HUFFMAN_STORE') or os.path.join(os.path.expanduser('~'), '.huffman', 'codebooks')
+STORE_ENTRIES = 1024  # 码表库默认最多保存的树的数目
+STORE_BYTES = 64 << 20  # 码表库默认最多占用的字节数
+
+
+def charsetFingerprint(characterset: Dict[str, float], engine: str = 'queue', canonical: bool = False,
+                       maxLength: int = None) -> str:
+    # 按字符集顺序依次写入字符与权重，连同建树参数取SHA-256；与进程及字符串哈希随机化无关，字符集相同则指纹相同
+    # 字符顺序会影响同权重字符的编码，因此顺序不同视为不同的字符集
+    h = hashlib.sha256(repr((engine, canonical, maxLength)).encode())
+    for i, j in characterset.items():
+        h.update(i.encode('utf-8', 'surrogatepass'))
+        h.update(struct.pack('<d', j))
+    return h.hexdigest()
+
+
+def dataFingerprint(data: bytes) -> str:
+    # 树的信息文本或树帧内容的指纹
+    return hashlib.sha256(data).hexdigest()
+
+
+class LRUCache:
+    # 按最近使用顺序淘汰的缓存，带命中计数，可在多个线程中共用
+    maxSize: int = TREE_CACHE_SIZE  # 最多缓存的项数，为0时不缓存
+    items: OrderedDict = None  # 键->值，越靠后越是最近使用的
+    hits: int = 0  # 命中次数
+    misses: int = 0  # 未命中次数
+    lock: threading.Lock = None
+
+    def __init__(self, maxSize: int = TREE_CACHE_SIZE):
+        self.maxSize = maxSize
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __contains__(self, key: str) -> bool:
+        with self.lock:
+            return key in self.items
+
+    def get(self, key: str, build):
+        # 命中时返回缓存的值，否则调用build()生成后存入；prepare判定不宜缓存的值(如None)不存入
+        with self.lock:
+            value = self.items.get(key)
+            if value is not None:
+                self.items.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = build()  # 生成时不持有锁，以免阻塞其他线程查缓存
+        if not self.prepare(value):
+            return value
+        with self.lock:
+            if self.maxSize > 0:
+                self.items[key] = value
+                self.items.move_to_end(key)
+                while len(self.items) > self.maxSize:
+                    self.items.popitem(last=False)
+        return value
+
+    def prepare(self, value) -> bool:
+        # 存入前的处理，返回是否缓存该值
+        return value is not None
+
+    def resize(self, maxSize: int):
+        with self.lock:
+            self.maxSize = maxSize
+            while len(self.items) > max(maxSize, 0):
+                self.items.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {'size': len(self.items), 'maxSize': self.maxSize, 'hits': self.hits, 'misses': self.misses}
+
+
+class TreeCache(LRUCache):
+    # 指纹->树，命中时连同码表与译码表一起复用
+
+    def prepare(self, tree: HuffmanTree) -> bool:
+        # 预先建好译码表，None或空树不缓存
+        if not tree or not tree.codebook:
+            return False
+        tree.buildDecodeTable()
+        return True
+
+    def build(self, characterset: Dict[str, float], engine: str = 'queue', canonical: bool = False,
+              maxLength: int = None) -> HuffmanTree:
+        # 与HuffmanTree(...)相同，字符集与参数相同时直接返回缓存的树
+        return self.get(charsetFingerprint(characterset, engine, canonical, maxLength),
+                        lambda: HuffmanTree(characterset, engine, canonical, maxLength))
+
+
+treeCache = TreeCache()  # 进程内共用的树的缓存
+svgCache = LRUCache(SVG_CACHE_SIZE)  # 树的编号->画好的svg，重新打开画树窗口或切换回画过的树时无需再画
+
+
+def codebookId(tree: HuffmanTree) -> str:
+    # 树的编号，即树帧内容的指纹；范式编码的树只含码长，相同码表的编号相同
+    return dataFingerprint(packTreeFrame(tree))
+
+
+class CodebookStore:
+    # 磁盘上的码表库：每棵树以树帧内容(二进制格式的文件头)保存为 <编号>.hfm，跨会话、跨进程共用
+    # 树的数目或总字节数超出上限时按最近使用顺序(文件的修改时间，读出时会更新)删去最久未用的树
+    directory: str = None
+    maxEntries: int = STORE_ENTRIES
+    maxBytes: int = STORE_BYTES
+
+    def __init__(self, directory: str = STORE_DIR, maxEntries: int = STORE_ENTRIES, maxBytes: int = STORE_BYTES):
+        # 目录无法创建时抛出OSError
+        self.directory = directory
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        # 编号不合法时返回None，以免拼出库外的路径
+        if not re.fullmatch(r'[0-9a-f]{64}', key):
+            return None
+        return os.path.join(self.directory, key+'.hfm')
+
+    def put(self, payload: bytes) -> str:
+        # 保存树帧内容并返回其编号，已存在时不重复写入；先写临时文件再改名，其他进程不会读到写了一半的文件
+        # 单个超过库的总字节数上限的树不保存，仍返回编号
+        key = dataFingerprint(payload)
+        path = self.path(key)
+        if self.touch(path) or len(payload) > self.maxBytes:
+            return key
+        tmp = '%s.%d.%d.tmp' % (path, os.getpid(), threading.get_ident())
+        with open(tmp, 'wb') as file:
+            file.write(payload)
+        os.replace(tmp, path)
+        self.prune()
+        return key
+
+    def touch(self, path: str) -> bool:
+        # 将文件标记为最近使用，文件不存在时返回False
+        try:
+            os.utime(path)
+        except OSError:
+            return False
+        return True
+
+    def prune(self):
+        # 删去最久未用的树，直到数目与总字节数都不超过上限；其他进程同时删除时忽略出错的文件
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith('.hfm'):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for k, (_, size, path) in enumerate(entries):
+            if len(entries)-k <= self.maxEntries and total <= self.maxBytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def get(self, key: str) -> bytes:
+        # 读出树帧内容，没有该编号或文件已损坏(内容与编号不符)时返回None
+        path = self.path(key)
+        if not path:
+            return None
+        try:
+            with open(path, 'rb') as file:
+                payload = file.read()
+        except OSError:
+            return None
+        if dataFingerprint(payload) != key:
+            return None
+        self.touch(path)
+        return payload
+
+    def __contains__(self, key: str) -> bool:
+        path = self.path(key)
+        return bool(path) and os.path.exists(path)
+
+    def load(self, key: str) -> HuffmanTree:
+        # 取出编号对应的树，先查进程内的缓存，再读磁盘；没有时返回None
+        return treeCache.get(key, lambda: parseTreeFrame(self.get(key) or b''))
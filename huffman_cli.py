@@ -0,0 +1,284 @@
+# 哈夫曼编译码器的命令行入口，不依赖PyQt5与graphviz
+# 用法:
+#   python huffman_cli.py build-codebook 原文.txt -o 树的信息.txt
+#   python huffman_cli.py encode -c 树的信息.txt 原文.txt -o 密文.hfm
+#   python huffman_cli.py decode 密文.hfm -o 译码.txt
+#   python huffman_cli.py encode -j 8 -c 树的信息.txt 原文.txt -o 密文.hfm   (8个进程分段并行编码)
+#   python huffman_cli.py encode --index 4096 -c 树的信息.txt 原文.txt -o 密文.hfm
+#   python huffman_cli.py decode 密文.hfm --start 1000000 --count 100   (借助索引随机读取)
+#   python huffman_cli.py stats -c 树的信息.txt 原文.txt
+#   python huffman_cli.py count -j 0 原文.txt -o 字频.txt   (多进程分片统计字频，--bytes按字节统计)
+#   python huffman_cli.py encode --bytes 任意文件 -o 密文.hfm   (字节模式，可压缩二进制文件，decode自动识别)
+#   python huffman_cli.py --metrics 统计.json --profile decode decode 密文.hfm -o 译码.txt   (各阶段耗时，分析译码)
+# 输入输出文件省略或为'-'时使用标准输入输出；二进制格式的编译码分块进行，内存占用与文件大小无关
+import argparse
+import io
+import json
+import sys
+
+from huffman_core import (HuffmanTree, MAGIC, FLAG_BYTES, checkDecodedText, getFrequency, normalizeNewlines,
+                          readTree, dumpTree, dumpFrequency)
+from huffman_bytes import buildByteTree, packBytes, unpackBytes
+from huffman_count import countFile
+from huffman_metrics import STAGES, metrics
+from huffman_stream import countFrequency, encodeFile, decodeStream, SeekableDecoder
+from huffman_parallel import BLOCK_SIZE, encodeParallel, decodeParallel
+
+
+def openInput(path: str):
+    # 以二进制方式打开输入
+    if path == '-':
+        return io.BufferedReader(io.FileIO(sys.stdin.fileno(), closefd=False))
+    return open(path, 'rb')
+
+
+def openOutput(path: str):
+    # 以二进制方式打开输出
+    if path == '-':
+        return io.BufferedWriter(io.FileIO(sys.stdout.fileno(), 'w', closefd=False))
+    return open(path, 'wb')
+
+
+def readInput(path: str) -> bytes:
+    with metrics.timer('read') as counter:
+        if path == '-':
+            data = sys.stdin.buffer.read()
+        else:
+            with open(path, 'rb') as file:
+                data = file.read()
+        counter.bytes = len(data)
+        return data
+
+
+def writeOutput(path: str, data: bytes):
+    if path == '-':
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+    else:
+        with open(path, 'wb') as file:
+            file.write(data)
+
+
+def readText(path: str) -> str:
+    # 读入UTF-8文本，与GUI中以文本方式打开文件一致，统一换行符
+    return normalizeNewlines(readInput(path).decode('utf-8'))
+
+
+def loadTree(path: str) -> HuffmanTree:
+    # 树的信息中的字符本身可能是\r(如count --bytes的输出)，只统一行尾的\r\n，不能像原文那样把单独的\r换成\n
+    tree = readTree(readInput(path).decode('utf-8').replace('\r\n', '\n'))
+    if not tree:
+        raise SystemExit('错误: 无法从%s读入树' % path)
+    return tree
+
+
+def countInput(path: str, jobs: int) -> dict:
+    # 统计原文字频，输入为文件且jobs不为1时多进程分片统计
+    if path != '-' and jobs != 1:
+        frequency = countFile(path, jobs or None)
+        if frequency is None:
+            raise SystemExit('错误: 请确保输入的是UTF-8编码的文本文件')
+        return frequency
+    with openInput(path) as file:
+        return countFrequency(io.TextIOWrapper(file, encoding='utf-8'))
+
+
+def count(args):
+    # 统计字频，输出 字符\t字频 格式(字频.txt)
+    if args.bytes:
+        if args.input == '-':
+            raise SystemExit('错误: 按字节统计需指定输入文件')
+        frequency = countFile(args.input, args.jobs or None, byteMode=True)
+    else:
+        frequency = countInput(args.input, args.jobs)
+    writeOutput(args.output, dumpFrequency(frequency).encode())
+
+
+def buildCodebook(args):
+    # 分块统计原文字频并建树，输出 字符\t字频\t编码 格式的树的信息
+    frequency = countInput(args.input, args.jobs)
+    if not frequency:
+        raise SystemExit('错误: 原文为空')
+    try:
+        tree = HuffmanTree(frequency, canonical=True, maxLength=args.max_length)
+    except ValueError as e:
+        raise SystemExit('错误: %s' % e)
+    writeOutput(args.output, dumpTree(tree).encode())
+
+
+def encodeBytes(args):
+    # 字节模式：按字节编码任意文件，未指定树时按输入的字节频率建树
+    data = readInput(args.input)
+    tree = None
+    if args.codebook:
+        # 树的信息中字节b记为字符chr(b)，如count --bytes的输出
+        tree = buildByteTree(loadTree(args.codebook).characterset)
+    packed = packBytes(data, tree)
+    if packed is None:
+        raise SystemExit('错误: 存在字符集以外的字节')
+    writeOutput(args.output, packed)
+
+
+def encode(args):
+    if args.bytes:
+        encodeBytes(args)
+        return
+    if not args.codebook:
+        raise SystemExit('错误: 需用-c指定树的信息或字频文件')
+    tree = loadTree(args.codebook)
+    if not args.text and args.jobs != 1:
+        # 分段并行编码，输出带索引的二进制格式
+        data = encodeParallel(tree, readText(args.input), args.index or BLOCK_SIZE, args.jobs or None)
+        if data is None:
+            raise SystemExit('错误: 存在字符集以外的字符')
+        writeOutput(args.output, data)
+        return
+    if not args.text and args.input != '-':
+        # 输入为文件时分两遍流式编码
+        with openOutput(args.output) as dst:
+            if not encodeFile(tree, args.input, dst, interval=args.index):
+                raise SystemExit('错误: 存在字符集以外的字符')
+        return
+    text = readText(args.input)
+    bits = tree.encode(text)
+    if bits is None:
+        raise SystemExit('错误: 存在字符集以外的字符')
+    if args.text:
+        writeOutput(args.output, bits.encode())
+    else:
+        writeOutput(args.output, tree.pack(bits, tree.buildIndex(text, args.index) if args.index else None))
+
+
+def decode(args):
+    if args.start is not None:
+        # 随机读取第start个字符起的count个字符
+        with openInput(args.input) as src:
+            try:
+                decoder = SeekableDecoder(src if src.seekable() else io.BytesIO(src.read()))
+            except ValueError:
+                raise SystemExit('错误: 文件已损坏')
+            text = decoder.decodeRange(args.start, args.count)
+        if text is None:
+            raise SystemExit('错误: 密文无法译码')
+        # 字节模式下每个字符即一个字节
+        writeOutput(args.output, text.encode('latin-1' if decoder.tree.byteMode else 'utf-8'))
+        return
+    if args.jobs != 1:
+        # 按索引分段并行译码
+        data = readInput(args.input)
+        text = decodeParallel(data, args.jobs or None)
+        if text is None:
+            raise SystemExit('错误: 文件已损坏或密文无法译码')
+        byteMode = data[len(MAGIC)] & FLAG_BYTES
+        writeOutput(args.output, text.encode('latin-1' if byteMode else 'utf-8'))
+        return
+    with openInput(args.input) as src:
+        head = src.peek(len(MAGIC)+1)[:len(MAGIC)+1]
+        if head[:len(MAGIC)] == MAGIC and len(head) > len(MAGIC) and head[len(MAGIC)] & FLAG_BYTES:
+            # 字节模式的密文，译出的字节原样写出
+            data = unpackBytes(src.read())
+            if data is None:
+                raise SystemExit('错误: 文件已损坏或密文无法译码')
+            writeOutput(args.output, data)
+            return
+        if head[:len(MAGIC)] == MAGIC:
+            # 二进制格式分块译码
+            with openOutput(args.output) as dst:
+                with io.TextIOWrapper(dst, encoding='utf-8', newline='') as text:
+                    if not decodeStream(src, text):
+                        raise SystemExit('错误: 文件已损坏或密文无法译码')
+            return
+        data = src.read()
+    if not args.codebook:
+        raise SystemExit('错误: 文本格式的密文需用-c指定树')
+    tree = loadTree(args.codebook)
+    bits = normalizeNewlines(data.decode('utf-8'))
+    if not checkDecodedText(bits):
+        raise SystemExit('错误: 存在无效字符')
+    text = tree.decode(bits)
+    if text is None:
+        raise SystemExit('错误: 密文无法译码')
+    writeOutput(args.output, text.encode())
+
+
+def stats(args):
+    # 输出树与编码结果的统计信息(JSON)
+    text = readText(args.input)
+    if not text and not args.codebook:
+        raise SystemExit('错误: 原文为空')
+    tree = loadTree(args.codebook) if args.codebook else HuffmanTree(getFrequency(text), canonical=True)
+    bits = tree.encode(text)
+    if bits is None:
+        raise SystemExit('错误: 存在字符集以外的字符')
+    result = {
+        'symbols': len(tree.codebook),
+        'depth': tree.depth(),
+        'characters': len(text),
+        'rawBytes': len(text.encode()),
+        'encodedBits': len(bits),
+        'packedBytes': len(tree.pack(bits)),
+        'bitsPerCharacter': len(bits)/len(text) if text else 0,
+    }
+    result['ratio'] = result['packedBytes']/result['rawBytes'] if text else 0
+    writeOutput(args.output, (json.dumps(result, ensure_ascii=False, indent=2)+'\n').encode())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='哈夫曼编译码器')
+    parser.add_argument('--metrics', help='运行结束后将各阶段的耗时、字节数与吞吐量以JSON写入该文件')
+    parser.add_argument('--profile', choices=list(STAGES), action='append', default=[],
+                        help='用cProfile分析该阶段的第一次运行，报告写入--metrics的文件，可重复指定')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('build-codebook', help='根据原文生成树的信息')
+    p.add_argument('input', nargs='?', default='-')
+    p.add_argument('-o', '--output', default='-')
+    p.add_argument('--max-length', type=int, help='码长上限，超出时改用package-merge限制码长')
+    p.add_argument('-j', '--jobs', type=int, default=1, help='统计字频的进程数，0为CPU核数')
+    p.set_defaults(func=buildCodebook)
+
+    p = sub.add_parser('count', help='统计字频，输出字频.txt格式')
+    p.add_argument('input', nargs='?', default='-')
+    p.add_argument('-o', '--output', default='-')
+    p.add_argument('-j', '--jobs', type=int, default=1, help='统计字频的进程数，0为CPU核数')
+    p.add_argument('--bytes', action='store_true', help='按字节统计，字节b记为字符chr(b)')
+    p.set_defaults(func=count)
+
+    p = sub.add_parser('encode', help='编码，默认输出二进制格式')
+    p.add_argument('input', nargs='?', default='-')
+    p.add_argument('-c', '--codebook', help='树的信息或字频文件，--bytes时可省略')
+    p.add_argument('-o', '--output', default='-')
+    p.add_argument('--text', action='store_true', help='输出01文本格式')
+    p.add_argument('--bytes', action='store_true', help='字节模式，按字节编码任意文件')
+    p.add_argument('-j', '--jobs', type=int, default=1, help='并行编码的进程数，0为CPU核数，默认为1(分块流式编码)')
+    p.add_argument('--index', type=int, help='每隔多少个字符记一个检查点，供随机读取与并行译码使用')
+    p.set_defaults(func=encode)
+
+    p = sub.add_parser('decode', help='译码，自动识别二进制格式与01文本格式')
+    p.add_argument('input', nargs='?', default='-')
+    p.add_argument('-c', '--codebook', help='01文本格式的密文所用的树')
+    p.add_argument('-o', '--output', default='-')
+    p.add_argument('-j', '--jobs', type=int, default=1, help='并行译码的进程数，0为CPU核数，仅用于二进制格式')
+    p.add_argument('--start', type=int, help='只译出从第几个字符(从0起)开始的一段，仅用于二进制格式')
+    p.add_argument('--count', type=int, default=1, help='与--start一起使用，译出的字符数')
+    p.set_defaults(func=decode)
+
+    p = sub.add_parser('stats', help='统计编码结果')
+    p.add_argument('input', nargs='?', default='-')
+    p.add_argument('-c', '--codebook', help='不指定时按原文字频建树')
+    p.add_argument('-o', '--output', default='-')
+    p.set_defaults(func=stats)
+
+    args = parser.parse_args(argv)
+    for stage in args.profile:
+        metrics.profileNext(stage)
+    try:
+        args.func(args)
+    finally:
+        if args.metrics:
+            with open(args.metrics, 'w', encoding='utf-8') as file:
+                file.write(metrics.toJson()+'\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,700 @@
+from typing import Dict, List
+from array import array
+from collections import Counter, deque
+import heapq
+import io
+import re
+import struct
+
+from huffman_metrics import metrics
+
+
+class TreeNode:
+    # 对象形式的节点，仅供逐节点访问的旧接口使用(见HuffmanTree.nodes)；树本身保存在数组中
+    __slots__ = ('parent', 'lchild', 'rchild', 'weight', 'name')
+    parent: 'TreeNode'  # 父节点
+    lchild: 'TreeNode'  # 左节点
+    rchild: 'TreeNode'  # 右节点
+    weight: float  # 权重，即字频
+    name: str  # 名称，即字符
+
+    def __init__(self, name=None, weight=None) -> None:
+        self.parent = None
+        self.lchild = None
+        self.rchild = None
+        self.name = name
+        self.weight = weight
+
+
+class HuffmanTree:
+    # 节点以平行数组保存：叶子在前(叶子i的字符为symbols[i])，内部节点在后，根节点在最后，无孩子或父节点时为-1
+    symbols: List[str] = None  # 各叶子的字符
+    lefts: array = None  # 各节点的左孩子
+    rights: array = None  # 各节点的右孩子
+    parents: array = None  # 各节点的父节点
+    weights: array = None  # 各节点的权重
+    objectNodes: List[TreeNode] = None  # 由数组生成的对象形式的节点，见nodes
+    characterset: Dict[str, float] = None  # 字符集构成的字典
+    engine: str = None  # 建树方式
+    canonical: bool = False  # 是否为范式哈夫曼编码，是则只需码长即可还原码表
+    maxLength: int = None  # 码长上限，None为不限
+    byteMode: bool = False  # 是否为字节模式，是则各字符chr(b)代表字节b，译文应以latin-1编码写出
+    codebook: Dict[str, str] = None  # 码表，字符->编码
+    codes: Dict[str, str] = None  # 反查码表，编码->字符
+    prefixes: Dict[str, tuple] = None  # 各码字的真前缀(即内部节点)->(其下最长的码长, 其下的码字数)
+    decodeTable: tuple = None  # 译码查找表，(位宽, {位串: (译出的字符串, 消耗的位数, 子表)}, 对应前缀)
+    TABLE_BITS = 12  # 每张译码表一次最多查看的位数
+    LOD_LEAVES = 256  # 字符数超过此值时画树默认启用细节层次，只画出上层与较重的子树
+    LOD_DEPTH = 8  # 细节层次中默认展开的层数
+    LOD_WEIGHT = 0.001  # 细节层次中权重占全树比例低于此值的子树默认折叠
+
+    def __init__(self, characterset: Dict[str, float], engine: str = 'queue', canonical: bool = False,
+                 maxLength: int = None):
+        if characterset == {} or characterset == None:  # 若字符集为空或者无字符集 则直接返回不对树进行构造
+            return
+        with metrics.timer('build', symbols=len(characterset)):
+            # 建树，叶子依字符集的顺序在前，新生成的内部节点依次排在其后
+            n = len(characterset)
+            self.symbols = list(characterset)
+            self.allocate(n, max(2*n-1, 2))
+            self.weights[:n] = array('d', characterset.values())
+            if n == 1:
+                # 只有一个字符时另设根节点，以该字符为左孩子，使其编码为'0'；码长为0时密文为空，无法还原字符数
+                self.lefts[1] = 0
+                self.parents[0] = 1
+                self.weights[1] = self.weights[0]
+            if engine == 'select':
+                # 旧版的线性查找建树，O(n²)，仅用于还原旧版本生成的树
+                for i in range(n, 2*n-1):
+                    x = self.select(i)
+                    self.parents[x] = i
+                    y = self.select(i)
+                    self.parents[y] = i
+                    self.lefts[i] = x
+                    self.rights[i] = y
+                    self.weights[i] = self.weights[x]+self.weights[y]
+            else:
+                self.buildByQueue(n)
+            self.characterset = characterset
+            self.engine = engine
+            self.buildCodebook()
+            self.maxLength = maxLength
+            if maxLength is not None and self.depth() > maxLength:
+                # 码长超出上限时改用package-merge求出不超过上限的最优码长，再按范式规则分配编码并重建节点
+                self.codebook = canonicalCodebook(limitedCodeLengths(characterset, maxLength))
+                self.canonical = True
+                self.buildNodes()
+            elif canonical:
+                # 保留各字符的码长，按范式规则重新分配编码，并依新码表重建节点
+                self.codebook = canonicalCodebook(self.codeLengths())
+                self.canonical = True
+                self.buildNodes()
+
+    @classmethod
+    def fromCodebook(cls, codebook: Dict[str, str], characterset: Dict[str, float] = None) -> 'HuffmanTree':
+        # 由现成的码表直接得到可编译码的对象，不建节点，需要时(画树、逐位译码)再调用buildNodes
+        # 未给出字频时按码长取2的幂作为字频，对这组字频建树得到的码长与原码长相同
+        tree = cls(None)
+        tree.codebook = dict(codebook)
+        if characterset is None:
+            maxLength = max(map(len, codebook.values()), default=0)
+            characterset = {i: float(2**(maxLength-len(j))) for i, j in codebook.items()}
+        tree.characterset = characterset
+        tree.canonical = canonicalCodebook(tree.codeLengths()) == tree.codebook
+        return tree
+
+    @classmethod
+    def fromCodeLengths(cls, lengths: Dict[str, int]) -> 'HuffmanTree':
+        # 由各字符的码长还原范式哈夫曼编码
+        tree = cls.fromCodebook(canonicalCodebook(lengths))
+        tree.canonical = True
+        return tree
+
+    def allocate(self, n: int, size: int):
+        # 为n个叶子、共size个节点分配数组，孩子与父节点初始为-1，权重初始为0
+        self.lefts, self.rights, self.parents, self.weights = self.newArrays(size)
+        self.objectNodes = None
+
+    @staticmethod
+    def newArrays(size: int) -> tuple:
+        # (左孩子, 右孩子, 父节点, 权重)四个数组，孩子与父节点初始为-1，权重初始为0
+        return array('i', [-1])*size, array('i', [-1])*size, array('i', [-1])*size, array('d', [0])*size
+
+    def buildNodes(self):
+        # 依据码表还原出节点：叶子按码表顺序在前，内部节点按深度由深到浅排在其后，根节点在最后
+        # 由码表得到的树可能被多个线程共用(如界面线程与画树线程)，先在局部数组中建好，最后才赋值lefts：
+        # 以lefts是否为None判断有无节点的调用方不会看到建了一半的数组，同时建节点也不会重复累加权重
+        symbols = list(self.codebook)
+        n = len(symbols)
+        children = {'': [-1, -1]}  # 内部节点的前缀->[左孩子, 右孩子]，孩子为叶子的下标或内部节点的前缀
+        hasRoot = self.depth() > 0  # 旧版只有一个字符时码长为0，根即叶子
+        for k, i in enumerate(symbols if hasRoot else ()):
+            code = self.codebook[i]
+            child = k
+            for j in range(len(code)-1, -1, -1):
+                isNew = code[:j] not in children
+                if isNew:
+                    children[code[:j]] = [-1, -1]
+                children[code[:j]][code[j] == '1'] = child
+                if not isNew:
+                    break
+                child = code[:j]
+        order = sorted(children, key=len, reverse=True) if hasRoot else []
+        index = {j: n+k for k, j in enumerate(order)}
+        lefts, rights, parents, weights = self.newArrays(n+len(order))
+        weights[:n] = array('d', [self.characterset.get(i) or 0 for i in symbols])
+        for prefix in order:  # 由深到浅，孩子的权重总在父节点之前算好
+            i = index[prefix]
+            for side, child in zip((lefts, rights), children[prefix]):
+                if child != -1:
+                    child = index.get(child, child)
+                    side[i] = child
+                    parents[child] = i
+                    weights[i] += weights[child]
+        self.symbols = symbols
+        self.rights = rights
+        self.parents = parents
+        self.weights = weights
+        self.objectNodes = None
+        self.lefts = lefts
+
+    def buildByQueue(self, n: int):
+        # 双队列建树：叶子按(权值,下标)排序后放入leaves，新生成的内部节点依次放入internal
+        # 内部节点的权值单调不减，每次只需比较两个队首，排序后为O(n)，总体O(n log n)
+        # 权值相同时下标小者优先(叶子先于内部节点)，保证同一字符集总是得到同一棵树
+        weights = self.weights
+        leaves = deque(sorted(range(n), key=lambda i: (weights[i], i)))
+        internal = deque()
+
+        def pop() -> int:
+            if not internal or (leaves and weights[leaves[0]] <= weights[internal[0]]):
+                return leaves.popleft()
+            return internal.popleft()
+
+        for i in range(n, 2*n-1):
+            x = pop()
+            y = pop()
+            self.parents[x] = i
+            self.parents[y] = i
+            self.lefts[i] = x
+            self.rights[i] = y
+            weights[i] = weights[x]+weights[y]
+            internal.append(i)
+
+    def select(self, k: int) -> int:
+        # 在前k个节点中，寻找无父节点且权值最小的节点，并返回其下标
+        x: int = None
+        for i in range(k):
+            if self.parents[i] < 0:  # 若找到第一个无父节点的节点，并用x标记
+                x = i
+                break
+        for j in range(x, k):  # 在第x结点以后
+            if self.weights[j] < self.weights[x] and self.parents[j] < 0:
+                x = j
+                break
+        return x
+
+    @property
+    def nodes(self) -> List[TreeNode]:
+        # 对象形式的各节点，顺序与数组相同；仅为兼容逐节点访问的旧接口，首次访问时由数组生成
+        # 由码表直接得到的树尚未建节点，先依码表建好；空树返回None
+        if self.lefts is None and self.codebook:
+            self.buildNodes()
+        if self.objectNodes is None and self.lefts is not None:
+            nodes = [TreeNode(self.symbols[i] if i < len(self.symbols) else None, self.weights[i])
+                     for i in range(len(self.lefts))]
+            for node, left, right, parent in zip(nodes, self.lefts, self.rights, self.parents):
+                node.lchild = nodes[left] if left >= 0 else None
+                node.rchild = nodes[right] if right >= 0 else None
+                node.parent = nodes[parent] if parent >= 0 else None
+            self.objectNodes = nodes
+        return self.objectNodes
+
+    @property
+    def rootnode(self) -> TreeNode:
+        # 根节点
+        return self.nodes[-1] if self.nodes else None
+
+    def buildCodebook(self):
+        # 自根向下遍历一次生成码表，树结构改变后需重新调用
+        self.codebook = {}
+        stack = [(len(self.lefts)-1, '')]
+        while stack:
+            i, code = stack.pop()
+            left, right = self.lefts[i], self.rights[i]
+            if left >= 0 or right >= 0:
+                if left >= 0:
+                    stack.append((left, code+'0'))
+                if right >= 0:
+                    stack.append((right, code+'1'))
+            else:
+                self.codebook[self.symbols[i]] = code
+
+    def codeLengths(self) -> Dict[str, int]:
+        # 各字符的码长，范式哈夫曼编码只需保存这些信息
+        return {i: len(j) for i, j in self.codebook.items()}
+
+    def encode(self, text: str) -> str:
+        # 对text中的文本进行编码，逐字符查码表后一次性拼接
+        with metrics.timer('encode', symbols=len(text)) as counter:
+            try:
+                bits = ''.join([self.codebook[i] for i in text])
+            except KeyError:
+                # 若当前字符并不在字符集中，则返回空的密文
+                return None
+            counter.bytes = len(bits)//8
+            return bits
+
+    def depth(self) -> int:
+        # 最长的码长，即根到最深叶子的边数
+        return max(map(len, self.codebook.values()), default=0)
+
+    def buildDecodeTable(self):
+        # 生成多位查表译码所用的表，只依赖码表而不依赖节点，码表改变后需重新调用
+        # 先在局部变量中建好再依次赋值，译表最后赋值：其他线程(如画树时)同时调用也不会让正在译码的线程看到建了一半的表
+        codes = {j: i for i, j in self.codebook.items()}
+        prefixes = {}
+        for code in codes:
+            for k in range(len(code)):
+                depth, count = prefixes.get(code[:k], (0, 0))
+                prefixes[code[:k]] = (max(depth, len(code)-k), count+1)
+        decodeTable = self.buildSubTable('', codes, prefixes) if prefixes else None
+        self.codes = codes
+        self.prefixes = prefixes
+        self.decodeTable = decodeTable
+
+    def buildSubTable(self, prefix: str, codes: Dict[str, str], prefixes: Dict[str, tuple]) -> tuple:
+        # 以前缀prefix为起点建一张表，表项为 位串->(译出的字符串, 消耗的位数, 子表)
+        # 一个位串内能完整译出几个字符就记录几个；一个都译不出时说明码长超出位宽，转入子表；非法位串不设表项
+        # 根表位宽取树深与TABLE_BITS中的较小者，子表位宽再按其下码字数收缩，避免深而窄的子树占用过多表项
+        depth, count = prefixes[prefix]
+        width = min(depth, self.TABLE_BITS)
+        if prefix:
+            width = max(1, min(width, (count-1).bit_length()))
+        entries = {}
+        for i in range(1 << width):
+            bits = format(i, '0%db' % width)
+            code = prefix
+            names = []
+            used = 0
+            for j, b in enumerate(bits):
+                code += b
+                if code in codes:
+                    names.append(codes[code])
+                    used = j+1
+                    code = ''
+                elif code not in prefixes:
+                    break
+            if names:
+                entries[bits] = (''.join(names), used, None)
+            elif len(code) == len(prefix)+width and code in prefixes:
+                entries[bits] = (None, width, self.buildSubTable(code, codes, prefixes))
+        return (width, entries, prefix)
+
+    def decode(self, text: str) -> str:
+        # 查表译码，含非法字符或结尾有不完整的码字时返回None
+        if not self.decodeTable:
+            self.buildDecodeTable()
+            if not self.decodeTable:  # 旧版只有一个字符时码长为0
+                return self.decodeBitwise(text)
+        decoded = self.decodePartial(text.replace('\n', ''))  # 紧凑格式中的'\n'需忽略
+        if decoded is None or decoded[1]:
+            return None
+        else:
+            return decoded[0]
+
+    def decodePartial(self, bits: str):
+        # 译出bits中所有完整的码字，返回(译文, 结尾不完整的码字)，供分块译码时接到下一块之前；含非法位时返回None
+        # 每次取位宽个位查表，一次得到若干字符及消耗的位数；不足位宽的结尾部分逐位查码表
+        with metrics.timer('decode', bytes=len(bits)//8) as counter:
+            if not self.decodeTable:
+                self.buildDecodeTable()
+                if not self.decodeTable:
+                    return None if bits else ('', '')
+            result = []
+            rootTable = table = self.decodeTable
+            pos, end = 0, len(bits)
+            while True:
+                width, entries, code = table
+                if pos+width > end:
+                    break
+                entry = entries.get(bits[pos:pos+width])
+                if entry is None:  # 含有'0'、'1'以外的字符或不是任何码字
+                    return None
+                name, used, sub = entry
+                pos += used
+                if sub:
+                    table = sub
+                else:
+                    result.append(name)
+                    table = rootTable
+            for i in bits[pos:]:
+                if i != '0' and i != '1':
+                    return None
+                code += i
+                if code in self.codes:
+                    result.append(self.codes[code])
+                    code = ''
+                elif code not in self.prefixes:
+                    return None
+            text = ''.join(result)  # 查表时每项可能译出多个字符
+            counter.symbols = len(text)
+            return text, code
+
+    def decodeBitwise(self, text: str) -> str:
+        # 在树中对text中的01串逐位走树进行解码
+        with metrics.timer('decode', bytes=len(text)//8) as counter:
+            if self.lefts is None:
+                self.buildNodes()
+            lefts, rights, symbols = self.lefts, self.rights, self.symbols
+            root = node = len(lefts)-1
+            result = []
+            for i in text:
+                if i == '0':
+                    node = lefts[node]
+                elif i == '1':
+                    node = rights[node]
+                elif i == '\n':  # 紧凑格式中的'\n'需忽略
+                    continue
+                else:
+                    return None
+                if node < 0:  # 不是任何码字的前缀(旧版只有一个字符时根即叶子，没有孩子)
+                    return None
+                if node < len(symbols):
+                    result.append(symbols[node])
+                    node = root
+            if node != root:
+                return None
+            else:
+                counter.symbols = len(result)
+                return ''.join(result)
+
+    def pack(self, bits: str, index: List[tuple] = None) -> bytes:
+        # 将本树编出的01串连同树的信息(及索引)打包为二进制格式
+        bits = bits.replace('\n', '')
+        return self.packHeader(len(bits), index)+packBits(bits)
+
+    def packHeader(self, bitLength: int, index: List[tuple] = None) -> bytes:
+        # 二进制格式的文件头，其后紧跟按位压缩的密文：
+        # MAGIC | 标志(1B) | 字符数(4B) | [字符UTF-8长度(1B) 字符 树的信息]... | 位数(8B) | [索引] | 按位压缩的密文
+        # 树的信息依标志而定：范式编码(bit1)只存码长(1B)；由字频建的树存字频(8B)，bit0表示旧版建树；
+        # 其余直接给出码表的树(bit2)存码长(1B)及按位压缩的编码
+        # 有索引时(bit3)索引为 项数(4B) | [该段起始位(8B) 该段字符数(8B)]...，密文仍是各段依次相接，不含填充
+        # 字节模式(bit4)的译文为字节串；树深超过255时(bit5)码长改存2B
+        if self.canonical:
+            flags = 2
+        elif self.engine:
+            flags = self.engine == 'select'
+        else:
+            flags = 4
+        if index is not None:
+            flags |= 8
+        if self.byteMode:
+            flags |= FLAG_BYTES
+        length = struct.Struct('<B')
+        if flags & 6 and self.depth() > 0xFF:
+            if self.depth() > 0xFFFF:
+                raise ValueError('码长超过%d，请用maxLength限制码长' % 0xFFFF)
+            flags |= FLAG_WIDE
+            length = struct.Struct('<H')
+        header = [MAGIC, struct.pack('<BI', flags, len(self.codebook))]
+        for i in self.characterset:  # 旧版建树与字符顺序有关，需按字符集的顺序写入
+            j = self.codebook[i]
+            name = i.encode()
+            header.append(struct.pack('<B', len(name))+name)
+            if flags & 2:
+                header.append(length.pack(len(j)))
+            elif flags & 4:
+                header.append(length.pack(len(j))+packBits(j))
+            else:
+                header.append(struct.pack('<d', self.characterset[i]))
+        header.append(struct.pack('<Q', bitLength))
+        if index is not None:
+            header.append(struct.pack('<I', len(index)))
+            header.extend(struct.pack('<QQ', i, j) for i, j in index)
+        return b''.join(header)
+
+    def buildIndex(self, text: str, interval: int) -> List[tuple]:
+        # 每interval个字符记一个检查点(该段起始位, 该段字符数)，供随机读取与并行译码使用
+        lengths = self.codeLengths()
+        index = []
+        offset = 0
+        for i in range(0, len(text), interval):
+            segment = text[i:i+interval]
+            index.append((offset, len(segment)))
+            offset += sum(map(lengths.__getitem__, segment))
+        return index
+
+    def encodeToBytes(self, text: str, interval: int = None) -> bytes:
+        # 编码并直接输出二进制格式，给出interval时附带每interval个字符一个检查点的索引
+        # 文本中有字符集外的字符时返回None
+        bits = self.encode(text)
+        if bits is None:
+            return None
+        return self.pack(bits, self.buildIndex(text, interval) if interval else None)
+
+    def collapsedPrefixes(self, maxDepth: int = None, minWeight: float = None, expanded=()) -> List[str]:
+        # 细节层次：找出画树时需折叠为摘要节点的内部节点(以其前缀表示)
+        # 深度达到maxDepth或权重低于minWeight的子树折叠；expanded中的节点及其祖先总是展开，其子树再按阈值折叠
+        if self.lefts is None:
+            self.buildNodes()
+        keep = {p[:k] for p in expanded for k in range(len(p)+1)}
+        collapsed = []
+        queue = deque([(len(self.lefts)-1, '')])
+        while queue:
+            i, prefix = queue.popleft()
+            left, right = self.lefts[i], self.rights[i]
+            if left < 0 and right < 0:
+                continue
+            if prefix not in keep and (maxDepth is not None and len(prefix) >= maxDepth or
+                                       minWeight is not None and self.weights[i] < minWeight):
+                collapsed.append(prefix)
+                continue
+            queue.extend((j, prefix+b) for j, b in ((left, '0'), (right, '1')) if j >= 0)
+        return collapsed
+
+    def buildGraph(self, collapsed=()):
+        # 生成画树所用的graphviz图，从根按层遍历，节点名(同时为svg中的id)为'n'加上其前缀
+        # collapsed中的内部节点画成标有其下字符数的摘要节点，不再画出其子树
+        from graphviz import Digraph  # 仅画树时需要graphviz
+        if self.lefts is None:
+            self.buildNodes()
+        collapsed = set(collapsed)
+        if collapsed and self.prefixes is None:
+            self.buildDecodeTable()
+        dot = Digraph(comment="生成的树")
+        dot.attr('node', fontname="STXinwei", shape='circle', fontsize="20")
+        dot.attr('graph', rankdir='LR')
+        queue = deque([(len(self.lefts)-1, '')])
+        while queue:
+            i, prefix = queue.popleft()
+            name = 'n'+prefix
+            if prefix in collapsed:
+                dot.node(name, '+%d' % self.prefixes[prefix][1], id=name, shape='box', style='dashed')
+                continue
+            symbol = self.symbols[i] if i < len(self.symbols) else None
+            if symbol == '' or not symbol:
+                dot.node(name, '', id=name)
+            elif symbol == ' ':
+                dot.node(name, '[ ]', id=name)  # 空格显示为'[ ]'
+            elif symbol == '\n':
+                dot.node(name, '\\\\n', id=name)  # 换行符显示为'\n' 转义 此处的还会被调用，因此需要四个斜杠
+            elif symbol == '\t':
+                dot.node(name, '\\\\t', id=name)  # 制表符显示为'\t'
+            else:
+                dot.node(name, symbol, id=name)
+            for child, b in ((self.lefts[i], '0'), (self.rights[i], '1')):
+                if child >= 0:
+                    dot.edge(name, name+b, b, constraint='true')
+                    queue.append((child, prefix+b))
+        return dot
+
+    def renderSvg(self, collapsed=()) -> bytes:
+        # 在内存中画出树的svg，不写临时文件
+        with metrics.timer('render', symbols=len(self.codebook)) as counter:
+            svg = self.buildGraph(collapsed).pipe(format='svg')
+            counter.bytes = len(svg)
+            return svg
+
+    def printTree(self, filename=None):
+        # 生成树的图片文件
+        with metrics.timer('render', symbols=len(self.codebook)):
+            self.buildGraph().render(filename, view=False, format='svg', cleanup=True)
+
+
+def getFrequency(text: str) -> Dict[str, int]:
+    # 字频(统计)，字符按首次出现的顺序排列
+    return dict(Counter(text))
+
+
+def normalizeNewlines(text: str) -> str:
+    # 统一换行符：\r\n与单独的\r都换成\n，与以文本方式打开文件(universal newlines)的结果相同
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def dumpFrequency(frequency: Dict[str, float]) -> str:
+    # 将字频写成 字符\t字频 的文本(字频.txt的格式)
+    return ''.join([i+'\t'+str(j)+'\n' for i, j in frequency.items()])
+
+
+def readTree(text: str) -> HuffmanTree:
+    # 读入树的信息，支持 字符\t字频\t编码 (保存的树) 与 字符\t字频 (字频文件) 两种格式，格式有误或编码不是前缀码时返回None
+    textlines = re.findall(r'([\s\S])\t(\S+)\t([01]*)(\n|$)', text)
+    try:
+        if textlines:
+            codebook = {i: k for i, _, k, _ in textlines}
+            if not isPrefixCode(codebook):
+                return None
+            return HuffmanTree.fromCodebook(codebook, {i: float(j) for i, j, _, _ in textlines})
+        characterset = {i: float(j) for i, j, _ in re.findall(r'([\s\S])\t(\S+)(\n|$)', text)}
+    except ValueError:
+        return None
+    if not characterset:
+        return None
+    return HuffmanTree(characterset, canonical=True)
+
+
+def dumpTree(tree: HuffmanTree) -> str:
+    # 将树写成 字符\t字频\t编码 的文本
+    return ''.join(['\t'.join([i, str(j), tree.codebook[i]])+'\n' for i, j in tree.characterset.items()])
+
+
+def checkDecodedText(text: str) -> bool:
+    # 检查密文内容的合法性
+    for i in text:
+        if i not in ['0', '1', '\n']:
+            return False
+    return True
+
+
+def canonicalCodebook(lengths: Dict[str, int]) -> Dict[str, str]:
+    # 范式哈夫曼编码：按(码长, 字符)排序后依次分配编码，码长相同时编码连续递增，码长增加时左移补0
+    # 返回的码表保持lengths中字符的顺序
+    codes = {}
+    code, last = 0, 0
+    for i in sorted(lengths, key=lambda i: (lengths[i], i)):
+        code <<= lengths[i]-last
+        last = lengths[i]
+        codes[i] = format(code, '0%db' % last) if last else ''
+        code += 1
+    return {i: codes[i] for i in lengths}
+
+
+def isPrefixCode(codebook: Dict[str, str]) -> bool:
+    # 码表是否为前缀码，即没有一个编码是另一个编码的前缀(含相同的编码)；排序后只需比较相邻的编码
+    codes = sorted(codebook.values())
+    return not any(j.startswith(i) for i, j in zip(codes, codes[1:]))
+
+
+def isValidCodeLengths(lengths: Dict[str, int]) -> bool:
+    # 码长能否分配出前缀码，即满足Kraft不等式 Σ2^-l ≤ 1
+    maxLength = max(lengths.values(), default=0)
+    return sum(1 << (maxLength-i) for i in lengths.values()) <= 1 << maxLength
+
+
+def limitedCodeLengths(characterset: Dict[str, float], maxLength: int) -> Dict[str, int]:
+    # package-merge算法：求码长均不超过maxLength时带权路径长度最小的码长，复杂度O(n·maxLength)
+    # 叶子按(权值,下标)排序；每轮将上一轮的列表两两打包，再与叶子按权值归并(权值相同时叶子在前)，共maxLength-1轮
+    # 最后取前2n-2项，每个字符的码长即它在这些项中出现的次数
+    names = list(characterset)
+    n = len(names)
+    if n == 1:
+        return {names[0]: 1}
+    if (1 << maxLength) < n:
+        raise ValueError('码长上限过小，无法容纳%d个字符' % n)
+    leaves = [(characterset[names[i]], i, None, None)
+              for i in sorted(range(n), key=lambda i: (characterset[names[i]], i))]
+    current = leaves
+    for _ in range(maxLength-1):
+        packages = [(current[k][0]+current[k+1][0], -1, current[k], current[k+1])
+                    for k in range(0, len(current)-1, 2)]
+        current = list(heapq.merge(leaves, packages, key=lambda item: item[0]))
+    lengths = [0]*n
+    stack = current[:2*n-2]
+    while stack:
+        item = stack.pop()
+        if item[1] >= 0:
+            lengths[item[1]] += 1
+        else:
+            stack.append(item[2])
+            stack.append(item[3])
+    return {names[i]: lengths[i] for i in range(n)}
+
+
+def dumpCodeLengths(lengths: Dict[str, int]) -> str:
+    # 将码长写成 字符\t码长\n 的文本
+    return ''.join([i+'\t'+str(j)+'\n' for i, j in lengths.items()])
+
+
+def parseCodeLengths(text: str) -> Dict[str, int]:
+    # dumpCodeLengths的逆过程，格式有误时返回None
+    try:
+        return {i: int(j) for i, j, _ in re.findall(r'([\s\S])\t(\S+)(\n|$)', text)}
+    except ValueError:
+        return None
+
+
+MAGIC = b'HFM\x01'  # 二进制格式的文件头标志
+FLAG_BYTES = 16  # 文件头标志中表示字节模式的位
+FLAG_WIDE = 32  # 文件头标志中表示码长以2字节保存的位，仅在树深超过255时使用，其余文件与旧版相同
+
+
+def packBits(bits: str) -> bytes:
+    # 将01串按高位在前每8位压成一个字节，末尾不足8位补0
+    if not bits:
+        return b''
+    pad = -len(bits) % 8
+    return int(bits+'0'*pad, 2).to_bytes((len(bits)+pad)//8, 'big')
+
+
+def unpackBits(data: bytes, bitLength: int) -> str:
+    # packBits的逆过程，只取前bitLength位
+    if bitLength == 0:
+        return ''
+    return bin(int.from_bytes(data, 'big'))[2:].zfill(len(data)*8)[:bitLength]
+
+
+def readHeader(stream):
+    # 从二进制流中读出文件头，返回(哈夫曼树, 密文位数, 索引)，无索引时索引为None
+    # 读完后流停在密文开头；格式有误或码表不能构成前缀码时返回None
+    def read(n: int) -> bytes:
+        data = stream.read(n)
+        if len(data) != n:
+            raise EOFError
+        return data
+
+    try:
+        if read(len(MAGIC)) != MAGIC:
+            return None
+        flags, count = struct.unpack('<BI', read(5))
+        lengthSize = 2 if flags & FLAG_WIDE else 1
+        characterset = {}
+        for _ in range(count):
+            name = read(read(1)[0]).decode()
+            if flags & 2:
+                characterset[name] = int.from_bytes(read(lengthSize), 'little')
+            elif flags & 4:
+                length = int.from_bytes(read(lengthSize), 'little')
+                characterset[name] = unpackBits(read((length+7)//8), length)
+            else:
+                characterset[name] = struct.unpack('<d', read(8))[0]
+        bitLength = struct.unpack('<Q', read(8))[0]
+        index = None
+        if flags & 8:
+            index = [struct.unpack('<QQ', read(16)) for _ in range(struct.unpack('<I', read(4))[0])]
+    except (EOFError, UnicodeDecodeError):
+        return None
+    if flags & 2:
+        if not isValidCodeLengths(characterset):
+            return None
+        tree = HuffmanTree.fromCodeLengths(characterset)
+    elif flags & 4:
+        if not isPrefixCode(characterset):
+            return None
+        tree = HuffmanTree.fromCodebook(characterset)
+    else:
+        tree = HuffmanTree(characterset, 'select' if flags & 1 else 'queue')
+    tree.byteMode = bool(flags & FLAG_BYTES)
+    return tree, bitLength, index
+
+
+def unpack(data: bytes):
+    # 解析二进制格式，返回(哈夫曼树, 01串)，格式有误时返回None
+    stream = io.BytesIO(data)
+    header = readHeader(stream)
+    if not header:
+        return None
+    tree, bitLength, _ = header
+    payload = stream.read()
+    if len(payload) != (bitLength+7)//8:
+        return None
+    return tree, unpackBits(payload, bitLength)
+
+
+def decodeFromBytes(data: bytes) -> str:
+    # 直接对二进制格式进行译码，格式或密文有误时返回None
+    unpacked = unpack(data)
+    if not unpacked or not unpacked[0].codebook:
+        return None
+    tree, bits = unpacked
+    return tree.decode(bits)
@@ -0,0 +1,102 @@
+# 直接对文件统计字频：文件按字节范围分片，在进程池中各自统计后按分片顺序合并
+# 字符模式按UTF-8解码后统计字符(换行符\r\n与单独的\r都计为\n，与界面和命令行读入原文时一致)；
+# 字节模式统计0~255各字节出现的次数，字节b记为字符chr(b)，有NumPy时用bincount向量化统计
+import codecs
+import multiprocessing
+import os
+from collections import Counter
+from typing import Dict, List
+
+from huffman_core import normalizeNewlines
+
+try:
+    import numpy
+except ImportError:  # 没有NumPy时字节模式改用Counter
+    numpy = None
+
+SHARD_SIZE = 64 << 20  # 每个分片的字节数
+READ_SIZE = 4 << 20  # 分片内每次读入的字节数
+
+
+def shardRanges(path: str, shardSize: int = SHARD_SIZE, byteMode: bool = False) -> List[tuple]:
+    # 将文件切成若干(起始字节, 结束字节)；字符模式下边界移到UTF-8字符的首字节上，且不把\r\n拆开
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, 'rb') as file:
+        for pos in range(shardSize, size, shardSize):
+            if byteMode:
+                bounds.append(pos)
+                continue
+            file.seek(pos-1)
+            data = file.read(8)
+            k = 1
+            while k < len(data) and data[k] & 0xC0 == 0x80:  # 跳过UTF-8的后续字节
+                k += 1
+            if data[k-1:k+1] == b'\r\n':
+                k += 1
+            if pos-1+k > bounds[-1]:
+                bounds.append(pos-1+k)
+    bounds.append(size)
+    return [(bounds[i], bounds[i+1]) for i in range(len(bounds)-1) if bounds[i] < bounds[i+1]]
+
+
+def countBytes(data: bytes, counts: list):
+    # 将data中各字节的出现次数累加到counts中
+    if numpy is not None:
+        for i, j in enumerate(numpy.bincount(numpy.frombuffer(data, numpy.uint8), minlength=256).tolist()):
+            counts[i] += j
+    else:
+        for i, j in Counter(data.decode('latin-1')).items():  # latin-1解码后每个字节对应一个字符
+            counts[ord(i)] += j
+
+
+def countShard(task: tuple):
+    # 统计一个分片，task为(文件路径, 起始字节, 结束字节, 是否为字节模式)
+    # 字符模式返回{字符: 次数}(按首次出现的顺序)，字节模式返回长为256的次数列表；不是UTF-8编码时返回None
+    path, start, end, byteMode = task
+    counts = [0]*256 if byteMode else Counter()
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    carry = ''
+    with open(path, 'rb') as file:
+        file.seek(start)
+        left = end-start
+        while left > 0:
+            data = file.read(min(READ_SIZE, left))
+            if not data:
+                break
+            left -= len(data)
+            if byteMode:
+                countBytes(data, counts)
+                continue
+            try:
+                text = carry+decoder.decode(data, left <= 0)
+            except UnicodeDecodeError:
+                return None
+            carry = '\r' if text.endswith('\r') and left > 0 else ''  # \r留到下一块，看其后是否为\n
+            counts.update(normalizeNewlines(text[:len(text)-len(carry)]))
+    return counts if byteMode else dict(counts)
+
+
+def mergeCounts(results, byteMode: bool) -> Dict[str, int]:
+    # 按分片顺序合并，字符的顺序与对整个文件调用getFrequency相同；有分片不是UTF-8编码时返回None
+    total = Counter()
+    if byteMode:
+        counts = [0]*256
+        for result in results:
+            for i, j in enumerate(result):
+                counts[i] += j
+        return {chr(i): j for i, j in enumerate(counts) if j}
+    for result in results:
+        if result is None:
+            return None
+        total.update(result)
+    return dict(total)
+
+
+def countFile(path: str, processes: int = None, byteMode: bool = False, shardSize: int = SHARD_SIZE) -> Dict[str, int]:
+    # 统计文件的字频，processes为1时在当前进程中逐片统计，否则在进程池中并行统计(None为CPU核数)
+    tasks = [(path, start, end, byteMode) for start, end in shardRanges(path, shardSize, byteMode)]
+    if processes == 1 or len(tasks) <= 1:
+        return mergeCounts(map(countShard, tasks), byteMode)
+    with multiprocessing.Pool(processes) as pool:
+        return mergeCounts(pool.imap(countShard, tasks), byteMode)
@@ -0,0 +1,120 @@
+# 运行统计：记录各阶段(建树、编码、译码、整理格式、画树、读文件、网络收发)的次数、耗时、字节数与字符数，
+# 并算出吞吐量，可导出为JSON；另可用cProfile分析指定阶段的下一次运行
+# 编码与译码的字节数为密文按位压缩后的字节数，画树为svg的字节数，读文件与收发为实际读写的字节数
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+STAGES = {  # 各阶段->显示的名称
+    'build': '建树',
+    'encode': '编码',
+    'decode': '译码',
+    'compact': '紧凑格式',
+    'render': '画树',
+    'read': '读文件',
+    'send': '网络发送',
+    'recv': '网络接收',
+}
+PROFILE_LINES = 30  # 分析报告中列出的函数数
+
+
+class StageCounter:
+    # timer()产出的对象，计时过程中可补记字节数与字符数
+    __slots__ = ('bytes', 'symbols')
+
+    def __init__(self, bytes: int = 0, symbols: int = 0):
+        self.bytes = bytes
+        self.symbols = symbols
+
+
+class Metrics:
+    # 各方法可在多个线程中同时调用
+    stages: dict = None  # 阶段->[次数, 耗时(秒), 字节数, 字符数]
+    profiling: set = None  # 下一次运行时需用cProfile分析的阶段
+    profiles: dict = None  # 阶段->最近一次的分析报告
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.profiling = set()
+        self.profiles = {}
+
+    def reset(self):
+        # 清零统计与分析报告，已请求的分析仍然有效
+        with self.lock:
+            self.stages = {}
+            self.profiles = {}
+
+    def add(self, stage: str, seconds: float, bytes: int = 0, symbols: int = 0):
+        with self.lock:
+            record = self.stages.setdefault(stage, [0, 0.0, 0, 0])
+            record[0] += 1
+            record[1] += seconds
+            record[2] += bytes
+            record[3] += symbols
+
+    @contextmanager
+    def timer(self, stage: str, bytes: int = 0, symbols: int = 0):
+        # 对with块计时并计入stage，块内可修改产出对象的bytes与symbols
+        counter = StageCounter(bytes, symbols)
+        profiler = self.startProfile(stage)
+        start = time.perf_counter()
+        try:
+            yield counter
+        finally:
+            elapsed = time.perf_counter()-start
+            if profiler:
+                self.stopProfile(stage, profiler)
+            self.add(stage, elapsed, counter.bytes, counter.symbols)
+
+    def profileNext(self, stage: str):
+        # 用cProfile分析stage的下一次运行，报告见profiles；一次只宜分析一个阶段，嵌套的阶段不会同时分析
+        with self.lock:
+            self.profiling.add(stage)
+
+    def startProfile(self, stage: str) -> cProfile.Profile:
+        if stage not in self.profiling:
+            return None
+        with self.lock:
+            if stage not in self.profiling:  # 已被其他线程取走
+                return None
+            self.profiling.discard(stage)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # 当前已有其他分析器在运行
+            return None
+        return profiler
+
+    def stopProfile(self, stage: str, profiler: cProfile.Profile):
+        profiler.disable()
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(PROFILE_LINES)
+        with self.lock:
+            self.profiles[stage] = report.getvalue()
+
+    def snapshot(self) -> dict:
+        # 阶段->{次数, 耗时, 字节数, 字符数, 每秒字节数, 每秒字符数}
+        with self.lock:
+            stages = {i: list(j) for i, j in self.stages.items()}
+        return {i: {'count': count, 'seconds': seconds, 'bytes': size, 'symbols': symbols,
+                    'bytesPerSecond': size/seconds if seconds else 0,
+                    'symbolsPerSecond': symbols/seconds if seconds else 0}
+                for i, (count, seconds, size, symbols) in stages.items()}
+
+    def toJson(self) -> str:
+        with self.lock:
+            profiles = dict(self.profiles)
+        return json.dumps({'stages': self.snapshot(), 'profiles': profiles}, ensure_ascii=False, indent=2)
+
+
+metrics = Metrics()
+# 环境变量HUFFMAN_PROFILE为逗号分隔的阶段名，启动后分析这些阶段的第一次运行
+for stage in os.environ.get('HUFFMAN_PROFILE', '').split(','):
+    if stage.strip():
+        metrics.profileNext(stage.strip())
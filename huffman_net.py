@@ -0,0 +1,157 @@
+# 网络传输的分帧协议：每帧为 类型(1B) | 长度(4B) | 内容，接收端按长度重组，不受TCP分包与粘包影响
+# 树的帧内容为二进制格式的文件头(不含密文)，密文的帧内容为 位数(8B) | 按位压缩的密文
+# 发送树时可先只发送树的编号(树帧内容的SHA-256)，对方的码表库中已有时直接使用，没有时再请求完整的树
+# 流式传输时原文分段编码，每段作为一帧密文(各段都由完整的码字组成，可单独译码)，最后以结束帧收尾
+import io
+import queue
+import socket
+import struct
+import threading
+import weakref
+
+from huffman_core import HuffmanTree, packBits, unpackBits, readHeader
+from huffman_metrics import metrics
+
+FRAME_HEADER = struct.Struct('<BI')
+FRAME_TREE = ord('t')  # 树
+FRAME_TEXT = ord('c')  # 密文
+FRAME_CHUNK = ord('s')  # 流式传输中的一段密文
+FRAME_END = ord('e')  # 流式传输结束，内容为1字节，0为正常结束，1为中止
+FRAME_ENCODE = ord('E')  # 编码请求，内容为UTF-8原文，应答为密文帧
+FRAME_DECODE = ord('D')  # 译码请求，内容与密文帧相同，应答为原文帧
+FRAME_PLAIN = ord('p')  # 原文，内容为UTF-8文本
+FRAME_ERROR = ord('!')  # 请求出错，内容为UTF-8的错误信息
+FRAME_OFFER = ord('o')  # 提供树的编号，内容为十六进制的编号
+FRAME_HAVE = ord('h')  # 已有该编号的树，内容为编号
+FRAME_WANT = ord('w')  # 没有该编号的树，请求发送完整的树，内容为编号
+RECV_SIZE = 1 << 16  # 每次recv的最大字节数
+STREAM_CHUNK = 1 << 16  # 流式传输时每段的字符数
+SEND_QUEUE = 4  # 流式传输时已编码待发送的最多段数
+
+
+sendLocks = weakref.WeakKeyDictionary()  # 套接字->发送锁，多个线程向同一连接发送时保证各帧不交错
+sendLocksLock = threading.Lock()
+
+
+def sendFrame(s: socket.socket, frameType: int, payload: bytes):
+    with sendLocksLock:
+        lock = sendLocks.setdefault(s, threading.Lock())
+    with lock, metrics.timer('send', bytes=FRAME_HEADER.size+len(payload)):
+        s.sendall(FRAME_HEADER.pack(frameType, len(payload)))
+        s.sendall(payload)
+
+
+def packTreeFrame(tree: HuffmanTree) -> bytes:
+    return tree.packHeader(0)
+
+
+def parseTreeFrame(payload: bytes) -> HuffmanTree:
+    # 格式有误时返回None
+    header = readHeader(io.BytesIO(payload))
+    return header[0] if header else None
+
+
+def packTextFrame(bits: str) -> bytes:
+    bits = bits.replace('\n', '')
+    return struct.pack('<Q', len(bits))+packBits(bits)
+
+
+def parseTextFrame(payload: bytes) -> str:
+    # 格式有误时返回None
+    if len(payload) < 8:
+        return None
+    bitLength = struct.unpack_from('<Q', payload)[0]
+    if len(payload)-8 != (bitLength+7)//8:
+        return None
+    return unpackBits(payload[8:], bitLength)
+
+
+class FrameReader:
+    # 增量重组：不断喂入收到的字节，取出其中已完整的帧
+    buffer: bytearray = None
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data: bytes) -> list:
+        # 返回[(类型, 内容), ...]，不完整的帧留在缓冲区等待后续数据
+        self.buffer += data
+        frames = []
+        pos = 0
+        while len(self.buffer)-pos >= FRAME_HEADER.size:
+            frameType, length = FRAME_HEADER.unpack_from(self.buffer, pos)
+            end = pos+FRAME_HEADER.size+length
+            if len(self.buffer) < end:
+                break
+            frames.append((frameType, bytes(self.buffer[pos+FRAME_HEADER.size:end])))
+            pos = end
+        del self.buffer[:pos]
+        return frames
+
+
+def recvFrames(s: socket.socket):
+    # 逐帧产出(类型, 内容)，对方关闭连接时结束
+    reader = FrameReader()
+    while True:
+        with metrics.timer('recv') as counter:  # 耗时含等待对方发送的时间
+            data = s.recv(RECV_SIZE)
+            counter.bytes = len(data)
+        if not data:
+            return
+        yield from reader.feed(data)
+
+
+def iterChunks(text: str, size: int = STREAM_CHUNK):
+    for i in range(0, len(text), size):
+        yield text[i:i+size]
+
+
+def sendTextStream(s: socket.socket, tree: HuffmanTree, chunks) -> bool:
+    # 边编码边发送：当前线程逐段编码，另一线程逐段发送，二者经有界队列衔接，编码下一段时上一段正在发送
+    # 有字符集外的字符时发送中止帧并返回False；发送出错时在所有段处理完后抛出该异常
+    frames = queue.Queue(SEND_QUEUE)
+    errors = []
+
+    def sender():
+        while True:
+            frame = frames.get()
+            if frame is None:
+                return
+            if not errors:  # 出错后继续取出队列中的帧，以免编码线程阻塞
+                try:
+                    sendFrame(s, *frame)
+                except OSError as e:
+                    errors.append(e)
+
+    thread = threading.Thread(target=sender, daemon=True)
+    thread.start()
+    ok = True
+    for chunk in chunks:
+        if errors:
+            break
+        bits = tree.encode(chunk)
+        if bits is None:
+            ok = False
+            break
+        frames.put((FRAME_CHUNK, packTextFrame(bits)))
+    frames.put((FRAME_END, b'\x00' if ok else b'\x01'))
+    frames.put(None)
+    thread.join()
+    if errors:
+        raise errors[0]
+    return ok
+
+
+def recvTextStream(s: socket.socket, tree: HuffmanTree, write) -> bool:
+    # 边接收边译码：每收到一段密文立即译码并调用write写出译文，收到正常结束帧时返回True
+    # 中止、连接关闭或密文无法译码时返回False
+    for frameType, payload in recvFrames(s):
+        if frameType == FRAME_CHUNK:
+            bits = parseTextFrame(payload)
+            text = tree.decode(bits) if bits is not None else None
+            if text is None:
+                return False
+            write(text)
+        elif frameType == FRAME_END:
+            return payload == b'\x00'
+    return False
@@ -0,0 +1,91 @@
+# 分段并行编译码：原文按固定字符数分段，在进程池中用同一码表各自编码，
+# 文件头中的索引记录每段的起始位与字符数，译码时各段在进程池中并行译出
+import io
+import multiprocessing
+
+from huffman_core import HuffmanTree, unpackBits, packBits, readHeader
+
+BLOCK_SIZE = 1 << 20  # 每段的字符数
+
+workerTree: HuffmanTree = None  # 子进程中的树，由码表还原，每个进程只建一次
+
+
+def initWorker(codebook: dict):
+    global workerTree
+    workerTree = HuffmanTree.fromCodebook(codebook)
+
+
+def encodeBlock(text: str):
+    # 编码一段，返回(按位压缩的密文, 位数)，有字符集外的字符时返回None
+    bits = workerTree.encode(text)
+    if bits is None:
+        return None
+    return packBits(bits), len(bits)
+
+
+def decodeBlock(task: tuple) -> str:
+    # 译码一段，task为(包含该段的字节, 首字节中需跳过的位数, 位数, 字符数)，无法译码或字符数不符时返回None
+    data, skip, bitLength, count = task
+    text = workerTree.decode(unpackBits(data, skip+bitLength)[skip:])
+    if text is None or len(text) != count:
+        return None
+    return text
+
+
+def encodeParallel(tree: HuffmanTree, text: str, blockSize: int = BLOCK_SIZE, processes: int = None) -> bytes:
+    # 并行编码为带索引的二进制格式，有字符集外的字符时返回None
+    # 各段的密文不是整字节，按顺序收回后与上一段剩下的不足一字节的位拼接，整体仍是连续的位流
+    blocks = [text[i:i+blockSize] for i in range(0, len(text), blockSize)]
+    payload = []
+    index = []
+    offset = 0
+    pending, pendingBits = 0, 0
+    with multiprocessing.Pool(processes, initWorker, (tree.codebook,)) as pool:
+        for block, result in zip(blocks, pool.imap(encodeBlock, blocks)):
+            if result is None:
+                return None
+            data, bitLength = result
+            index.append((offset, len(block)))
+            offset += bitLength
+            value = pending << bitLength | int.from_bytes(data, 'big') >> (len(data)*8-bitLength)
+            total = pendingBits+bitLength
+            pendingBits = total % 8
+            payload.append((value >> pendingBits).to_bytes(total//8, 'big'))
+            pending = value & ((1 << pendingBits)-1)
+    if pendingBits:
+        payload.append(bytes([pending << (8-pendingBits)]))
+    return tree.packHeader(offset, index)+b''.join(payload)
+
+
+def decodeParallel(data: bytes, processes: int = None, blockSize: int = BLOCK_SIZE) -> str:
+    # 按文件头中的索引并行译码，无索引时退回单进程译码；格式有误或无法译码时返回None
+    # 索引中的检查点较密时，将相邻的几段合为一个不少于blockSize个字符的任务，减少进程间传输的开销
+    stream = io.BytesIO(data)
+    header = readHeader(stream)
+    if not header:
+        return None
+    tree, bitLength, index = header
+    start = stream.tell()
+    if len(data)-start != (bitLength+7)//8:
+        return None
+    if not index:
+        return tree.decode(unpackBits(data[start:], bitLength))
+    if index[0][0] != 0:
+        return None
+    groups = []
+    for offset, count in index:
+        if groups and groups[-1][1] < blockSize:
+            groups[-1][1] += count
+        else:
+            groups.append([offset, count])
+    tasks = []
+    ends = [i for i, _ in groups[1:]]+[bitLength]
+    for (offset, count), end in zip(groups, ends):
+        if end < offset:
+            return None
+        tasks.append((data[start+offset//8:start+(end+7)//8], offset % 8, end-offset, count))
+    with multiprocessing.Pool(processes, initWorker, (tree.codebook,)) as pool:
+        parts = pool.map(decodeBlock, tasks)
+    if None in parts:
+        return None
+    return ''.join(parts)
@@ -0,0 +1,159 @@
+# 基于asyncio的多连接编译码服务，不依赖PyQt5，可在无界面的服务器上运行
+# 用法: python huffman_server.py --port 8000
+# 协议沿用huffman_net的分帧格式：每个连接先发送树帧，之后可连续发送任意多个编码或译码请求，
+# 服务端按到达顺序逐个处理并应答；应答写不出去(对方不读)时暂停读取该连接的请求，各连接互不影响
+# 也可先只发送树的编号，服务端码表库中有这棵树时回复HAVE，否则回复WANT，客户端收到WANT后再发送完整的树
+import argparse
+import asyncio
+
+from huffman_cache import treeCache, dataFingerprint, CodebookStore, STORE_DIR, STORE_ENTRIES, STORE_BYTES
+from huffman_core import HuffmanTree
+from huffman_net import (FRAME_HEADER, FRAME_TREE, FRAME_TEXT, FRAME_ENCODE, FRAME_DECODE, FRAME_PLAIN,
+                         FRAME_ERROR, FRAME_OFFER, FRAME_HAVE, FRAME_WANT, packTextFrame, parseTreeFrame,
+                         parseTextFrame)
+
+MAX_FRAME = 64 << 20  # 单帧内容的最大字节数，超出时断开连接
+OFFLOAD_SIZE = 1 << 16  # 内容超过此字节数的请求放到线程池中处理，以免阻塞其他连接
+
+
+async def readFrame(reader: asyncio.StreamReader):
+    # 读入一帧，返回(类型, 内容)；对方关闭连接时返回None，帧过大时抛出ValueError
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+    except asyncio.IncompleteReadError:
+        return None
+    frameType, length = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME:
+        raise ValueError('帧过大')
+    try:
+        return frameType, await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        return None
+
+
+async def writeFrame(writer: asyncio.StreamWriter, frameType: int, payload: bytes):
+    # 写出一帧并等待发送缓冲区回落，对方读得慢时在此处等待
+    writer.write(FRAME_HEADER.pack(frameType, len(payload)))
+    writer.write(payload)
+    await writer.drain()
+
+
+def loadTree(payload: bytes) -> HuffmanTree:
+    # 解析树帧并预先建好译码表，格式有误或为空树时返回None；各连接发来相同的树时共用缓存中的同一棵树
+    tree = treeCache.get(dataFingerprint(payload), lambda: parseTreeFrame(payload))
+    if not tree or not tree.codebook:
+        return None
+    return tree
+
+
+def encodeRequest(tree: HuffmanTree, payload: bytes):
+    # 返回应答的(类型, 内容)
+    try:
+        text = payload.decode('utf-8')
+    except UnicodeDecodeError:
+        return FRAME_ERROR, '原文不是UTF-8编码'.encode()
+    bits = tree.encode(text)
+    if bits is None:
+        return FRAME_ERROR, '存在字符集以外的字符'.encode()
+    return FRAME_TEXT, packTextFrame(bits)
+
+
+def decodeRequest(tree: HuffmanTree, payload: bytes):
+    bits = parseTextFrame(payload)
+    text = tree.decode(bits) if bits is not None else None
+    if text is None:
+        return FRAME_ERROR, '密文无法译码'.encode()
+    return FRAME_PLAIN, text.encode()
+
+
+class CodecServer:
+    # 每个连接各自持有一棵树，连接之间不共享状态
+    host: str = None
+    port: int = 0
+    server: asyncio.AbstractServer = None
+    store: CodebookStore = None  # 码表库，为None时不支持按编号提供树
+    connections: int = 0  # 当前连接数
+    requests: int = 0  # 已处理的请求数
+
+    def __init__(self, host: str = '0.0.0.0', port: int = 0, store: CodebookStore = None):
+        self.host = host
+        self.port = port
+        self.store = store
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port, backlog=1024)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        tree = None
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                frame = await readFrame(reader)
+                if frame is None:
+                    break
+                frameType, payload = frame
+                if frameType == FRAME_TREE:
+                    # 建树与建译码表较慢，放到线程池中进行
+                    tree = await loop.run_in_executor(None, loadTree, payload)
+                    if not tree:
+                        await writeFrame(writer, FRAME_ERROR, '树的格式有误'.encode())
+                    elif self.store:
+                        await loop.run_in_executor(None, self.store.put, payload)
+                    continue
+                if frameType == FRAME_OFFER:
+                    key = payload.decode('ascii', 'replace')
+                    offered = await loop.run_in_executor(None, self.store.load, key) if self.store else None
+                    if offered and offered.codebook:
+                        tree = offered
+                        await writeFrame(writer, FRAME_HAVE, payload)
+                    else:
+                        await writeFrame(writer, FRAME_WANT, payload)
+                    continue
+                if frameType not in (FRAME_ENCODE, FRAME_DECODE):
+                    await writeFrame(writer, FRAME_ERROR, '未知的请求'.encode())
+                    continue
+                if not tree:
+                    await writeFrame(writer, FRAME_ERROR, '请先发送树'.encode())
+                    continue
+                handler = encodeRequest if frameType == FRAME_ENCODE else decodeRequest
+                if len(payload) > OFFLOAD_SIZE:
+                    reply = await loop.run_in_executor(None, handler, tree, payload)
+                else:
+                    reply = handler(tree, payload)
+                self.requests += 1
+                await writeFrame(writer, *reply)
+        except (ValueError, ConnectionError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='哈夫曼编译码服务')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000, help='监听端口，0为随机端口')
+    parser.add_argument('--store', nargs='?', const=STORE_DIR,
+                        help='启用码表库并指定其目录，只给出--store时使用默认目录；默认不保存收到的树')
+    parser.add_argument('--store-entries', type=int, default=STORE_ENTRIES, help='码表库最多保存的树的数目')
+    parser.add_argument('--store-bytes', type=int, default=STORE_BYTES, help='码表库最多占用的字节数')
+    args = parser.parse_args(argv)
+    store = CodebookStore(args.store, args.store_entries, args.store_bytes) if args.store else None
+    server = CodecServer(args.host, args.port, store)
+
+    async def run():
+        await server.start()
+        print('listening on %s:%d' % (args.host, server.port), flush=True)
+        async with server.server:
+            await server.server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+# 分块流式编译码，内存占用只与块大小有关，与文件大小无关；借助索引可随机读取译文的任意一段
+from bisect import bisect_right
+from collections import Counter
+from itertools import accumulate
+from typing import Dict, List
+
+from huffman_core import HuffmanTree, packBits, unpackBits, readHeader
+
+CHUNK_SIZE = 1 << 20  # 每次读入的字符数(编码)或字节数(译码)
+
+
+def countFrequency(stream, chunkSize: int = CHUNK_SIZE) -> Dict[str, int]:
+    # 分块统计文本流中的字频
+    cnt = Counter()
+    while True:
+        chunk = stream.read(chunkSize)
+        if not chunk:
+            return dict(cnt)
+        cnt.update(chunk)
+
+
+def encodedLength(tree: HuffmanTree, frequency: Dict[str, int]) -> int:
+    # 由字频直接算出密文位数，无需真正编码；有字符集外的字符时返回None
+    try:
+        return sum(len(tree.codebook[i])*j for i, j in frequency.items())
+    except KeyError:
+        return None
+
+
+def measureStream(tree: HuffmanTree, stream, interval: int, chunkSize: int = CHUNK_SIZE):
+    # 分块算出文本流的密文位数，并每interval个字符记一个检查点(该段起始位, 该段字符数)
+    # 返回(密文位数, 索引)，有字符集外的字符时返回None
+    lengths = tree.codeLengths()
+    index: List[list] = []
+    offset, symbols = 0, 0
+    while True:
+        chunk = stream.read(chunkSize)
+        if not chunk:
+            return offset, [tuple(i) for i in index]
+        pos = 0
+        while pos < len(chunk):
+            if symbols % interval == 0:
+                index.append([offset, 0])
+            step = min(interval-symbols % interval, len(chunk)-pos)
+            try:
+                offset += sum(map(lengths.__getitem__, chunk[pos:pos+step]))
+            except KeyError:
+                return None
+            index[-1][1] += step
+            symbols += step
+            pos += step
+
+
+def encodeStream(tree: HuffmanTree, src, dst, bitLength: int, chunkSize: int = CHUNK_SIZE,
+                 index: List[tuple] = None) -> bool:
+    # 将文本流src分块编码为二进制格式写入dst，bitLength(及索引)需事先由encodedLength或measureStream算出
+    # 每块编码后只写出整字节，不足8位的部分留到下一块；有字符集外的字符时返回False
+    dst.write(tree.packHeader(bitLength, index))
+    carry = ''
+    while True:
+        chunk = src.read(chunkSize)
+        if not chunk:
+            break
+        bits = tree.encode(chunk)
+        if bits is None:
+            return False
+        bits = carry+bits
+        full = len(bits)//8*8
+        dst.write(packBits(bits[:full]))
+        carry = bits[full:]
+    dst.write(packBits(carry))
+    return True
+
+
+def decodeStream(src, dst, chunkSize: int = CHUNK_SIZE) -> bool:
+    # 从二进制流src读入文件头后分块译码，译文写入文本流dst
+    # 块末尾不完整的码字留到下一块开头继续译；格式有误或密文无法译码时返回False
+    header = readHeader(src)
+    if not header:
+        return False
+    tree, bitsLeft, _ = header
+    rest = ''
+    while True:
+        chunk = src.read(chunkSize)
+        if not chunk:
+            break
+        if bitsLeft <= 0:  # 密文后还有多余的数据
+            return False
+        bits = unpackBits(chunk, min(len(chunk)*8, bitsLeft))
+        bitsLeft -= len(chunk)*8
+        decoded = tree.decodePartial(rest+bits)
+        if decoded is None:
+            return False
+        text, rest = decoded
+        dst.write(text)
+    return bitsLeft <= 0 and bitsLeft > -8 and not rest
+
+
+def encodeFile(tree: HuffmanTree, srcPath: str, dst, chunkSize: int = CHUNK_SIZE, interval: int = None) -> bool:
+    # 对文件流式编码：第一遍统计字频算出密文位数(给出interval时同时生成索引)，第二遍分块编码
+    index = None
+    with open(srcPath, 'r', encoding='utf-8') as src:
+        if interval:
+            measured = measureStream(tree, src, interval, chunkSize)
+            if measured is None:
+                return False
+            bitLength, index = measured
+        else:
+            bitLength = encodedLength(tree, countFrequency(src, chunkSize))
+    if bitLength is None:
+        return False
+    with open(srcPath, 'r', encoding='utf-8') as src:
+        return encodeStream(tree, src, dst, bitLength, chunkSize, index)
+
+
+class SeekableDecoder:
+    # 随机读取：按文件头中的索引找到起点之前最近的检查点，只读入并译出所需的那一段密文
+    # 索引越密，每次需跳过的字符越少，但文件头越大；无索引时只能从头译起
+    stream = None  # 可seek的二进制流
+    tree: HuffmanTree = None
+    bitLength: int = 0  # 密文位数
+    payloadStart: int = 0  # 密文在流中的起始位置
+    bitOffsets: List[int] = None  # 各检查点的起始位
+    symbolOffsets: List[int] = None  # 各检查点之前的字符数
+
+    def __init__(self, stream):
+        header = readHeader(stream)
+        if not header:
+            raise ValueError('文件格式有误')
+        self.stream = stream
+        self.tree, self.bitLength, index = header
+        self.payloadStart = stream.tell()
+        index = index or [(0, 0)]
+        self.bitOffsets = [i for i, _ in index]
+        self.symbolOffsets = [0]+list(accumulate(j for _, j in index))[:-1]
+
+    def decodeRange(self, start: int, count: int) -> str:
+        # 译出第start个字符起的count个字符，超出结尾的部分忽略；密文无法译码时返回None
+        k = bisect_right(self.symbolOffsets, start)-1
+        bitPos = self.bitOffsets[k]
+        skip = start-self.symbolOffsets[k]
+        need = skip+count
+        # 每次读入的字节数按所需字符数与最长码长估计
+        chunk = min(max(need*max(self.tree.depth(), 1)//8+1, 64), CHUNK_SIZE)
+        result = []
+        got = 0
+        rest = ''
+        while got < need and bitPos < self.bitLength:
+            first = bitPos//8
+            end = min(self.bitLength, (first+chunk)*8)
+            self.stream.seek(self.payloadStart+first)
+            data = self.stream.read((end+7)//8-first)
+            if len(data) != (end+7)//8-first:
+                return None
+            bits = unpackBits(data, end-first*8)[bitPos-first*8:]
+            bitPos = end
+            decoded = self.tree.decodePartial(rest+bits)
+            if decoded is None:
+                return None
+            text, rest = decoded
+            result.append(text)
+            got += len(text)
+        return ''.join(result)[skip:need]
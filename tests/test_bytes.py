@@ -0,0 +1,62 @@
+# 字节模式的测试：向量化编译码与逐字符编译码的结果应相同
+import random
+
+import pytest
+
+import huffman_bytes
+from huffman_bytes import buildByteTree, byteFrequency, decodeBytes, encodeBytes, packBytes, unpackBytes
+from huffman_core import MAGIC, FLAG_BYTES
+
+RANDOM = random.Random(0)
+SAMPLES = [
+    b'',
+    b'\x00'*100,
+    bytes(range(256))*40,
+    b'abracadabra'*500,
+    bytes(RANDOM.choices(range(256), [0.97**i for i in range(256)], k=50000)),
+]
+
+
+@pytest.fixture(params=['numpy', 'fallback'])
+def mode(request, monkeypatch):
+    # 分别走NumPy向量化与逐字符两条路径；向量化时缩小路数与每路位数，使小数据也分成多路并跨多个区域
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+        monkeypatch.setattr(huffman_bytes, 'LANES', 16)
+        monkeypatch.setattr(huffman_bytes, 'LANE_BITS', 64)
+    else:
+        monkeypatch.setattr(huffman_bytes, 'numpy', None)
+    return request.param
+
+
+@pytest.mark.parametrize('data', SAMPLES)
+def test_byte_mode_round_trip(mode, data):
+    packed = packBytes(data)
+    assert packed[len(MAGIC)] & FLAG_BYTES
+    assert unpackBytes(packed) == data
+
+
+def test_paths_agree(monkeypatch):
+    pytest.importorskip('numpy')
+    data = SAMPLES[-1]
+    tree = buildByteTree(byteFrequency(data))
+    vectorized = encodeBytes(tree, data)
+    monkeypatch.setattr(huffman_bytes, 'numpy', None)
+    assert encodeBytes(tree, data) == vectorized
+    bits = ''.join(tree.codebook[chr(i)] for i in data)
+    assert vectorized[1] == len(bits)
+
+
+def test_single_byte_value_keeps_length(mode):
+    tree = buildByteTree(byteFrequency(b'\x07'*10))
+    assert len(tree.codebook) == 2 and tree.depth() == 1
+    assert unpackBytes(packBytes(b'\x07'*10)) == b'\x07'*10
+
+
+def test_bad_input(mode):
+    tree = buildByteTree(byteFrequency(b'abracadabra'))
+    assert packBytes(b'abcdefg', tree) is None
+    assert unpackBytes(packBytes(SAMPLES[-1])[:-1]) is None
+    assert unpackBytes(b'junk') is None
+    payload, bitLength = encodeBytes(tree, b'abracadabra'*10+b'c')  # c的码长大于1
+    assert decodeBytes(tree, payload, bitLength-1) is None  # 最后一个码字不完整
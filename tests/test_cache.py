@@ -0,0 +1,94 @@
+# 树的缓存与码表库的测试
+import os
+
+from huffman_cache import CodebookStore, LRUCache, TreeCache, charsetFingerprint, dataFingerprint
+from huffman_core import HuffmanTree, getFrequency
+from huffman_net import packTreeFrame
+
+
+def test_lru_eviction_order():
+    cache = LRUCache(2)
+    cache.get('a', lambda: 1)
+    cache.get('b', lambda: 2)
+    assert cache.get('a', lambda: None) == 1  # 命中后'a'成为最近使用的
+    cache.get('c', lambda: 3)
+    assert 'a' in cache and 'b' not in cache and 'c' in cache
+    assert list(cache.items) == ['a', 'c']
+
+
+def test_lru_counters_and_resize():
+    cache = LRUCache(3)
+    for key in 'abcab':
+        cache.get(key, lambda: key.upper())
+    assert cache.stats() == {'size': 3, 'maxSize': 3, 'hits': 2, 'misses': 3}
+    cache.resize(1)
+    assert list(cache.items) == ['b']
+    cache.resize(0)
+    cache.get('d', lambda: 'D')
+    assert cache.stats()['size'] == 0
+    cache.clear()
+    assert cache.stats() == {'size': 0, 'maxSize': 0, 'hits': 0, 'misses': 0}
+
+
+def test_none_is_not_cached():
+    cache = LRUCache(2)
+    assert cache.get('a', lambda: None) is None
+    assert 'a' not in cache
+    assert cache.get('a', lambda: 1) == 1
+
+
+def test_tree_cache():
+    cache = TreeCache(4)
+    frequency = getFrequency('abracadabra')
+    tree = cache.build(frequency, canonical=True)
+    assert tree.decodeTable is not None  # 存入前已建好译码表
+    assert cache.build(dict(frequency), canonical=True) is tree
+    assert cache.build(frequency) is not tree  # 参数不同视为不同的树
+    assert cache.get('empty', lambda: HuffmanTree({})).codebook is None
+    assert 'empty' not in cache
+    assert cache.stats()['hits'] == 1
+
+
+def test_charset_fingerprint():
+    frequency = {'a': 1, 'b': 2}
+    assert charsetFingerprint(frequency) == charsetFingerprint(dict(frequency))
+    assert charsetFingerprint(frequency) != charsetFingerprint({'b': 2, 'a': 1})
+    assert charsetFingerprint(frequency) != charsetFingerprint(frequency, canonical=True)
+
+
+def payloads(count: int) -> list:
+    return [packTreeFrame(HuffmanTree(getFrequency('abcdefghij'[:i+2]))) for i in range(count)]
+
+
+def test_store_round_trip(tmp_path):
+    store = CodebookStore(str(tmp_path))
+    payload = payloads(1)[0]
+    key = store.put(payload)
+    assert key == dataFingerprint(payload) and key in store
+    assert store.get(key) == payload
+    assert store.load(key).codebook == HuffmanTree(getFrequency('ab')).codebook
+    assert store.get('../'+key) is None
+    with open(store.path(key), 'wb') as file:  # 内容与编号不符时视为损坏
+        file.write(b'junk')
+    assert store.get(key) is None
+
+
+def test_store_prunes_by_entries(tmp_path):
+    store = CodebookStore(str(tmp_path), maxEntries=2)
+    trees = payloads(3)
+    keys = [store.put(trees[0]), store.put(trees[1])]
+    os.utime(store.path(keys[0]), (1, 1))
+    os.utime(store.path(keys[1]), (2, 2))
+    store.get(keys[0])  # 读出后成为最近使用的
+    keys.append(store.put(trees[2]))
+    assert keys[0] in store and keys[1] not in store and keys[2] in store
+
+
+def test_store_prunes_by_bytes(tmp_path):
+    trees = payloads(4)
+    store = CodebookStore(str(tmp_path), maxBytes=len(trees[2])+len(trees[3]))
+    for k, payload in enumerate(trees):
+        os.utime(store.path(store.put(payload)), (k+1, k+1))
+    assert sorted(os.listdir(tmp_path)) == sorted(dataFingerprint(i)+'.hfm' for i in trees[2:])
+    small = CodebookStore(str(tmp_path / 'small'), maxBytes=10)
+    assert small.put(trees[0]) not in small  # 超过上限的树不保存
@@ -0,0 +1,52 @@
+# 范式哈夫曼编码与只存码长的码表
+import io
+import struct
+
+from huffman_core import (HuffmanTree, MAGIC, canonicalCodebook, dumpCodeLengths, getFrequency, isPrefixCode,
+                          isValidCodeLengths, packBits, parseCodeLengths, readHeader, readTree)
+
+TEXT = '哈夫曼编码 Huffman coding\n' * 20 + 'the quick brown fox jumps over the lazy dog'
+
+
+def test_canonical_codebook():
+    lengths = {'a': 1, 'b': 2, 'c': 3, 'd': 3}
+    assert canonicalCodebook(lengths) == {'a': '0', 'b': '10', 'c': '110', 'd': '111'}
+
+
+def test_canonical_keeps_code_lengths():
+    frequency = getFrequency(TEXT)
+    tree = HuffmanTree(frequency, canonical=True)
+    assert tree.codeLengths() == HuffmanTree(frequency).codeLengths()
+    assert HuffmanTree.fromCodeLengths(tree.codeLengths()).codebook == tree.codebook
+    assert parseCodeLengths(dumpCodeLengths(tree.codeLengths())) == tree.codeLengths()
+
+
+def packedHeader(flags: int, entries: dict) -> bytes:
+    # 手工拼出只有树的文件头，flags为2时entries为码长，为4时为编码
+    header = [MAGIC, struct.pack('<BI', flags, len(entries))]
+    for name, value in entries.items():
+        header.append(struct.pack('<B', len(name.encode()))+name.encode())
+        if flags & 2:
+            header.append(struct.pack('<B', value))
+        else:
+            header.append(struct.pack('<B', len(value))+packBits(value))
+    header.append(struct.pack('<Q', 0))
+    return b''.join(header)
+
+
+def test_invalid_headers():
+    assert readHeader(io.BytesIO(packedHeader(2, {'x': 1, 'y': 1, 'z': 1}))) is None
+    assert readHeader(io.BytesIO(packedHeader(4, {'x': '0', 'y': '01'}))) is None
+    assert readHeader(io.BytesIO(packedHeader(4, {'x': '1', 'y': '1'}))) is None
+    assert readHeader(io.BytesIO(packedHeader(2, {'x': 1, 'y': 2, 'z': 2})))[0].codebook == \
+        {'x': '0', 'y': '10', 'z': '11'}
+    assert readHeader(io.BytesIO(packedHeader(4, {'x': '0', 'y': '10'})))[0].codebook == {'x': '0', 'y': '10'}
+
+
+def test_prefix_checks():
+    assert isPrefixCode({'a': '0', 'b': '10', 'c': '11'})
+    assert not isPrefixCode({'a': '1', 'b': '10'})
+    assert isValidCodeLengths({'a': 1, 'b': 2, 'c': 2})
+    assert not isValidCodeLengths({'a': 1, 'b': 1, 'c': 2})
+    assert readTree('a\t1\t0\nb\t1\t01\n') is None
+    assert readTree('a\t1\t0\nb\t1\t1\n').codebook == {'a': '0', 'b': '1'}
@@ -0,0 +1,67 @@
+# 命令行入口的往返测试
+import json
+
+import pytest
+
+from huffman_cli import main
+
+TEXT = '哈夫曼编码 Huffman coding\n' * 50
+
+
+def test_encode_decode_binary(tmp_path):
+    src = tmp_path / 'text.txt'
+    src.write_text(TEXT, encoding='utf-8')
+    main(['build-codebook', str(src), '-o', str(tmp_path / 'tree.txt')])
+    main(['encode', '-c', str(tmp_path / 'tree.txt'), str(src), '-o', str(tmp_path / 'text.hfm')])
+    main(['decode', str(tmp_path / 'text.hfm'), '-o', str(tmp_path / 'out.txt')])
+    assert (tmp_path / 'out.txt').read_text(encoding='utf-8') == TEXT
+
+
+def test_encode_decode_text_format(tmp_path):
+    src = tmp_path / 'text.txt'
+    src.write_text(TEXT, encoding='utf-8')
+    main(['build-codebook', str(src), '-o', str(tmp_path / 'tree.txt')])
+    main(['encode', '--text', '-c', str(tmp_path / 'tree.txt'), str(src), '-o', str(tmp_path / 'bits.txt')])
+    assert set((tmp_path / 'bits.txt').read_text()) <= {'0', '1'}
+    main(['decode', '-c', str(tmp_path / 'tree.txt'), str(tmp_path / 'bits.txt'), '-o', str(tmp_path / 'out.txt')])
+    assert (tmp_path / 'out.txt').read_text(encoding='utf-8') == TEXT
+
+
+def test_stats(tmp_path):
+    src = tmp_path / 'text.txt'
+    src.write_text(TEXT, encoding='utf-8')
+    main(['stats', str(src), '-o', str(tmp_path / 'stats.json')])
+    result = json.loads((tmp_path / 'stats.json').read_text(encoding='utf-8'))
+    assert result['characters'] == len(TEXT)
+    assert 0 < result['ratio'] < 1
+
+
+@pytest.mark.parametrize('command', ['build-codebook', 'stats'])
+def test_empty_input(tmp_path, command):
+    src = tmp_path / 'empty.txt'
+    src.write_bytes(b'')
+    with pytest.raises(SystemExit, match='原文为空'):
+        main([command, str(src), '-o', str(tmp_path / 'out')])
+
+
+def test_byte_counts_as_codebook(tmp_path):
+    # count --bytes的输出中\r字节占一行"\r\t次数"，读入时不能当作换行
+    data = b'a\rb\r\nc\nd\r\r\n\n'*50+bytes(range(256))
+    src = tmp_path / 'data.bin'
+    src.write_bytes(data)
+    main(['count', '--bytes', str(src), '-o', str(tmp_path / 'counts.txt')])
+    main(['encode', '--bytes', '-c', str(tmp_path / 'counts.txt'), str(src), '-o', str(tmp_path / 'data.hfm')])
+    main(['decode', str(tmp_path / 'data.hfm'), '-o', str(tmp_path / 'out.bin')])
+    assert (tmp_path / 'out.bin').read_bytes() == data
+
+
+def test_lone_cr_plaintext(tmp_path):
+    # 原文中的\r\n与单独的\r都按\n处理，单进程与多进程统计的结果相同
+    src = tmp_path / 'text.txt'
+    src.write_bytes('第一行\r第二行\r\n第三行\n'.encode()*20)
+    main(['build-codebook', str(src), '-o', str(tmp_path / 'tree1.txt')])
+    main(['build-codebook', '-j', '2', str(src), '-o', str(tmp_path / 'tree2.txt')])
+    assert (tmp_path / 'tree1.txt').read_bytes() == (tmp_path / 'tree2.txt').read_bytes()
+    main(['encode', '-c', str(tmp_path / 'tree1.txt'), str(src), '-o', str(tmp_path / 'text.hfm')])
+    main(['decode', str(tmp_path / 'text.hfm'), '-o', str(tmp_path / 'out.txt')])
+    assert (tmp_path / 'out.txt').read_bytes() == '第一行\n第二行\n第三行\n'.encode()*20
@@ -0,0 +1,61 @@
+# 二进制格式的往返测试
+import io
+
+import pytest
+
+from huffman_core import (HuffmanTree, MAGIC, FLAG_WIDE, decodeFromBytes, getFrequency, packBits, readHeader,
+                          unpack, unpackBits)
+
+TEXT = '哈夫曼编码 Huffman coding\n' * 20 + 'the quick brown fox jumps over the lazy dog'
+
+
+@pytest.mark.parametrize('engine', ['queue', 'select'])
+@pytest.mark.parametrize('canonical', [False, True])
+def test_container_round_trip(engine, canonical):
+    tree = HuffmanTree(getFrequency(TEXT), engine, canonical)
+    data = tree.encodeToBytes(TEXT)
+    assert data.startswith(MAGIC)
+    assert decodeFromBytes(data) == TEXT
+    restored, bitLength, index = readHeader(io.BytesIO(data))
+    assert restored.codebook == tree.codebook
+    assert bitLength == len(tree.encode(TEXT))
+    assert index is None
+    assert unpack(data)[1] == tree.encode(TEXT)
+
+
+def test_truncated_container():
+    data = HuffmanTree(getFrequency(TEXT)).encodeToBytes(TEXT)
+    assert unpack(data[:-1]) is None
+    assert decodeFromBytes(data[:20]) is None
+    assert readHeader(io.BytesIO(b'HFM')) is None
+    assert readHeader(io.BytesIO(b'XXXX'+data[4:])) is None
+
+
+def test_single_symbol():
+    tree = HuffmanTree({'a': 4})
+    assert tree.codebook == {'a': '0'}
+    assert decodeFromBytes(tree.encodeToBytes('aaaa')) == 'aaaa'
+
+
+@pytest.mark.parametrize('canonical', [False, True])
+def test_deep_tree(canonical):
+    # 权重按2的幂递增时树深为字符数-1，超过255后码长以2字节保存
+    frequency = {chr(0x100+i): 2.0**i for i in range(300)}
+    tree = HuffmanTree(frequency, canonical=canonical)
+    assert tree.depth() == 299
+    text = ''.join(frequency)
+    assert decodeFromBytes(tree.encodeToBytes(text)) == text
+    explicit = HuffmanTree.fromCodebook(tree.codebook)
+    data = explicit.encodeToBytes(text)
+    assert data[len(MAGIC)] & FLAG_WIDE
+    assert decodeFromBytes(data) == text
+
+
+def test_shallow_trees_keep_narrow_lengths():
+    data = HuffmanTree(getFrequency(TEXT), canonical=True).encodeToBytes(TEXT)
+    assert not data[len(MAGIC)] & FLAG_WIDE
+
+
+def test_pack_bits():
+    for bits in ['', '1', '0110', '101100111']:
+        assert unpackBits(packBits(bits), len(bits)) == bits
@@ -0,0 +1,37 @@
+# 分片统计字频的测试，结果应与读入整个文件后统计相同
+from huffman_core import getFrequency
+from huffman_count import countFile, shardRanges
+
+TEXT = ''.join('第%d行 line %d\n' % (i, i) for i in range(2000))
+
+
+def test_shards_match_whole_file(tmp_path):
+    path = tmp_path / 'text.txt'
+    path.write_text(TEXT, encoding='utf-8', newline='')
+    expected = getFrequency(TEXT)
+    assert len(shardRanges(str(path), 1000)) > 10
+    assert countFile(str(path), 1, shardSize=1000) == expected
+    assert countFile(str(path), 2, shardSize=1000) == expected
+
+
+def test_newlines_counted_like_text_mode(tmp_path):
+    # \r\n与单独的\r都按\n统计，分片边界落在\r与\n之间时也不例外
+    path = tmp_path / 'newlines.txt'
+    path.write_bytes(('a\rb\r\n'*300).encode())
+    expected = getFrequency(path.read_text(encoding='utf-8'))
+    for shardSize in (4, 5, 7, 1 << 20):
+        assert countFile(str(path), 1, shardSize=shardSize) == expected
+
+
+def test_byte_mode(tmp_path):
+    path = tmp_path / 'data.bin'
+    data = bytes(range(256))*3+b'\r\n'*10
+    path.write_bytes(data)
+    counts = countFile(str(path), 1, byteMode=True, shardSize=100)
+    assert counts == {chr(i): data.count(i) for i in range(256)}
+
+
+def test_not_utf8(tmp_path):
+    path = tmp_path / 'latin1.txt'
+    path.write_bytes('café'.encode('latin-1'))
+    assert countFile(str(path), 1) is None
@@ -0,0 +1,47 @@
+# 查表译码的测试，结果应与逐位走树译码相同
+import pytest
+
+from huffman_core import HuffmanTree, getFrequency
+
+TEXT = '哈夫曼编码 Huffman coding\n' * 20 + 'the quick brown fox jumps over the lazy dog'
+
+
+@pytest.mark.parametrize('engine', ['queue', 'select'])
+@pytest.mark.parametrize('canonical', [False, True])
+def test_encode_decode(engine, canonical):
+    tree = HuffmanTree(getFrequency(TEXT), engine, canonical)
+    bits = tree.encode(TEXT)
+    assert set(bits) <= {'0', '1'}
+    assert tree.decode(bits) == TEXT
+    assert tree.decodeBitwise(bits) == TEXT
+    assert tree.encode('字符集以外') is None
+
+
+def test_deep_codes_use_sub_tables():
+    # 码长超过TABLE_BITS时需经子表译出
+    frequency = {chr(0x41+i): 2**i for i in range(20)}
+    tree = HuffmanTree(frequency)
+    assert tree.depth() > tree.TABLE_BITS
+    text = ''.join(frequency)*3
+    assert tree.decode(tree.encode(text)) == text
+
+
+def test_decode_partial_carries_incomplete_code():
+    tree = HuffmanTree(getFrequency(TEXT))
+    bits = tree.encode(TEXT)
+    parts = []
+    rest = ''
+    for i in range(0, len(bits), 37):  # 每块的末尾多半落在码字中间
+        text, rest = tree.decodePartial(rest+bits[i:i+37])
+        parts.append(text)
+    assert rest == ''
+    assert ''.join(parts) == TEXT
+
+
+def test_invalid_bits():
+    tree = HuffmanTree(getFrequency(TEXT))
+    bits = tree.encode(TEXT)
+    assert tree.decode(bits+'2') is None
+    incomplete = max(tree.codebook.values(), key=len)[:-1]  # 码字的真前缀，不是完整的码字
+    assert tree.decode(bits+incomplete) is None
+    assert tree.decodePartial('01x') is None
@@ -0,0 +1,41 @@
+# 分帧格式的测试：帧的打包与解析及增量重组
+import socket
+
+from huffman_core import HuffmanTree, getFrequency
+from huffman_net import (FRAME_HEADER, FRAME_TEXT, FRAME_TREE, FrameReader, packTextFrame, packTreeFrame,
+                         parseTextFrame, parseTreeFrame, recvFrames, sendFrame)
+
+TEXT = ''.join(chr(0x4e00+i % 300)+'abc\n'[i % 4] for i in range(5000))
+
+
+def test_tree_and_text_frames():
+    tree = HuffmanTree(getFrequency(TEXT), canonical=True)
+    assert parseTreeFrame(packTreeFrame(tree)).codebook == tree.codebook
+    assert parseTreeFrame(b'junk') is None
+    bits = tree.encode(TEXT)
+    payload = packTextFrame(bits)
+    assert parseTextFrame(payload) == bits
+    assert parseTextFrame(payload[:-1]) is None
+    assert parseTextFrame(b'\x00') is None
+
+
+def test_frame_reader_reassembles():
+    frames = [(FRAME_TREE, b'tree'), (FRAME_TEXT, b''), (FRAME_TEXT, bytes(range(256))*3)]
+    data = b''.join(FRAME_HEADER.pack(i, len(j))+j for i, j in frames)
+    reader = FrameReader()
+    received = []
+    for i in range(0, len(data), 5):  # 每次只喂入几个字节
+        received.extend(reader.feed(data[i:i+5]))
+    assert received == frames
+    assert not reader.buffer
+
+
+def test_send_and_receive_frames():
+    left, right = socket.socketpair()
+    try:
+        sendFrame(left, FRAME_TREE, b'tree')
+        sendFrame(left, FRAME_TEXT, b'x'*50000)
+        left.close()
+        assert list(recvFrames(right)) == [(FRAME_TREE, b'tree'), (FRAME_TEXT, b'x'*50000)]
+    finally:
+        right.close()
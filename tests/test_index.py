@@ -0,0 +1,33 @@
+# 借助检查点随机读取的测试
+import io
+
+import pytest
+
+from huffman_core import HuffmanTree, getFrequency, readHeader
+from huffman_stream import SeekableDecoder, encodeFile
+
+TEXT = ''.join('第%d行 line %d\n' % (i, i) for i in range(2000))
+RANGES = [(0, 10), (63, 2), (64, 1), (1000, 500), (len(TEXT)-5, 100), (len(TEXT), 3)]
+
+
+@pytest.mark.parametrize('interval', [None, 1, 64, 5000])
+def test_decode_range(interval):
+    tree = HuffmanTree(getFrequency(TEXT), canonical=True)
+    decoder = SeekableDecoder(io.BytesIO(tree.encodeToBytes(TEXT, interval)))
+    for start, count in RANGES:
+        assert decoder.decodeRange(start, count) == TEXT[start:start+count]
+
+
+def test_streamed_index_matches_build_index(tmp_path):
+    path = tmp_path / 'text.txt'
+    path.write_text(TEXT, encoding='utf-8', newline='')
+    tree = HuffmanTree(getFrequency(TEXT))
+    packed = io.BytesIO()
+    assert encodeFile(tree, str(path), packed, chunkSize=300, interval=64)
+    packed.seek(0)
+    assert readHeader(packed)[2] == tree.buildIndex(TEXT, 64)
+
+
+def test_bad_file():
+    with pytest.raises(ValueError):
+        SeekableDecoder(io.BytesIO(b'not a container'))
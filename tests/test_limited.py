@@ -0,0 +1,45 @@
+# 限制码长的测试：package-merge求出的码长不超过上限且仍是最优的
+import itertools
+
+import pytest
+
+from huffman_core import HuffmanTree, isValidCodeLengths, limitedCodeLengths
+
+FREQUENCY = {chr(0x41+i): 2**i for i in range(20)}
+
+
+def cost(frequency: dict, lengths: dict) -> int:
+    return sum(frequency[i]*lengths[i] for i in frequency)
+
+
+@pytest.mark.parametrize('maxLength', [5, 8, 12, 19])
+def test_limited_code_lengths(maxLength):
+    lengths = limitedCodeLengths(FREQUENCY, maxLength)
+    assert max(lengths.values()) <= maxLength
+    assert isValidCodeLengths(lengths)
+
+
+def test_unconstrained_limit_matches_huffman():
+    tree = HuffmanTree(FREQUENCY)
+    assert cost(FREQUENCY, limitedCodeLengths(FREQUENCY, 30)) == cost(FREQUENCY, tree.codeLengths())
+
+
+def test_limited_lengths_are_optimal():
+    # 字符较少时穷举所有满足上限的码长，package-merge的结果应是带权路径长度最小的
+    frequency = {'a': 1, 'b': 1, 'c': 2, 'd': 3, 'e': 5, 'f': 8}
+    best = min(cost(frequency, dict(zip(frequency, i)))
+               for i in itertools.product(range(1, 4), repeat=len(frequency))
+               if isValidCodeLengths(dict(zip(frequency, i))))
+    assert cost(frequency, limitedCodeLengths(frequency, 3)) == best
+
+
+def test_tree_with_max_length():
+    tree = HuffmanTree(FREQUENCY, maxLength=8)
+    assert tree.canonical and tree.depth() <= 8
+    text = ''.join(FREQUENCY)
+    assert tree.decode(tree.encode(text)) == text
+
+
+def test_limit_too_small():
+    with pytest.raises(ValueError):
+        limitedCodeLengths(FREQUENCY, 4)
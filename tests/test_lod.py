@@ -0,0 +1,43 @@
+# 细节层次的测试：按深度与权重折叠子树，用户展开的节点及其祖先总是展开
+import pytest
+
+from huffman_core import HuffmanTree, readTree, dumpTree
+
+BALANCED = HuffmanTree({chr(0x41+i): 1 for i in range(16)}, canonical=True)  # 16个字符均为4位
+SKEWED = HuffmanTree({chr(0x41+i): 2**i for i in range(6)})  # A、B为5位，F为1位
+
+
+def test_collapse_by_depth():
+    assert sorted(BALANCED.collapsedPrefixes(2)) == ['00', '01', '10', '11']
+    assert BALANCED.collapsedPrefixes(0) == ['']
+    assert BALANCED.collapsedPrefixes(4) == []  # 第4层都是叶子，叶子不折叠
+
+
+def test_collapse_by_weight():
+    # '0000'下只有A、B，权重1+2=3
+    assert SKEWED.collapsedPrefixes(minWeight=4) == ['0000']
+    assert SKEWED.collapsedPrefixes(minWeight=8) == ['000']
+    assert SKEWED.collapsedPrefixes(minWeight=1) == []
+
+
+def test_expanded_keeps_ancestors_open():
+    collapsed = BALANCED.collapsedPrefixes(2, expanded=['0110'])
+    assert sorted(collapsed) == ['00', '010', '10', '11']
+    for prefix in ['', '0', '01', '011']:
+        assert prefix not in collapsed
+    # 展开的节点之下仍按阈值折叠
+    assert sorted(BALANCED.collapsedPrefixes(1, expanded=['01'])) == ['00', '010', '011', '1']
+
+
+def test_codebook_tree_builds_nodes_for_lod():
+    tree = readTree(dumpTree(BALANCED))
+    assert sorted(tree.collapsedPrefixes(2)) == ['00', '01', '10', '11']
+
+
+def test_build_graph_draws_summaries():
+    pytest.importorskip('graphviz')
+    dot = BALANCED.buildGraph(['00', '1'])
+    source = dot.source
+    assert '+4' in source  # '00'下有4个字符
+    assert '+8' in source  # '1'下有8个字符
+    assert 'n0000' not in source and 'n1' in source and 'n10' not in source
@@ -0,0 +1,85 @@
+# 运行统计的测试
+import json
+import time
+
+import pytest
+
+from huffman_core import HuffmanTree, getFrequency
+from huffman_metrics import STAGES, Metrics, metrics
+
+
+def test_timer_records_stage():
+    recorder = Metrics()
+    with recorder.timer('encode', bytes=10) as counter:
+        time.sleep(0.01)
+        counter.symbols = 80
+    with recorder.timer('encode', bytes=30, symbols=20):
+        pass
+    record = recorder.snapshot()['encode']
+    assert record['count'] == 2
+    assert record['seconds'] >= 0.01
+    assert (record['bytes'], record['symbols']) == (40, 100)
+    assert record['bytesPerSecond'] == pytest.approx(40/record['seconds'])
+
+
+def test_all_stages():
+    recorder = Metrics()
+    for k, stage in enumerate(STAGES):
+        for _ in range(k+1):
+            with recorder.timer(stage, bytes=1):
+                pass
+    stages = recorder.snapshot()
+    assert list(stages) == list(STAGES)
+    for k, stage in enumerate(STAGES):
+        assert stages[stage]['count'] == stages[stage]['bytes'] == k+1
+        assert stages[stage]['seconds'] >= 0
+
+
+def test_timer_records_failures():
+    recorder = Metrics()
+    with pytest.raises(KeyError):
+        with recorder.timer('decode'):
+            raise KeyError
+    assert recorder.snapshot()['decode']['count'] == 1
+
+
+def test_core_stages_are_instrumented():
+    metrics.reset()
+    text = 'abracadabra'*100
+    tree = HuffmanTree(getFrequency(text))
+    assert tree.decode(tree.encode(text)) == text
+    stages = metrics.snapshot()
+    assert set(stages) <= set(STAGES)
+    for stage in ('build', 'encode', 'decode'):
+        assert stages[stage]['count'] >= 1
+    assert stages['encode']['symbols'] == len(text)
+    assert stages['decode']['symbols'] == len(text)
+
+
+def test_profile_next_runs_once():
+    recorder = Metrics()
+    recorder.profileNext('build')
+    with recorder.timer('build'):
+        sorted(range(1000))
+    assert 'build' in recorder.profiles
+    assert 'function calls' in recorder.profiles['build']
+    assert not recorder.profiling
+    first = recorder.profiles['build']
+    with recorder.timer('build'):  # 分析只针对下一次运行，之后不再分析
+        pass
+    assert recorder.profiles['build'] is first
+    assert recorder.snapshot()['build']['count'] == 2
+
+
+def test_to_json_and_reset():
+    recorder = Metrics()
+    recorder.profileNext('render')
+    with recorder.timer('render', bytes=5):
+        pass
+    data = json.loads(recorder.toJson())
+    assert data['stages']['render']['bytes'] == 5
+    assert 'render' in data['profiles']
+    recorder.profileNext('send')
+    recorder.reset()
+    assert recorder.snapshot() == {} and recorder.profiles == {}
+    assert recorder.profiling == {'send'}  # 已请求的分析仍然有效
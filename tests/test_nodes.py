@@ -0,0 +1,70 @@
+# 平行数组形式的树的测试
+from huffman_core import HuffmanTree, getFrequency, readTree, dumpTree
+
+TEXT = '哈夫曼编码 Huffman coding\n' * 20 + 'the quick brown fox jumps over the lazy dog'
+
+
+def check(tree: HuffmanTree):
+    # 数组构成一棵以最后一个节点为根的树，叶子的编码与码表一致，内部节点的权重为孩子之和
+    root = len(tree.lefts)-1
+    assert tree.parents[root] == -1
+    stack = [(root, '')]
+    leaves = 0
+    while stack:
+        i, code = stack.pop()
+        if i < len(tree.symbols):
+            assert tree.codebook[tree.symbols[i]] == code
+            leaves += 1
+            continue
+        children = [j for j in (tree.lefts[i], tree.rights[i]) if j >= 0]
+        assert tree.weights[i] == sum(tree.weights[j] for j in children)
+        for j, b in zip((tree.lefts[i], tree.rights[i]), '01'):
+            if j >= 0:
+                assert tree.parents[j] == i
+                stack.append((j, code+b))
+    assert leaves == len(tree.codebook)
+
+
+def test_arrays_match_codebook():
+    for tree in (HuffmanTree(getFrequency(TEXT)), HuffmanTree(getFrequency(TEXT), 'select'),
+                 HuffmanTree(getFrequency(TEXT), canonical=True)):
+        check(tree)
+        assert tree.weights[-1] == len(TEXT)
+
+
+def test_object_view():
+    tree = HuffmanTree(getFrequency(TEXT))
+    nodes = tree.nodes
+    assert len(nodes) == len(tree.lefts)
+    assert tree.rootnode is nodes[-1] and tree.rootnode.parent is None
+    assert tree.rootnode.weight == len(TEXT)
+    for node, left in zip(nodes, tree.lefts):
+        assert (node.lchild is None) == (left < 0)
+        if node.lchild:
+            assert node.lchild.parent is node
+
+
+def test_codebook_tree_builds_nodes_on_demand():
+    tree = readTree(dumpTree(HuffmanTree(getFrequency(TEXT))))
+    assert tree.lefts is None
+    assert tree.rootnode.weight == len(TEXT)
+    check(tree)
+    assert len(tree.nodes) == 2*len(tree.codebook)-1
+    assert HuffmanTree(None).rootnode is None
+
+
+class WatchedTree(HuffmanTree):
+    # 每次给数组赋值后检查：一旦lefts不为None，其他线程看到的就应是完整的树
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in ('lefts', 'rights', 'parents', 'weights', 'symbols') and self.lefts is not None:
+            check(self)
+
+
+def test_build_nodes_publishes_complete_arrays():
+    # 画树线程与界面线程可能同时访问同一棵由码表得到的树，建节点的过程中不应露出建了一半的数组
+    source = HuffmanTree(getFrequency(TEXT))
+    tree = WatchedTree.fromCodebook(source.codebook, source.characterset)
+    tree.buildNodes()
+    tree.buildNodes()  # 再建一次权重也不会累加
+    assert tree.weights[-1] == len(TEXT)
@@ -0,0 +1,47 @@
+# 分段并行编译码的测试：多段的结果应与单进程编译码相同，损坏的输入返回None而不是在进程池中出错
+import pytest
+
+from huffman_core import HuffmanTree, getFrequency
+from huffman_parallel import decodeParallel, encodeParallel
+
+TEXT = ''.join('第%d行 line %d\n' % (i, i) for i in range(3000))
+
+
+@pytest.fixture(scope='module')
+def tree():
+    return HuffmanTree(getFrequency(TEXT), canonical=True)
+
+
+def test_encode_parallel_matches_serial(tree):
+    data = encodeParallel(tree, TEXT, 1000, 2)
+    assert data == tree.encodeToBytes(TEXT, 1000)
+    assert decodeParallel(data, 2, 1000) == TEXT
+
+
+def test_decode_parallel_merges_dense_index(tree):
+    # 检查点较密时相邻的几段合为一个任务
+    assert decodeParallel(tree.encodeToBytes(TEXT, 7), 2, 1000) == TEXT
+
+
+def test_decode_parallel_without_index(tree):
+    assert decodeParallel(tree.encodeToBytes(TEXT), 2) == TEXT
+
+
+def test_encode_parallel_rejects_unknown_symbol(tree):
+    assert encodeParallel(tree, TEXT+'字符集以外', 1000, 2) is None
+
+
+def test_decode_parallel_rejects_bad_input(tree):
+    data = tree.encodeToBytes(TEXT, 1000)
+    assert decodeParallel(data[:-1], 2) is None
+    assert decodeParallel(data+b'\x00', 2) is None
+    assert decodeParallel(b'HFM\x01'+bytes(range(40)), 2) is None
+    bits = tree.encode(TEXT)
+    index = tree.buildIndex(TEXT, 1000)
+    wrongCounts = [(offset, count+1) for offset, count in index]
+    assert decodeParallel(tree.pack(bits, wrongCounts), 2, 1000) is None
+    unordered = [index[0], index[2], index[1]]+index[3:]
+    assert decodeParallel(tree.pack(bits, unordered), 2, 1000) is None
+    # 各段的密文被截短后无法完整译出
+    shortened = tree.encode(TEXT[:-1])
+    assert decodeParallel(tree.pack(shortened, index), 2, 1000) is None
@@ -0,0 +1,45 @@
+# 边编码边发送、边接收边译码的测试
+import socket
+import threading
+
+from huffman_core import HuffmanTree, getFrequency
+from huffman_net import FRAME_CHUNK, iterChunks, packTextFrame, recvTextStream, sendFrame, sendTextStream
+
+TEXT = ''.join(chr(0x4e00+i % 300)+'abc\n'[i % 4] for i in range(5000))
+
+
+def transfer(tree: HuffmanTree, send):
+    # 在socketpair上调用send(发送端)，返回(接收端的结果, 收到的译文)
+    left, right = socket.socketpair()
+    received = []
+    results = []
+    thread = threading.Thread(target=lambda: results.append(recvTextStream(right, tree, received.append)))
+    thread.start()
+    try:
+        send(left)
+        left.shutdown(socket.SHUT_WR)
+        thread.join()
+    finally:
+        left.close()
+        right.close()
+    return results[0], ''.join(received)
+
+
+def test_text_stream():
+    tree = HuffmanTree(getFrequency(TEXT), canonical=True)
+    assert transfer(tree, lambda s: sendTextStream(s, tree, iterChunks(TEXT, 1000))) == (True, TEXT)
+
+
+def test_text_stream_aborts_on_unknown_symbol():
+    tree = HuffmanTree(getFrequency('abc'))
+    ok, received = transfer(tree, lambda s: sendTextStream(s, tree, ['abc', 'xyz']))
+    assert not ok
+    assert received == 'abc'
+
+
+def test_text_stream_without_end_frame():
+    # 连接在结束帧之前关闭时视为失败
+    tree = HuffmanTree(getFrequency('abc'))
+    ok, received = transfer(tree, lambda s: sendFrame(s, FRAME_CHUNK, packTextFrame(tree.encode('abc'))))
+    assert not ok
+    assert received == 'abc'
@@ -0,0 +1,105 @@
+# 编译码服务的测试：在本进程的事件循环中启动服务，经本机回环连接收发帧
+import asyncio
+
+from huffman_cache import CodebookStore, codebookId
+from huffman_core import HuffmanTree, getFrequency
+from huffman_net import (FRAME_DECODE, FRAME_ENCODE, FRAME_ERROR, FRAME_HAVE, FRAME_HEADER, FRAME_OFFER,
+                         FRAME_PLAIN, FRAME_TEXT, FRAME_TREE, FRAME_WANT, packTextFrame, packTreeFrame,
+                         parseTextFrame)
+from huffman_server import MAX_FRAME, CodecServer, readFrame, writeFrame
+
+TEXT = '哈夫曼编码服务 codec server\n' * 10
+TREE = HuffmanTree(getFrequency(TEXT), canonical=True)
+
+
+def serve(session, store: CodebookStore = None):
+    # 启动服务后运行session(server)，结束后关闭服务
+    async def run():
+        server = CodecServer('127.0.0.1', 0, store)
+        await server.start()
+        async with server.server:
+            return await session(server)
+    return asyncio.run(asyncio.wait_for(run(), 30))
+
+
+async def connect(server: CodecServer):
+    return await asyncio.open_connection('127.0.0.1', server.port)
+
+
+async def request(reader, writer, frameType: int, payload: bytes):
+    await writeFrame(writer, frameType, payload)
+    return await readFrame(reader)
+
+
+def test_encode_and_decode():
+    async def session(server):
+        reader, writer = await connect(server)
+        await writeFrame(writer, FRAME_TREE, packTreeFrame(TREE))
+        frameType, payload = await request(reader, writer, FRAME_ENCODE, TEXT.encode())
+        assert frameType == FRAME_TEXT
+        assert parseTextFrame(payload) == TREE.encode(TEXT)
+        reply = await request(reader, writer, FRAME_DECODE, payload)
+        writer.close()
+        return reply, server.requests
+    assert serve(session) == ((FRAME_PLAIN, TEXT.encode()), 2)
+
+
+def test_errors():
+    async def session(server):
+        reader, writer = await connect(server)
+        replies = [await request(reader, writer, FRAME_ENCODE, b'abc')]  # 尚未发送树
+        await writeFrame(writer, FRAME_TREE, b'junk')
+        replies.append(await readFrame(reader))
+        await writeFrame(writer, FRAME_TREE, packTreeFrame(TREE))
+        replies.append(await request(reader, writer, ord('?'), b''))
+        replies.append(await request(reader, writer, FRAME_ENCODE, b'\xff\xfe'))
+        replies.append(await request(reader, writer, FRAME_ENCODE, '字符集以外'.encode()))
+        replies.append(await request(reader, writer, FRAME_DECODE, packTextFrame('1'*3)+b'\x00'))
+        writer.close()
+        return replies
+    replies = serve(session)
+    assert [i for i, _ in replies] == [FRAME_ERROR]*6
+    assert [j.decode() for _, j in replies] == ['请先发送树', '树的格式有误', '未知的请求', '原文不是UTF-8编码',
+                                                '存在字符集以外的字符', '密文无法译码']
+
+
+def test_oversize_frame_closes_connection():
+    async def session(server):
+        reader, writer = await connect(server)
+        writer.write(FRAME_HEADER.pack(FRAME_ENCODE, MAX_FRAME+1))
+        await writer.drain()
+        closed = await readFrame(reader)
+        writer.close()
+        return closed
+    assert serve(session) is None
+
+
+def test_offer_want_have(tmp_path):
+    # 用其他测试中没有出现过的树，以免服务端的树缓存中已有该树
+    text = '只在此处使用的树 offer\n'
+    tree = HuffmanTree(getFrequency(text), canonical=True)
+    key = codebookId(tree).encode()
+
+    async def session(server):
+        reader, writer = await connect(server)
+        replies = [await request(reader, writer, FRAME_OFFER, key)]
+        await writeFrame(writer, FRAME_TREE, packTreeFrame(tree))
+        replies.append((await request(reader, writer, FRAME_ENCODE, text.encode()))[0])  # 应答时树已存入码表库
+        writer.close()
+        reader, writer = await connect(server)  # 新的连接只需提供编号
+        replies.append(await request(reader, writer, FRAME_OFFER, key))
+        replies.append((await request(reader, writer, FRAME_ENCODE, text.encode()))[0])
+        writer.close()
+        return replies
+    store = CodebookStore(str(tmp_path))
+    assert serve(session, store) == [(FRAME_WANT, key), FRAME_TEXT, (FRAME_HAVE, key), FRAME_TEXT]
+    assert key.decode() in store
+
+
+def test_offer_without_store():
+    async def session(server):
+        reader, writer = await connect(server)
+        reply = await request(reader, writer, FRAME_OFFER, b'0'*64)
+        writer.close()
+        return reply
+    assert serve(session) == (FRAME_WANT, b'0'*64)
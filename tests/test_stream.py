@@ -0,0 +1,33 @@
+# 分块流式编译码的测试，结果应与一次性编译码相同
+import io
+
+from huffman_core import HuffmanTree, getFrequency
+from huffman_stream import countFrequency, decodeStream, encodeFile
+
+TEXT = ''.join('第%d行 line %d\n' % (i, i) for i in range(2000))
+
+
+def test_count_frequency():
+    assert countFrequency(io.StringIO(TEXT), chunkSize=100) == getFrequency(TEXT)
+
+
+def test_stream_round_trip(tmp_path):
+    path = tmp_path / 'text.txt'
+    path.write_text(TEXT, encoding='utf-8', newline='')
+    tree = HuffmanTree(getFrequency(TEXT), canonical=True)
+    packed = io.BytesIO()
+    assert encodeFile(tree, str(path), packed, chunkSize=1000)
+    assert packed.getvalue() == tree.encodeToBytes(TEXT)
+    decoded = io.StringIO()
+    assert decodeStream(io.BytesIO(packed.getvalue()), decoded, chunkSize=100)
+    assert decoded.getvalue() == TEXT
+
+
+def test_stream_rejects_bad_input(tmp_path):
+    path = tmp_path / 'text.txt'
+    path.write_text(TEXT+'字符集以外', encoding='utf-8')
+    tree = HuffmanTree(getFrequency(TEXT))
+    assert not encodeFile(tree, str(path), io.BytesIO())
+    packed = tree.encodeToBytes(TEXT)
+    assert not decodeStream(io.BytesIO(packed[:-1]), io.StringIO())
+    assert not decodeStream(io.BytesIO(packed+b'\x00'), io.StringIO())